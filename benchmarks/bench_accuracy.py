@@ -0,0 +1,255 @@
+"""
+bench_accuracy.py
+Justesse et latence du matcher, du locator et du correcteur sur le corpus
+de fichiers cassés (voir corpus.py).
+
+Pour chaque cas (une faute injectée, id errors_db et ligne attendus) :
+    matcher    → l'id attendu est-il le premier de match_all_errors (ou dans les 3 premiers) ?
+    locator    → la ligne de la cause est-elle real_line (ou parmi les 3 premiers candidats) ?
+    correction → correct_until_valid / correct_window (comme validate()) rend-il un fichier valide ?
+    validate() → pipeline complet, pour la latence de bout en bout
+Chaque étape est chronométrée à froid (le cache du découpage ne survit pas
+à l'appel, voir modules/document_cache.py) ; on rapporte les percentiles 50 / 90 / 99 et le maximum.
+
+--save écrit le résumé en JSON, --baseline compare avec un résumé précédent :
+c'est ce qui permet de dire si un changement rend les choses meilleures ou pires.
+
+Lancement depuis la racine du projet :
+    python benchmarks/bench_accuracy.py [--corpus benchmarks/corpus] [--seed 0] [--max-size-kb 4096]
+                                        [--save resultats.json] [--baseline ancien.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.corpus import iter_cases, read_corpus  # noqa: E402
+from modules.errors_matcher import match_all_errors  # noqa: E402
+from modules.locator import locate_json_error, locate_real_error  # noqa: E402
+from modules.repair import WINDOW_MIN_SIZE, correct_until_valid, correct_window  # noqa: E402
+from modules.validator import validate  # noqa: E402
+
+
+STAGES = ("matcher", "locator", "correction", "validate()")
+PERCENTILES = (50, 90, 99)
+# Tranches de confiance du locator (borne basse) pour la table de calibration
+CONFIDENCE_BINS = (0.0, 0.5, 0.75, 0.9)
+
+
+# ==============================
+# ÉTAPES
+# ==============================
+def _parse_error(content, file_type):
+    """(erreur, ligne signalée) du parseur, ou (None, None) si le fichier se parse"""
+    try:
+        if file_type == "json":
+            json.loads(content)
+        else:
+            ET.fromstring(content)
+    except json.JSONDecodeError as e:
+        return e, e.lineno
+    except ET.ParseError as e:
+        return e, e.position[0]
+    return None, None
+
+
+def _correct(content, file_type, error):
+    """Correction telle que validate() la lance (fenêtre pour un gros XML)"""
+    if file_type == "xml" and len(content) >= WINDOW_MIN_SIZE:
+        return correct_window(content, file_type, first_error=error)
+    return correct_until_valid(content, file_type, first_error=error)
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run_case(case):
+    """
+    Passe un cas dans toutes les étapes.
+
+    Retourne :
+        dict → cas (sans le contenu) + résultats et temps (secondes) par étape,
+               ou None si la faute n'a pas cassé le fichier
+    """
+    content, file_type = case["content"], case["file_type"]
+    error, reported = _parse_error(content, file_type)
+    if error is None:
+        return None
+    locate = locate_json_error if file_type == "json" else locate_real_error
+
+    times = {}
+    times["matcher"], matches = _timed(lambda: match_all_errors(content, error, file_type))
+    times["locator"], located = _timed(lambda: locate(content, reported))
+    times["correction"], correction = _timed(lambda: _correct(content, file_type, error))
+    times["validate()"], _ = _timed(lambda: validate(content, file_type))
+
+    ids = [entry["id"] for entry in matches]
+    lines = [candidate["line"] for candidate in located["candidates"]]
+    result = {key: value for key, value in case.items() if key != "content"}
+    result.update({
+        "reported_line": reported,
+        "matched_id": ids[0] if ids else None,
+        "match_top1": ids[:1] == [case["expected_id"]],
+        "match_top3": case["expected_id"] in ids[:3],
+        "located_line": located["real_line"],
+        "located_confidence": located["confidence"],
+        "locate_top1": located["real_line"] == case["line"],
+        "locate_top3": case["line"] in lines[:3],
+        "corrected": bool(correction["has_changes"] and correction["valid"]),
+        "times": times,
+    })
+    return result
+
+
+# ==============================
+# RÉSUMÉ
+# ==============================
+def _percentile(values, percent):
+    """Percentile au rang le plus proche (values trié)"""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, round(percent / 100 * len(values) + 0.5) - 1))
+    return values[rank]
+
+
+def _rates(results):
+    total = len(results)
+    return {
+        "cas": total,
+        "matcher_top1": sum(r["match_top1"] for r in results) / total,
+        "matcher_top3": sum(r["match_top3"] for r in results) / total,
+        "locator_ligne": sum(r["locate_top1"] for r in results) / total,
+        "locator_top3": sum(r["locate_top3"] for r in results) / total,
+        "correction": sum(r["corrected"] for r in results) / total,
+    }
+
+
+def summarize(results):
+    """
+    Retourne :
+        {
+            "global": {cas, matcher_top1, matcher_top3, locator_ligne, locator_top3, correction},
+            "par_id": {id: mêmes taux},
+            "calibration": {borne basse: {cas, confiance_moyenne, ligne_juste}},
+            "latence_ms": {étape: {"p50": ms, "p90": ms, "p99": ms, "max": ms}}
+        }
+    """
+    by_id = {}
+    for result in results:
+        by_id.setdefault(result["expected_id"], []).append(result)
+
+    # Calibration : la ligne est-elle juste aussi souvent que la confiance l'annonce ?
+    calibration = {}
+    for low in CONFIDENCE_BINS:
+        high = min((b for b in CONFIDENCE_BINS if b > low), default=1.01)
+        group = [r for r in results if low <= r["located_confidence"] < high]
+        if group:
+            calibration[f"{low:.2f}"] = {
+                "cas": len(group),
+                "confiance_moyenne": round(sum(r["located_confidence"] for r in group) / len(group), 3),
+                "ligne_juste": round(sum(r["locate_top1"] for r in group) / len(group), 3),
+            }
+
+    latency = {}
+    for stage in STAGES:
+        values = sorted(result["times"][stage] * 1000 for result in results)
+        latency[stage] = {f"p{percent}": round(_percentile(values, percent), 2) for percent in PERCENTILES}
+        latency[stage]["max"] = round(values[-1], 2) if values else 0.0
+
+    return {
+        "global": _rates(results),
+        "par_id": {error_id: _rates(group) for error_id, group in sorted(by_id.items())},
+        "calibration": calibration,
+        "latence_ms": latency,
+    }
+
+
+def _delta(value, old, percent=True):
+    if old is None:
+        return ""
+    diff = value - old
+    if percent:
+        return f" ({diff * 100:+.0f})" if round(diff * 100) else ""
+    return f" ({diff:+.1f})" if abs(diff) >= 0.05 else ""
+
+
+def print_summary(summary, baseline=None):
+    """Tableaux justesse par id + latence par étape (écarts avec baseline entre parenthèses)"""
+    old_ids = (baseline or {}).get("par_id", {})
+    print(f"\n{'id attendu':<12} {'cas':>5} {'matcher':>12} {'top 3':>12} {'ligne':>12} "
+          f"{'top 3':>12} {'corrigé':>12}")
+    rows = list(summary["par_id"].items()) + [("total", summary["global"])]
+    for error_id, rates in rows:
+        old = (baseline or {}).get("global") if error_id == "total" else old_ids.get(error_id)
+        cells = []
+        for key in ("matcher_top1", "matcher_top3", "locator_ligne", "locator_top3", "correction"):
+            cells.append(f"{rates[key]:.0%}{_delta(rates[key], old and old.get(key))}")
+        print(f"{error_id:<12} {rates['cas']:>5} " + " ".join(f"{cell:>12}" for cell in cells))
+
+    print(f"\n{'confiance':<12} {'cas':>5} {'annoncée':>12} {'ligne juste':>12}")
+    for low, row in summary["calibration"].items():
+        print(f"{'≥ ' + low:<12} {row['cas']:>5} {row['confiance_moyenne']:>12.0%} {row['ligne_juste']:>12.0%}")
+
+    old_latency = (baseline or {}).get("latence_ms", {})
+    print(f"\n{'étape':<12} " + " ".join(f"{name:>16}" for name in [f"p{p} (ms)" for p in PERCENTILES] + ["max (ms)"]))
+    for stage, values in summary["latence_ms"].items():
+        old = old_latency.get(stage, {})
+        cells = [f"{value:.1f}{_delta(value, old.get(key), percent=False)}" for key, value in values.items()]
+        print(f"{stage:<12} " + " ".join(f"{cell:>16}" for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", help="corpus écrit par corpus.py (par défaut : généré en mémoire)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-size-kb", type=int, help="ignorer les fichiers de départ plus gros")
+    parser.add_argument("--save", help="écrire le résumé (et le détail des cas) en JSON")
+    parser.add_argument("--baseline", help="résumé JSON d'une exécution précédente à comparer")
+    parser.add_argument("--verbose", action="store_true", help="afficher chaque cas raté")
+    args = parser.parse_args()
+
+    if args.corpus:
+        cases = read_corpus(args.corpus)
+    else:
+        cases = iter_cases(args.seed, args.max_size_kb * 1024 if args.max_size_kb else None)
+
+    results, unbroken = [], 0
+    for case in cases:
+        result = run_case(case)
+        if result is None:
+            unbroken += 1
+            continue
+        results.append(result)
+        if args.verbose and not (result["match_top1"] and result["locate_top1"] and result["corrected"]):
+            print(f"  {result['case']:<70} id {result['matched_id']} ligne {result['located_line']} "
+                  f"(attendu {result['expected_id']} ligne {result['line']})"
+                  f"{'' if result['corrected'] else ', non corrigé'}")
+
+    if not results:
+        print("Aucun cas exploitable.")
+        return
+    summary = summarize(results)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["summary"]
+    print_summary(summary, baseline)
+    if unbroken:
+        print(f"\n{unbroken} cas ignoré(s) : la faute injectée n'empêche pas le parsing")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "cases": results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
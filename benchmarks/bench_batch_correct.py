@@ -0,0 +1,123 @@
+"""
+bench_batch_correct.py
+Débit de correct_folder() sur un corpus synthétique : des copies des
+fichiers vanilla (types.xml découpé, cfgeventspawns, territoires...) et
+des JSON, cassées comme après une modification en masse ratée.
+
+Affiche, pour plusieurs nombres de workers : fichiers/s, Ko/s et la part
+des fichiers qui se parsent après correction.
+
+Lancement depuis la racine du projet :
+    python benchmarks/bench_batch_correct.py [--files 200] [--workers 1 2 4] [--seed 0]
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules.batch import correct_folder  # noqa: E402
+
+
+# ==============================
+# CORPUS
+# ==============================
+def source_documents():
+    """Documents valides servant de base : (extension, texte)"""
+    docs = []
+    types_xml = (ROOT / "data" / "vanilla" / "chernarus" / "types.xml").read_text(encoding="utf-8")
+    # types.xml découpé en morceaux de ~200 types (taille d'un fichier de mod)
+    blocks = re.findall(r"\s*<type .*?</type>", types_xml, re.S)
+    for start in range(0, len(blocks), 200):
+        docs.append((".xml", "<types>" + "".join(blocks[start:start + 200]) + "\n</types>\n"))
+    for path in sorted((ROOT / "data").glob("*.xml")):
+        docs.append((".xml", path.read_text(encoding="utf-8")))
+    return docs
+
+
+def json_document(rng):
+    items = [{
+        "name": f"Item_{rng.randint(0, 9999)}",
+        "nominal": rng.randint(0, 50),
+        "usage": rng.sample(["Military", "Police", "Town", "Village"], 2),
+    } for _ in range(rng.randint(20, 200))]
+    return json.dumps({"items": items}, indent=4)
+
+
+XML_BREAKS = [
+    ("/>", ">"),                      # auto-fermante sans /
+    ('name="weapons"', 'name="weapons &"'),
+    ("</type>", ""),                  # balise fermante perdue
+]
+JSON_BREAKS = [
+    ("\n    ]", ",\n    ]"),          # virgule finale
+    ('"nominal"', "'nominal'"),
+]
+
+
+def break_text(rng, text, breaks):
+    """Casse 1 à 3 occurrences au hasard"""
+    for _ in range(rng.randint(1, 3)):
+        old, new = rng.choice(breaks)
+        positions = [m.start() for m in re.finditer(re.escape(old), text)]
+        if positions:
+            pos = rng.choice(positions)
+            text = text[:pos] + new + text[pos + len(old):]
+    return text
+
+
+def build_corpus(folder, count, rng):
+    """Écrit count fichiers (un quart valides) dans folder. Retourne la taille totale."""
+    sources = source_documents()
+    total = 0
+    for index in range(count):
+        if index % 5 == 4:
+            suffix, text = ".json", json_document(rng)
+            breaks = JSON_BREAKS
+        else:
+            suffix, text = rng.choice(sources)
+            breaks = XML_BREAKS
+        if index % 4:
+            text = break_text(rng, text, breaks)
+        path = Path(folder) / f"serveur_{index % 10}" / f"fichier_{index:04d}{suffix}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        total += len(text.encode("utf-8"))
+    return total
+
+
+# ==============================
+# MESURE
+# ==============================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp) / "corpus"
+        size = build_corpus(corpus, args.files, random.Random(args.seed))
+        print(f"Corpus : {args.files} fichiers, {size / 1024 / 1024:.1f} Mo\n")
+        print(f"{'workers':>7} {'mode':>6} {'temps (s)':>10} {'fichiers/s':>11} {'Ko/s':>8} "
+              f"{'valides après':>14}")
+
+        for workers in args.workers:
+            for mode in ("copy", "patch"):
+                output = Path(tmp) / f"sortie_{workers}_{mode}"
+                report = correct_folder(corpus, output, mode=mode, workers=workers)
+                valid = sum(1 for f in report["files"] if f["valid_after"])
+                print(f"{workers:>7} {mode:>6} {report['seconds']:>10.2f} "
+                      f"{report['files_per_second']:>11.1f} {report['bytes_per_second'] / 1024:>8.0f} "
+                      f"{valid:>7}/{len(report['files'])}")
+
+
+if __name__ == "__main__":
+    main()
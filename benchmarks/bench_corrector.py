@@ -0,0 +1,217 @@
+"""
+bench_corrector.py
+Compare le correcteur XML en une passe (auto_correct) à l'ancienne chaîne
+de fix_xml_* appliqués l'un après l'autre (copie figée ci-dessous), sur des
+types.xml vanilla cassés.
+
+Lancement depuis la racine du projet :
+    python benchmarks/bench_corrector.py [--repeat 3]
+"""
+
+import argparse
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules.corrector import auto_correct  # noqa: E402
+
+
+# ==============================
+# ANCIENNE CHAÎNE (référence figée)
+# ==============================
+# Copie conforme des fix_xml_* de corrector.py avant le correcteur en une
+# passe : c'est la référence du gain, elle ne doit plus évoluer. Ses
+# défauts connus (fermantes ajoutées en fin de fichier, fermante et
+# ouvrante sur la même ligne non appariées) font partie de la mesure.
+def fix_xml_self_closing_tags(content):
+    """
+    Corrige les balises auto-fermantes mal écrites
+    <current actual="0.45"> → <current actual="0.45" />
+    """
+    corrected = content
+    applied = []
+
+    # Liste des balises DayZ connues comme auto-fermantes
+    self_closing_tags = [
+        'current', 'fog', 'overcast', 'rain', 'storm',
+        'hoarder', 'damage', 'usage', 'value', 'category',
+        'tier', 'cargo', 'item'
+    ]
+
+    for tag in self_closing_tags:
+        # Pattern : <tag ...> (sans /> et sans contenu ni </tag>)
+        pattern = rf'<{tag}(\s[^>]*)?(?<!/)>'
+
+        # Vérifier qu'il n'y a pas de </tag> après
+        matches = list(re.finditer(pattern, corrected))
+
+        for match in reversed(matches):  # Parcourir à l'envers pour ne pas décaler les positions
+            tag_content = match.group(0)
+            start_pos = match.start()
+            end_pos = match.end()
+
+            # Vérifier qu'il n'y a pas de balise fermante correspondante
+            after_tag = corrected[end_pos:end_pos+100]
+            if f'</{tag}>' not in after_tag:
+                # C'est bien une balise qui devrait être auto-fermante
+                corrected_tag = tag_content[:-1] + ' />'
+                corrected = corrected[:start_pos] + corrected_tag + corrected[end_pos:]
+                applied.append(f"Ajout de /> à la balise <{tag}>")
+
+    return corrected, applied
+
+
+def fix_xml_unclosed_comments(content):
+    """
+    Corrige les commentaires XML non fermés
+    <!-- commentaire → <!-- commentaire -->
+    """
+    corrected = content
+    applied = []
+
+    # Compter les <!-- et les -->
+    open_count = content.count('<!--')
+    close_count = content.count('-->')
+
+    if open_count > close_count:
+        # Il manque des fermetures
+        missing = open_count - close_count
+        corrected += '\n' + ('-->\n' * missing)
+        applied.append(f"Fermeture de {missing} commentaire(s) XML")
+
+    return corrected, applied
+
+
+def fix_xml_unescaped_chars(content):
+    """
+    Échappe les caractères spéciaux XML
+    & → &amp; (sauf si déjà échappé)
+    """
+    corrected = content
+    applied = []
+
+    # Échapper & qui ne sont pas déjà échappés
+    unescaped_count = len(re.findall(r'&(?!(amp|lt|gt|quot|apos);)', corrected))
+    if unescaped_count > 0:
+        corrected = re.sub(r'&(?!(amp|lt|gt|quot|apos);)', '&amp;', corrected)
+        applied.append(f"Échappement de {unescaped_count} caractère(s) &")
+
+    return corrected, applied
+
+
+def fix_xml_unclosed_tags(content):
+    """
+    Détecte et ferme les balises XML non fermées
+    """
+    lines = content.split('\n')
+    open_tags = []
+    applied = []
+
+    for line_num, line in enumerate(lines, start=1):
+        # Ignorer commentaires
+        line_clean = re.sub(r'<!--.*?-->', '', line)
+
+        # Ignorer balises auto-fermantes
+        line_clean = re.sub(r'<[^>]+/>', '', line_clean)
+
+        # Trouver balises fermantes
+        closing_tags = re.findall(r'</(\w+)>', line_clean)
+        for tag in closing_tags:
+            if open_tags and open_tags[-1][0] == tag:
+                open_tags.pop()
+
+        # Trouver balises ouvrantes
+        opening_tags = re.findall(r'<(\w+)(?:\s[^>]*)?>(?![^<]*/>)', line_clean)
+        for tag in opening_tags:
+            open_tags.append((tag, line_num, line))
+
+    # Ajouter les balises fermantes manquantes
+    if open_tags:
+        corrected = content
+        for tag_name, line_num, original_line in reversed(open_tags):
+            indent = len(original_line) - len(original_line.lstrip())
+            closing_tag = '\n' + (' ' * indent) + f'</{tag_name}>'
+            corrected += closing_tag
+            applied.append(f"Ajout de </{tag_name}>")
+
+        return corrected, applied
+
+    return content, []
+
+
+def legacy_correct_xml(content):
+    """Ancienne chaîne : 4 passages complets, reconstruction de la chaîne à chaque correction"""
+    corrected = content
+    applied = []
+    for fixer in (fix_xml_self_closing_tags, fix_xml_unescaped_chars,
+                  fix_xml_unclosed_comments, fix_xml_unclosed_tags):
+        corrected, done = fixer(corrected)
+        applied.extend(done)
+    return {"corrected": corrected, "applied_corrections": applied}
+
+
+def broken_variants(content):
+    """Quelques cassures typiques, réparties dans tout le fichier"""
+    yield "toutes les usage/value/category sans />", re.sub(
+        r'<(usage|value|category) name="([^"]*)"/>', r'<\1 name="\2">', content)
+    yield "auto-fermantes (1 <usage> sur 10 sans />)", _break_every(content, '<usage name="Military"/>',
+                                                                      '<usage name="Military">', 10)
+    yield "& non échappés (1 sur 50 <category>)", _break_every(content, '<category name="weapons"/>',
+                                                                 '<category name="weapons &"/>', 50)
+    yield "commentaire non fermé en fin", content + "\n<!-- fin"
+    yield "fichier valide", content
+
+
+def _break_every(content, old, new, step):
+    parts = content.split(old)
+    out = [parts[0]]
+    for idx, part in enumerate(parts[1:]):
+        out.append(new if idx % step == 0 else old)
+        out.append(part)
+    return "".join(out)
+
+
+def _parses(text):
+    try:
+        ET.fromstring(text)
+        return "oui"
+    except ET.ParseError:
+        return "non"
+
+
+def _timed(func, content, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(content)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--file", default=str(ROOT / "data" / "vanilla" / "chernarus" / "types.xml"))
+    args = parser.parse_args()
+
+    content = Path(args.file).read_text(encoding="utf-8")
+    print(f"Fichier : {args.file} ({len(content) / 1024:.0f} Ko)\n")
+    print(f"{'cas':<42} {'ancien (s)':>11} {'une passe (s)':>14} {'gain':>7} "
+          f"{'XML valide après (ancien/nouveau)':>34}")
+
+    for label, broken in broken_variants(content):
+        legacy_time, legacy_result = _timed(legacy_correct_xml, broken, args.repeat)
+        new_time, new_result = _timed(lambda text: auto_correct(text, "xml"), broken, args.repeat)
+        validity = f"{_parses(legacy_result['corrected'])}/{_parses(new_result['corrected'])}"
+        print(f"{label:<42} {legacy_time:>11.3f} {new_time:>14.3f} "
+              f"{legacy_time / max(new_time, 1e-9):>6.1f}x {validity:>34}")
+
+
+if __name__ == "__main__":
+    main()
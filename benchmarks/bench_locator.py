@@ -0,0 +1,158 @@
+"""
+bench_locator.py
+Latence et justesse de locate_real_error() sur des variantes cassées des
+fichiers vanilla, et de locate_json_error() sur des cfgEffectArea.json
+synthétiques de plusieurs Mo : pour chaque cassure, on sait à quelle ligne
+elle a été faite, et on vérifie que le localisateur la retrouve (en premier
+candidat, ou parmi les 3 premiers).
+
+Lancement depuis la racine du projet :
+    python benchmarks/bench_locator.py [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules.locator import locate_json_error, locate_real_error  # noqa: E402
+
+
+FILES = [
+    ROOT / "data" / "vanilla" / "chernarus" / "types.xml",
+    ROOT / "data" / "cfgeventspawns_chernarus.xml",
+    ROOT / "data" / "cfgplayerspawnpoints_sakhal.xml",
+    ROOT / "data" / "zombie_territories_chernarus.xml",
+]
+
+# (libellé, texte cherché, remplacement) : cassure faite au tiers du fichier
+BREAKS = [
+    ("fermante supprimée", "</", "<"),
+    ("commentaire non fermé", "\n", "\n<!-- "),
+    ("attribut sans guillemets", '="', "="),
+    ("attribut incomplet", '"/>', '=/>'),
+    ("& non échappé", '">', '" &>'),
+]
+
+
+# Cassures JSON
+JSON_BREAKS = [
+    ("accolade manquante", "\n            }", ""),
+    ("virgule finale", "\n                ]", ",\n                ]"),
+    ("clé sans guillemets", '"Radius"', "Radius"),
+    ("apostrophes", '"AreaName"', "'AreaName'"),
+    ("crochet manquant", "\n                ]", ""),
+]
+
+
+def effect_area_json(areas, rng):
+    """cfgEffectArea.json synthétique (indentation de 4, comme les fichiers vanilla)"""
+    data = {
+        "Areas": [{
+            "AreaName": f"Zone_{index}",
+            "Type": "ContaminatedArea_Static",
+            "TriggerType": "ContaminatedTrigger",
+            "Data": {
+                "Pos": [round(rng.uniform(0, 15360), 2), 0, round(rng.uniform(0, 15360), 2)],
+                "Radius": rng.randint(50, 300),
+                "PosHeight": 22,
+                "NegHeight": 10,
+                "InnerRingCount": 2,
+                "InnerPartDist": 50,
+                "OuterRingToggle": 1,
+                "ParticleName": "graphics/particles/contaminated_area_gas_bigass",
+            },
+            "PlayerData": {
+                "AroundPartName": "graphics/particles/contaminated_area_gas_around",
+                "TinyPartName": "graphics/particles/contaminated_area_gas_around_tiny",
+                "PPERequesterType": "PPERequester_ContaminatedAreaTint",
+            },
+        } for index in range(areas)],
+        "SafePositions": [[round(rng.uniform(0, 15360), 1), round(rng.uniform(0, 15360), 1)]
+                          for _ in range(areas)],
+    }
+    return json.dumps(data, indent=4)
+
+
+def break_at_third(content, old, new):
+    """Remplace la première occurrence de old après le premier tiers. Retourne (texte, ligne)."""
+    pos = content.find(old, len(content) // 3)
+    if pos == -1:
+        return None, None
+    # Ligne du premier caractère réellement modifié
+    changed = pos + len(os.path.commonprefix([old, new]))
+    line = content.count("\n", 0, changed) + 1
+    return content[:pos] + new + content[pos + len(old):], line
+
+
+def _timed(func, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'fichier':<34} {'cassure':<26} {'taille':>8} {'temps (ms)':>11} "
+          f"{'ligne cassée':>13} {'trouvée':>8} {'top 3':>6}")
+    found_right = in_top3 = total = 0
+    for path in FILES:
+        content = path.read_text(encoding="utf-8")
+        for label, old, new in BREAKS:
+            broken, line = break_at_third(content, old, new)
+            if broken is None:
+                continue
+            try:
+                ET.fromstring(broken)
+                continue
+            except ET.ParseError as e:
+                reported = e.position[0]
+            seconds, located = _timed(lambda: locate_real_error(broken, reported), args.repeat)
+            total += 1
+            found_right += located["real_line"] == line
+            top3 = line in [candidate["line"] for candidate in located["candidates"][:3]]
+            in_top3 += top3
+            print(f"{path.name:<34} {label:<26} {len(broken) / 1024:>6.0f}Ko {seconds * 1000:>11.1f} "
+                  f"{line:>13} {located['real_line']:>8} {'oui' if top3 else 'non':>6}")
+
+    for areas in (1000, 5000, 10000):
+        content = effect_area_json(areas, random.Random(areas))
+        for label, old, new in JSON_BREAKS:
+            broken, line = break_at_third(content, old, new)
+            try:
+                json.loads(broken)
+                continue
+            except json.JSONDecodeError as e:
+                reported = e.lineno
+            seconds, located = _timed(lambda: locate_json_error(broken, reported), args.repeat)
+            # Les cassures "manquante" : la bonne ligne est celle de l'ouverture
+            # (la cassure supprime la fermeture, qu'on ne peut pas localiser)
+            expected = line if not label.endswith("manquante") and not label.endswith("manquant") else None
+            lines = [candidate["line"] for candidate in located["candidates"][:3]]
+            if expected is not None:
+                total += 1
+                found_right += located["real_line"] == expected
+                in_top3 += expected in lines
+            print(f"{f'cfgEffectArea ({areas} zones)':<34} {label:<26} {len(broken) / 1024:>6.0f}Ko "
+                  f"{seconds * 1000:>11.1f} {expected or '-':>13} {located['real_line']:>8} "
+                  f"{('oui' if expected in lines else 'non') if expected else '-':>6}")
+
+    print(f"\nLigne de la cassure retrouvée : {found_right}/{total} en premier, {in_top3}/{total} dans les 3 premiers")
+
+
+if __name__ == "__main__":
+    main()
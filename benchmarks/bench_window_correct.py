@@ -0,0 +1,74 @@
+"""
+bench_window_correct.py
+Latence de la correction par fenêtre (correct_window) comparée à la
+correction du document entier (correct_until_valid), quand la taille du
+fichier augmente et qu'il n'y a qu'une seule erreur, au milieu.
+
+Les fichiers sont des types.xml vanilla dupliqués (x1, x2, x4, x8).
+
+Lancement depuis la racine du projet :
+    python benchmarks/bench_window_correct.py [--repeat 3]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules.repair import correct_until_valid, correct_window  # noqa: E402
+
+
+def scaled_types(content, factor):
+    """types.xml avec factor fois plus de <type>"""
+    blocks = "".join(re.findall(r"\s*<type .*?</type>", content, re.S))
+    return "<types>" + blocks * factor + "\n</types>\n"
+
+
+def break_middle(content, old, new):
+    """Remplace la première occurrence de old après le milieu du fichier"""
+    pos = content.index(old, len(content) // 2)
+    return content[:pos] + new + content[pos + len(old):]
+
+
+CASES = [
+    ("<value> sans />", '"/>', '">'),
+    ("& non échappé", 'name="', 'name="A&B '),
+    ("</nominal> manquant", "</nominal>", ""),
+    ("</type> manquant", "</type>", ""),
+]
+
+
+def _timed(func, content, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(content)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--file", default=str(ROOT / "data" / "vanilla" / "chernarus" / "types.xml"))
+    args = parser.parse_args()
+
+    content = Path(args.file).read_text(encoding="utf-8")
+    print(f"{'cas':<22} {'taille':>8} {'document (s)':>13} {'fenêtre (s)':>12} {'même résultat':>14}")
+
+    for label, old, new in CASES:
+        for factor in (1, 2, 4, 8):
+            broken = break_middle(scaled_types(content, factor), old, new)
+            full_time, full = _timed(lambda text: correct_until_valid(text, "xml"), broken, args.repeat)
+            window_time, window = _timed(lambda text: correct_window(text, "xml"), broken, args.repeat)
+            same = "oui" if window["corrected"] == full["corrected"] and window["valid"] else "non"
+            print(f"{label:<22} {len(broken) / 1024:>6.0f}Ko {full_time:>13.3f} {window_time:>12.3f} {same:>14}")
+
+
+if __name__ == "__main__":
+    main()
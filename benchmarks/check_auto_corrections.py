@@ -0,0 +1,103 @@
+"""
+check_auto_corrections.py
+Vérifie que chaque entrée de errors_db marquée "correction_automatique"
+est vraiment corrigée.
+
+Deux vérifications :
+  1. le drapeau et la règle disent la même chose : une entrée marquée
+     corrigeable a une action de correction implémentée (voir
+     rules.CORRECTION_ACTIONS), et une entrée avec une action est marquée ;
+  2. sur le corpus de fichiers cassés (voir corpus.py), validate() rend un
+     fichier valide pour au moins --min-rate des cas de chaque id marqué.
+     Les exemples de errors_db sont des extraits (exemple_après ne se parse
+     pas toujours seul) : ils ne servent pas ici.
+
+Lancement depuis la racine du projet :
+    python benchmarks/check_auto_corrections.py [--seed 0] [--max-size-kb 300] [--min-rate 0.8] [--verbose]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.corpus import iter_cases  # noqa: E402
+from modules.knowledge_base import get_knowledge_base  # noqa: E402
+from modules.validator import validate  # noqa: E402
+
+
+# ==============================
+# VÉRIFICATIONS
+# ==============================
+def check_flags(kb):
+    """
+    Retourne :
+        (ids marqués corrigeables, problèmes) → problèmes : [str, ...]
+    """
+    auto_ids = kb.rules()["auto_ids"]
+    flagged = set()
+    problems = []
+    for entry in kb.entries():
+        if entry.get("correction_automatique"):
+            flagged.add(entry["id"])
+            if entry["id"] not in auto_ids:
+                problems.append(f"{entry['id']} : marqué corrigeable sans action de correction")
+        elif entry["id"] in auto_ids:
+            problems.append(f"{entry['id']} : action de correction mais non marqué corrigeable")
+    return flagged, problems
+
+
+def correction_rates(flagged, cases, verbose=False):
+    """
+    Retourne :
+        {id: (cas corrigés, cas)} pour chaque id marqué
+    """
+    rates = {error_id: [0, 0] for error_id in flagged}
+    for case in cases:
+        if case["expected_id"] not in rates:
+            continue
+        result = validate(case["content"], case["file_type"])
+        if result["valid"]:
+            continue    # la faute injectée n'empêche pas le parsing
+        corrected = bool(result.get("corrected_valid"))
+        rates[case["expected_id"]][0] += corrected
+        rates[case["expected_id"]][1] += 1
+        if verbose and not corrected:
+            print(f"  non corrigé : {case['case']}")
+    return {error_id: tuple(counts) for error_id, counts in rates.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-size-kb", type=int, default=300, help="ignorer les fichiers de départ plus gros")
+    parser.add_argument("--min-rate", type=float, default=0.8, help="part minimale de cas corrigés par id")
+    parser.add_argument("--verbose", action="store_true", help="afficher chaque cas non corrigé")
+    args = parser.parse_args()
+
+    flagged, problems = check_flags(get_knowledge_base())
+    cases = iter_cases(args.seed, args.max_size_kb * 1024 if args.max_size_kb else None)
+    rates = correction_rates(flagged, cases, args.verbose)
+
+    print(f"{'id':<10} {'corrigés':>10} {'cas':>6} {'taux':>7}")
+    for error_id in sorted(rates):
+        corrected, total = rates[error_id]
+        if not total:
+            problems.append(f"{error_id} : aucun cas dans le corpus")
+            print(f"{error_id:<10} {'-':>10} {0:>6} {'-':>7}")
+            continue
+        rate = corrected / total
+        if rate < args.min_rate:
+            problems.append(f"{error_id} : {rate:.0%} des cas corrigés (minimum {args.min_rate:.0%})")
+        print(f"{error_id:<10} {corrected:>10} {total:>6} {rate:>7.0%}")
+
+    for problem in problems:
+        print(f"ÉCHEC {problem}")
+    print(f"\n{len(problems)} problème(s) sur {len(flagged)} id(s) marqué(s) corrigeable(s)")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+check_serialization.py
+Vérifie que les résultats de validate() se sérialisent en JSON, pour
+chaque sorte de fichier et chaque chemin d'erreur.
+
+Pour chaque document :
+  1. json.dumps(résultat) passe (aucun objet Message ne traîne dedans) ;
+  2. chaque message est rangé par sa seule clé (champ_key, champ_params, voir
+     modules/messages.py), sans texte déjà rendu à côté, et se rend dans
+     chaque langue ;
+  3. render_fields(résultat, langue) donne les mêmes textes que render_field
+     et se sérialise aussi ;
+  4. les constats de iter_findings s'écrivent en JSON Lines dans chaque langue.
+
+Lancement depuis la racine du projet :
+    python benchmarks/check_serialization.py [--verbose]
+"""
+
+import argparse
+import io
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules.batch import _validate_safe  # noqa: E402
+from modules.messages import LOCALES, render_field, render_fields  # noqa: E402
+from modules.report import JsonlReportWriter, iter_findings  # noqa: E402
+from modules.validator import validate  # noqa: E402
+
+
+TYPES_XML = """<types>
+    <type name="AKM">
+        <nominal>2</nominal>
+        <lifetime>0</lifetime>
+        <restock>0</restock>
+        <min>5</min>
+        <quantmin>80</quantmin>
+        <quantmax>20</quantmax>
+        <cost>100</cost>
+    </type>
+</types>
+"""
+
+EVENTS_XML = """<events>
+    <event name="VehicleCivilianSedan">
+        <nominal>1</nominal>
+        <min>4</min>
+        <max>2</max>
+        <lifetime>0</lifetime>
+        <restock>0</restock>
+        <saferadius>500</saferadius>
+        <distanceradius>500</distanceradius>
+        <cleanupradius>200</cleanupradius>
+        <flags deletable="0" init_random="0" remove_damaged="1"/>
+        <position>fixed</position>
+        <limit>mixed</limit>
+        <active>0</active>
+        <children>
+            <child lootmax="1" lootmin="3" max="1" min="2" type="CivilianSedan"/>
+        </children>
+    </event>
+</events>
+"""
+
+ECONOMY_XML = """<economy>
+    <dynamic init="0" load="1" respawn="1" save="0"/>
+    <animals init="1" load="0" respawn="1" save="0"/>
+    <zombies init="1" load="0" respawn="1" save="0"/>
+    <vehicles init="1" load="1" respawn="1" save="1"/>
+    <randoms init="0" load="0" respawn="1" save="0"/>
+    <custom init="0" load="0" respawn="0" save="0"/>
+    <building init="1" load="1" respawn="0" save="1"/>
+    <player init="1" load="1" respawn="1" save="1"/>
+</economy>
+"""
+
+# (nom, fabrique du résultat)
+DOCUMENTS = [
+    ("xml valide", lambda: validate('<types><type name="a"/></types>', "xml")),
+    ("xml fermante croisée", lambda: validate("<a>\n<b>\n</a>\n", "xml")),
+    ("xml balise non fermée", lambda: validate('<types>\n<type name="a">\n<nominal>1</nominal>\n</types>\n', "xml")),
+    ("xml attribut sans guillemets", lambda: validate("<types>\n<type name=a>\n</type>\n</types>\n", "xml")),
+    ("json valide", lambda: validate('{"a": [1, 2]}', "json")),
+    ("json virgule finale", lambda: validate('{\n  "a": [1, 2],\n}\n', "json")),
+    ("json fermeture manquante", lambda: validate('{\n  "a": [1, 2\n}\n', "json")),
+    ("json imbrication trop profonde", lambda: validate("[" * 100000 + "]" * 100000, "json")),
+    ("type non supporté", lambda: validate("a: 1", "yaml")),
+    ("types.xml règles métier", lambda: validate(TYPES_XML, "xml", fix_semantic=True)),
+    ("events.xml règles métier", lambda: validate(EVENTS_XML, "xml", fix_semantic=True)),
+    ("economy.xml règles métier", lambda: validate(ECONOMY_XML, "xml", fix_semantic=True)),
+    ("erreur interne (lot)", lambda: _validate_safe(None, "xml")),
+]
+
+
+# ==============================
+# VÉRIFICATIONS
+# ==============================
+def iter_message_fields(value):
+    """(dict, champ) pour chaque message rangé avec sa clé, à toute profondeur"""
+    if isinstance(value, dict):
+        for key in value:
+            if isinstance(key, str) and key.endswith("_key") and f"{key[:-4]}_params" in value:
+                yield value, key[:-4]
+        for item in value.values():
+            yield from iter_message_fields(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from iter_message_fields(item)
+
+
+def check_result(result):
+    """
+    Retourne :
+        (problèmes, nombre de messages vérifiés) → problèmes : [str, ...]
+    """
+    problems = []
+    try:
+        json.dumps(result, ensure_ascii=False)
+    except (TypeError, ValueError) as e:
+        problems.append(f"json.dumps : {e}")
+
+    checked = 0
+    for record, field in iter_message_fields(result):
+        checked += 1
+        if field in record:
+            problems.append(f"{field} : texte déjà rendu dans le résultat ({record[field]!r})")
+        for locale in LOCALES:
+            if not render_field(record, field, locale):
+                problems.append(f"{field} : rendu {locale} vide")
+
+    for locale in LOCALES:
+        rendered = render_fields(result, locale)
+        try:
+            json.dumps(rendered, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            problems.append(f"render_fields {locale} : {e}")
+        for record, field in iter_message_fields(rendered):
+            if record.get(field) != render_field(record, field, locale):
+                problems.append(f"render_fields {locale} : {field} = {record.get(field)!r}")
+
+    for locale in LOCALES:
+        stream = io.StringIO()
+        try:
+            JsonlReportWriter(stream, locale).write_all(iter_findings(result, "document"))
+        except (TypeError, ValueError) as e:
+            problems.append(f"rapport {locale} : {e}")
+    return problems, checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--verbose", action="store_true", help="afficher chaque document vérifié")
+    args = parser.parse_args()
+
+    failures = 0
+    for name, build in DOCUMENTS:
+        problems, checked = check_result(build())
+        if problems:
+            failures += 1
+            print(f"ÉCHEC {name}")
+            for problem in problems:
+                print(f"    {problem}")
+        elif args.verbose:
+            print(f"ok    {name} ({checked} message(s) avec clé)")
+
+    print(f"\n{len(DOCUMENTS) - failures}/{len(DOCUMENTS)} document(s) sérialisables")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
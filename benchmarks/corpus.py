@@ -0,0 +1,322 @@
+"""
+corpus.py
+Corpus de fichiers DayZ cassés, étiquetés, pour mesurer le matcher, le
+locator et le correcteur (voir bench_accuracy.py).
+
+Chaque cas part d'un fichier vanilla (types.xml des trois cartes à
+plusieurs tailles, cfgeventspawns, territoires, cfgEffectArea.json
+synthétique) et y injecte une seule faute, à plusieurs endroits du fichier
+(10 %, 50 %, 90 %). Chaque faute correspond à une entrée de errors_db :
+le cas porte l'id attendu et la ligne de la cause (pour une fermeture
+supprimée : la ligne de l'ouverture, c'est là qu'il faut corriger).
+
+Le tirage est déterministe (--seed) : deux corpus générés avec la même
+graine sont identiques, on peut comparer deux versions du code dessus.
+
+Lancement depuis la racine du projet :
+    python benchmarks/corpus.py benchmarks/corpus [--seed 0] [--max-size-kb 4096]
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.bench_locator import effect_area_json  # noqa: E402
+from modules.xml_scanner import CLOSE, OPEN, iter_xml_events  # noqa: E402
+
+
+VANILLA = ROOT / "data" / "vanilla"
+DATA = ROOT / "data"
+
+# Endroits du fichier où la faute est injectée (fraction de la taille)
+POSITIONS = (0.1, 0.5, 0.9)
+# Parmi les occurrences qui suivent cette position, on tire dans les premières
+_CHOICES = 20
+
+
+# ==============================
+# FICHIERS DE DÉPART
+# ==============================
+def _types_blocks(content):
+    return re.findall(r"\n[ \t]*<type .*?</type>", content, re.S)
+
+
+def scaled_types(content, count=None, factor=1):
+    """types.xml réduit aux count premiers <type>, ou répété factor fois"""
+    blocks = _types_blocks(content)
+    if count is not None:
+        blocks = blocks[:count]
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<types>'
+            + "".join(blocks) * factor + "\n</types>\n")
+
+
+def _types(map_name, count=None, factor=1):
+    return lambda: scaled_types((VANILLA / map_name / "types.xml").read_text(encoding="utf-8"), count, factor)
+
+
+def _data_file(name):
+    return lambda: (DATA / name).read_text(encoding="utf-8")
+
+
+def _effect_area(areas):
+    return lambda: effect_area_json(areas, random.Random(areas))
+
+
+# (nom, type, fabrique du contenu)
+BASES = [
+    ("types_chernarus_50", "xml", _types("chernarus", count=50)),
+    ("types_chernarus_500", "xml", _types("chernarus", count=500)),
+    ("types_chernarus", "xml", _types("chernarus")),
+    ("types_chernarus_x3", "xml", _types("chernarus", factor=3)),
+    ("types_livonia", "xml", _types("livonia")),
+    ("types_sakhal", "xml", _types("sakhal")),
+    ("cfgeventspawns_chernarus", "xml", _data_file("cfgeventspawns_chernarus.xml")),
+    ("zombie_territories_chernarus", "xml", _data_file("zombie_territories_chernarus.xml")),
+    ("cfgplayerspawnpoints_sakhal", "xml", _data_file("cfgplayerspawnpoints_sakhal.xml")),
+    ("cfgEffectArea_100", "json", _effect_area(100)),
+    ("cfgEffectArea_1000", "json", _effect_area(1000)),
+    ("cfgEffectArea_5000", "json", _effect_area(5000)),
+]
+
+
+# ==============================
+# FAUTES
+# ==============================
+# Chaque faute : (nom, id errors_db attendu, type, motif, injection).
+# injection(content, match) → (texte remplaçant match, position de la
+# cause dans content) ; la position sert à calculer la ligne attendue.
+def _self_closing_without_slash(content, match):
+    return match.group(0)[:-2].rstrip() + ">", match.start()
+
+
+def _delete_leaf_closer(content, match):
+    return match.group(0)[:match.start(2) - match.start()], match.start()
+
+
+def _delete_block_closer(content, match):
+    # Cause : l'ouvrante de l'élément dont on supprime la fermeture
+    return "", _xml_opener_of(content, match.start(1) - 2)
+
+
+def _unquote_attribute(content, match):
+    return f"{match.group(1)}={match.group(2)}", match.start()
+
+
+def _cut_attribute(content, match):
+    return f"{match.group(1)}=", match.start()
+
+
+def _open_comment(content, match):
+    return match.group(0) + "<!-- ", match.end()
+
+
+def _bare_ampersand(content, match):
+    return f'="{match.group(1)} & Co"', match.start()
+
+
+def _rename_closer(content, match):
+    return f"</{match.group(1)}x>", match.start()
+
+
+def _trailing_comma(content, match):
+    return match.group(1) + "," + match.group(2), match.start(1)
+
+
+def _single_quotes(content, match):
+    return f"'{match.group(1)}':", match.start()
+
+
+def _unquoted_key(content, match):
+    return f"{match.group(1)}:", match.start()
+
+
+def _delete_json_closer(content, match):
+    return "", _json_opener_of(content, match.end() - 1 - (match.group(0).endswith(",")))
+
+
+FAULTS = [
+    ("auto-fermante sans />", "XML_001", "xml",
+     re.compile(r"<(?:usage|value|category|zone|item|cargo)\s[^<>]*?\s*/>"), _self_closing_without_slash),
+    ("fermante de feuille supprimée", "XML_002", "xml",
+     re.compile(r"<([A-Za-z_][\w.-]*)>[^<\n]*(</\1>)"), _delete_leaf_closer),
+    ("fermante de bloc supprimée", "XML_002", "xml",
+     re.compile(r"\n[ \t]*</([A-Za-z_][\w.-]*)>(?=\n)"), _delete_block_closer),
+    ("attribut sans guillemets", "XML_003", "xml",
+     re.compile(r'\b([A-Za-z_][\w.-]*)="([^"<>&\s]+)"'), _unquote_attribute),
+    ("attribut incomplet", "XML_003", "xml",
+     re.compile(r'\b([A-Za-z_][\w.-]*)="[^"<>]*"'), _cut_attribute),
+    ("commentaire non fermé", "XML_004", "xml",
+     re.compile(r"\n[ \t]*(?=<[A-Za-z_])"), _open_comment),
+    ("& non échappé", "XML_005", "xml",
+     re.compile(r'="([^"<>&]+)"'), _bare_ampersand),
+    ("fermante renommée", "XML_006", "xml",
+     re.compile(r"</([A-Za-z_][\w.-]*)>"), _rename_closer),
+    ("virgule finale", "JSON_001", "json",
+     re.compile(r'([^\s{\[,])(\n[ \t]*[}\]])'), _trailing_comma),
+    ("apostrophes", "JSON_002", "json",
+     re.compile(r'"(\w+)":'), _single_quotes),
+    ("clé sans guillemets", "JSON_003", "json",
+     re.compile(r'"(\w+)":'), _unquoted_key),
+    ("fermeture supprimée", "JSON_004", "json",
+     re.compile(r"\n[ \t]*[}\]],?(?=\n)"), _delete_json_closer),
+]
+
+# Nom de faute → partie de l'identifiant des cas
+FAULTS_SLUGS = {fault[0]: re.sub(r"\W+", "_", fault[0]).strip("_") for fault in FAULTS}
+
+
+def _xml_opener_of(content, closer_start):
+    """Position de l'ouvrante qui correspond à la fermante en closer_start"""
+    stack = []
+    for kind, start, end, name, well_formed in iter_xml_events(content, 0, closer_start + 1):
+        if kind == OPEN:
+            stack.append(start)
+        elif kind == CLOSE and stack:
+            stack.pop()
+    return stack[-1] if stack else closer_start
+
+
+def _json_opener_of(content, closer):
+    """Position du { [ refermé par le } ] en closer (pas de { } dans les chaînes du corpus)"""
+    depth = 0
+    for pos in range(closer - 1, -1, -1):
+        char = content[pos]
+        if char in "}]":
+            depth += 1
+        elif char in "{[":
+            if depth == 0:
+                return pos
+            depth -= 1
+    return closer
+
+
+def _depth(content, pos, file_type):
+    """Profondeur d'imbrication à pos (éléments XML ou { [ JSON ouverts)"""
+    if file_type == "json":
+        return sum(content.count(c, 0, pos) for c in "{[") - sum(content.count(c, 0, pos) for c in "}]")
+    depth = 0
+    for kind, start, end, name, well_formed in iter_xml_events(content, 0, pos):
+        depth += 1 if kind == OPEN else -1 if kind == CLOSE else 0
+    return depth
+
+
+# ==============================
+# GÉNÉRATION
+# ==============================
+def inject(content, pattern, injection, fraction, rng):
+    """
+    Injecte une faute après fraction × taille.
+
+    Retourne :
+        (texte cassé, position de la cause dans le texte cassé) ou None si
+        le motif n'apparaît pas après cette position
+    """
+    matches = []
+    for match in pattern.finditer(content, int(len(content) * fraction)):
+        matches.append(match)
+        if len(matches) == _CHOICES:
+            break
+    if not matches:
+        return None
+    match = rng.choice(matches)
+    replacement, cause = injection(content, match)
+    broken = content[:match.start()] + replacement + content[match.end():]
+    # La cause est avant le passage remplacé, ou au début de celui-ci
+    return broken, min(cause, match.start() + len(replacement))
+
+
+def iter_cases(seed=0, max_size=None, positions=POSITIONS):
+    """
+    Cas du corpus, un par (fichier de départ, faute, position).
+
+    Rend (générateur) :
+        {
+            "case": str,            → identifiant unique
+            "base": str,            → fichier de départ (BASES)
+            "file_type": "xml" | "json",
+            "size": int,            → caractères
+            "fault": str,           → nom de la faute (FAULTS)
+            "expected_id": str,     → id errors_db attendu
+            "line": int,            → ligne de la cause (1-based)
+            "position": float,      → endroit du fichier (fraction)
+            "depth": int,           → profondeur d'imbrication de la cause
+            "content": str
+        }
+    """
+    rng = random.Random(seed)
+    for base, file_type, build in BASES:
+        content = build()
+        if max_size is not None and len(content) > max_size:
+            continue
+        for fault, expected_id, fault_type, pattern, injection in FAULTS:
+            if fault_type != file_type:
+                continue
+            for fraction in positions:
+                injected = inject(content, pattern, injection, fraction, rng)
+                if injected is None:
+                    continue
+                broken, cause = injected
+                yield {
+                    "case": f"{base}-{expected_id}-{FAULTS_SLUGS[fault]}-{int(fraction * 100)}",
+                    "base": base,
+                    "file_type": file_type,
+                    "size": len(broken),
+                    "fault": fault,
+                    "expected_id": expected_id,
+                    "line": broken.count("\n", 0, cause) + 1,
+                    "position": fraction,
+                    "depth": _depth(broken, cause, file_type),
+                    "content": broken,
+                }
+
+
+
+# ==============================
+# LECTURE / ÉCRITURE
+# ==============================
+def write_corpus(cases, folder):
+    """Un fichier par cas + manifest.jsonl (une ligne par cas, sans le contenu)"""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with open(folder / "manifest.jsonl", "w", encoding="utf-8") as manifest:
+        for case in cases:
+            case = dict(case)
+            content = case.pop("content")
+            case["file"] = f"{case['case']}.{case['file_type']}"
+            (folder / case["file"]).write_text(content, encoding="utf-8")
+            manifest.write(json.dumps(case, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def read_corpus(folder):
+    """Cas d'un corpus écrit par write_corpus (même format que iter_cases)"""
+    folder = Path(folder)
+    with open(folder / "manifest.jsonl", encoding="utf-8") as manifest:
+        for line in manifest:
+            case = json.loads(line)
+            case["content"] = (folder / case["file"]).read_text(encoding="utf-8")
+            yield case
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("folder", help="dossier du corpus (créé si absent)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-size-kb", type=int, help="ignorer les fichiers de départ plus gros")
+    args = parser.parse_args()
+
+    max_size = args.max_size_kb * 1024 if args.max_size_kb else None
+    count = write_corpus(iter_cases(args.seed, max_size), args.folder)
+    print(f"{count} cas écrits dans {args.folder}")
+
+
+if __name__ == "__main__":
+    main()
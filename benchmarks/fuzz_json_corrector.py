@@ -0,0 +1,195 @@
+"""
+fuzz_json_corrector.py
+Fuzz du correcteur JSON en une passe (auto_correct(..., "json")).
+
+Deux propriétés sont vérifiées sur des documents générés aléatoirement
+(chaînes pleines d'apostrophes, de guillemets échappés, de } ] , : ...) :
+  1. un JSON valide n'est jamais modifié (aucune édition) ;
+  2. un JSON cassé de façon connue (virgules finales, chaînes entre
+     apostrophes, clés sans guillemets, crochets / accolades manquants)
+     redevient valide ET redonne exactement les mêmes données.
+
+Lancement depuis la racine du projet :
+    python benchmarks/fuzz_json_corrector.py [--cases 5000] [--seed 0]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules.corrector import auto_correct  # noqa: E402
+
+
+# Caractères piégeux pour un correcteur qui ne suit pas l'état chaîne
+STRING_ALPHABET = "ab l'arme \"x\" \\ } ] { [ , : é / \t"
+IDENTIFIERS = ["name", "nominal", "lifetime", "restock", "min", "quantmin", "_flags", "usage2"]
+
+
+# ==============================
+# GÉNÉRATION
+# ==============================
+def random_string(rng):
+    return "".join(rng.choice(STRING_ALPHABET) for _ in range(rng.randint(0, 12)))
+
+
+def random_value(rng, depth=0):
+    roll = rng.random()
+    if depth < 4 and roll < 0.2:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    if depth < 4 and roll < 0.45:
+        keys = rng.sample(IDENTIFIERS, rng.randint(0, 4))
+        if rng.random() < 0.3:
+            keys.append(random_string(rng))
+        return {key: random_value(rng, depth + 1) for key in keys}
+    if roll < 0.7:
+        return random_string(rng)
+    return rng.choice([0, -3, 2.5, 1e10, True, False, None])
+
+
+def random_document(rng):
+    """Le document racine est un objet ou un tableau (comme les fichiers DayZ)"""
+    while True:
+        data = random_value(rng)
+        if isinstance(data, (dict, list)):
+            return data
+
+
+# ==============================
+# SÉRIALISATION AVEC DÉFAUTS
+# ==============================
+def _single_quoted(text):
+    body = json.dumps(text, ensure_ascii=False)[1:-1]
+    return "'" + body.replace('\\"', '"').replace("'", "\\'") + "'"
+
+
+def _string(rng, text):
+    if rng.random() < 0.2:
+        return _single_quoted(text)
+    return json.dumps(text, ensure_ascii=False)
+
+
+def dump_broken(rng, data, indent=0, allow_missing=True):
+    """
+    Sérialise data en y injectant des défauts que le correcteur sait réparer
+    sans ambiguïté. Retourne le texte.
+    """
+    pad = "\n" + "  " * (indent + 1)
+    end_pad = "\n" + "  " * indent
+
+    if isinstance(data, dict):
+        parts = []
+        items = list(data.items())
+        missing_next = False
+        for position, (key, value) in enumerate(items):
+            if key.isidentifier() and not missing_next and rng.random() < 0.2:
+                key_text = key
+            else:
+                key_text = _string(rng, key)
+            # Tableau non fermé au milieu d'un objet : "a": [1, 2, "b": ...
+            missing_next = (allow_missing and isinstance(value, list)
+                            and position < len(items) - 1 and rng.random() < 0.2)
+            value_text = dump_broken(rng, value, indent + 1, allow_missing=not missing_next)
+            if missing_next:
+                value_text = value_text[:-1].rstrip().rstrip(",")
+            parts.append(f"{key_text}: {value_text}")
+        trailing = "," if parts and rng.random() < 0.2 else ""
+        if not parts:
+            return "{}"
+        return "{" + pad + ("," + pad).join(parts) + trailing + end_pad + "}"
+
+    if isinstance(data, list):
+        parts = [dump_broken(rng, value, indent + 1, allow_missing) for value in data]
+        trailing = "," if parts and rng.random() < 0.2 else ""
+        if not parts:
+            return "[]"
+        return "[" + pad + ("," + pad).join(parts) + trailing + end_pad + "]"
+
+    if isinstance(data, str):
+        return _string(rng, data)
+    return json.dumps(data)
+
+
+def truncate_closers(rng, text):
+    """Enlève une partie des fermetures finales (fichier coupé en fin)"""
+    stripped = text.rstrip()
+    count = 0
+    while count < len(stripped) and stripped[len(stripped) - 1 - count] in "}] \n":
+        count += 1
+    cut = rng.randint(0, count)
+    return stripped[:len(stripped) - cut]
+
+
+# ==============================
+# PROPRIÉTÉS
+# ==============================
+def check_valid_untouched(rng, cases):
+    failures = 0
+    for _ in range(cases):
+        data = random_document(rng)
+        text = json.dumps(data, ensure_ascii=rng.random() < 0.5,
+                          indent=rng.choice([None, 2, 4]),
+                          separators=rng.choice([None, (",", ":"), (", ", ": ")]))
+        correction = auto_correct(text, "json")
+        if correction["edits"]:
+            failures += 1
+            if failures <= 3:
+                print(f"  ✗ JSON valide modifié : {text!r}\n    → {correction['corrected']!r}")
+    return failures
+
+
+def check_broken_repaired(rng, cases):
+    failures = 0
+    for _ in range(cases):
+        data = random_document(rng)
+        text = truncate_closers(rng, dump_broken(rng, data))
+        corrected = auto_correct(text, "json")["corrected"]
+        try:
+            ok = json.loads(corrected) == data
+        except json.JSONDecodeError:
+            ok = False
+        if not ok:
+            failures += 1
+            if failures <= 3:
+                print(f"  ✗ mal réparé : {text!r}\n    → {corrected!r}")
+    return failures
+
+
+def check_linear(rng):
+    """Temps par Ko sur des documents de taille croissante (doit rester stable)"""
+    for size in (100, 1000, 10000):
+        text = dump_broken(rng, [random_document(rng) for _ in range(size)])
+        start = time.perf_counter()
+        auto_correct(text, "json")
+        elapsed = time.perf_counter() - start
+        print(f"  {len(text) / 1024:>8.0f} Ko : {elapsed:.3f} s ({elapsed * 1e6 / len(text) * 1024:.0f} µs/Ko)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"JSON valide jamais modifié ({args.cases} cas)")
+    untouched = check_valid_untouched(rng, args.cases)
+    print(f"  échecs : {untouched}")
+
+    print(f"JSON cassé réparé à l'identique ({args.cases} cas)")
+    repaired = check_broken_repaired(rng, args.cases)
+    print(f"  échecs : {repaired}")
+
+    print("Linéarité")
+    check_linear(rng)
+
+    sys.exit(1 if untouched or repaired else 0)
+
+
+if __name__ == "__main__":
+    main()
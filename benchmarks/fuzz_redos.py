@@ -0,0 +1,209 @@
+"""
+fuzz_redos.py
+Pire cas de temps des heuristiques sur des entrées construites pour les
+faire dérailler (ReDoS, balayages quadratiques).
+
+Chaque entrée adverse (des milliers de <current sans >, une ligne d'un Mo,
+un guillemet jamais refermé, 100 000 { ...) est générée à deux tailles ;
+chaque étape du validateur public (détection du type, matcher, locator,
+correcteurs, comparaison, pipeline validate() complet) est chronométrée
+dessus. Échec si une étape dépasse --max-per-mb secondes par Mo, ou si son
+temps par octet grossit de plus de --max-growth fois quand l'entrée est
+4 fois plus grande (signe d'un coût quadratique).
+
+Chaque temps est le meilleur de --repeat exécutions (chacune à froid : le
+cache du découpage ne survit pas à l'appel, voir modules/document_cache.py) :
+une seule mesure laisse passer le bruit de la machine
+(GC, ordonnanceur) et fait échouer une étape pourtant linéaire.
+
+Lancement depuis la racine du projet :
+    python benchmarks/fuzz_redos.py [--size-kb 1024] [--max-per-mb 10] [--cases 12] [--seed 0] [--repeat 5]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules.comparator import get_changes_summary  # noqa: E402
+from modules.corrector import compute_corrections  # noqa: E402
+from modules.errors_matcher import match_all_errors  # noqa: E402
+from modules.locator import locate_json_error, locate_real_error  # noqa: E402
+from modules.semantic_fixer import extract_columns  # noqa: E402
+from modules.validator import detect_dayz_file_type, validate  # noqa: E402
+
+
+TYPES_XML = ROOT / "data" / "vanilla" / "chernarus" / "types.xml"
+
+# En dessous de ce temps, le rapport entre deux tailles n'est que du bruit
+MIN_SECONDS = 0.025
+
+
+# ==============================
+# ENTRÉES ADVERSES
+# ==============================
+# (nom, type, fabrique(taille en caractères) → texte). Les motifs sont
+# répétés jusqu'à la taille voulue : le coût doit rester proportionnel.
+def _repeat(unit, size, head="", tail=""):
+    return head + unit * max(1, (size - len(head) - len(tail)) // len(unit)) + tail
+
+
+ADVERSARIAL = [
+    # Balises auto-fermantes sans > : chaque <current relançait un [^>]* jusqu'en fin de fichier
+    ("<current sans >", "xml", lambda size: _repeat("<current actual=\"1\" ", size, "<types>")),
+    ("balise ouverte + espaces", "xml", lambda size: _repeat(" ", size, "<types><type name=\"a\"", "x")),
+    ("attribut d'un Mo", "xml", lambda size: _repeat("a", size, "<types><type ", ">")),
+    ("= suivi d'espaces", "xml", lambda size: _repeat(" ", size, "<types><type name=", "x>")),
+    ("guillemet jamais refermé", "xml", lambda size: _repeat("x ", size, "<types><type name=\"")),
+    ("<!-- en rafale", "xml", lambda size: _repeat("<!--", size, "<types>")),
+    ("& en rafale", "xml", lambda size: _repeat("&", size, "<types>")),
+    ("&# sans ;", "xml", lambda size: _repeat("9", size, "<types>&#")),
+    ("< en rafale", "xml", lambda size: _repeat("<", size, "<types>")),
+    ("<a en rafale", "xml", lambda size: _repeat("<a ", size)),
+    ("ouvrantes sans fermantes", "xml", lambda size: _repeat("<type>", size, "<types>")),
+    ("fermantes orphelines", "xml", lambda size: _repeat("</type>", size, "<types>")),
+    ("<? et <![CDATA[", "xml", lambda size: _repeat("<?x<![CDATA[", size, "<types>")),
+    ("{ en rafale", "json", lambda size: _repeat("{\"a\":", size)),
+    ("[ en rafale", "json", lambda size: _repeat("[", size)),
+    ("chaîne jamais refermée", "json", lambda size: _repeat("x", size, "{\"a\": \"")),
+    ("apostrophes", "json", lambda size: _repeat("'", size, "{")),
+    ("virgule puis espaces", "json", lambda size: _repeat(" ", size, "{\"a\": 1,", "x")),
+    ("bruit après une valeur", "json", lambda size: _repeat(" 1", size, "{\"a\": 1")),
+    ("clé sans : sur un Mo", "json", lambda size: _repeat("a", size, "{")),
+    ("\\ en rafale dans une chaîne", "json", lambda size: _repeat("\\", size, "{\"a\": \"")),
+]
+
+# Caractères qui changent l'état des scanners
+NOISE_ALPHABET = "<>/=\"' &!-?[]{}:,;#\\\nab1"
+
+
+def vanilla_one_line(size):
+    """types.xml sans retours à la ligne, une balise cassée au milieu"""
+    text = TYPES_XML.read_text(encoding="utf-8").replace("\n", " ")
+    text = (text * (size // len(text) + 1))[:size]
+    middle = text.find("</type>", len(text) // 2)
+    return text[:middle] + text[middle + 2:]
+
+
+def random_noise(rng):
+    # Graine tirée une fois : les deux tailles partagent le même début (même
+    # erreur), sinon on comparerait deux documents sans rapport
+    seed = rng.random()
+
+    def build(size):
+        local = random.Random(seed)
+        return "".join(local.choice(NOISE_ALPHABET) for _ in range(size))
+    return build
+
+
+# ==============================
+# ÉTAPES CHRONOMÉTRÉES
+# ==============================
+def _parse_error(text, file_type):
+    try:
+        if file_type == "json":
+            json.loads(text)
+        else:
+            ET.fromstring(text)
+    except json.JSONDecodeError as e:
+        return e, e.lineno
+    except ET.ParseError as e:
+        return e, e.position[0]
+    except RecursionError:
+        # Imbrication plus profonde que la pile de json : pas d'erreur exploitable
+        pass
+    return None, 1
+
+
+def stages(file_type):
+    """[(nom, fonction(texte, erreur, ligne))] pour un type de fichier"""
+    common = [
+        ("détection du type", lambda text, error, line: detect_dayz_file_type(text)),
+        ("matcher", lambda text, error, line: error and match_all_errors(text, error, file_type)),
+        ("corrections une passe", lambda text, error, line: compute_corrections(text, file_type)),
+        ("comparaison", lambda text, error, line: get_changes_summary(text, text + "\n")),
+    ]
+    if file_type == "xml":
+        specific = [
+            ("locator", lambda text, error, line: locate_real_error(text, line)),
+            ("extract_columns", lambda text, error, line: extract_columns(text, "types")),
+        ]
+    else:
+        specific = [
+            ("locator", lambda text, error, line: locate_json_error(text, line)),
+        ]
+    return common + specific + [
+        ("validate()", lambda text, error, line: validate(text, file_type)),
+    ]
+
+
+def _timed(func, repeat):
+    """Meilleur temps de repeat exécutions"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_case(name, file_type, build, size, max_per_mb, max_growth, repeat):
+    """Chronomètre chaque étape à size/4 et size. Retourne le nombre d'échecs."""
+    small, large = build(size // 4), build(size)
+    small_error, small_line = _parse_error(small, file_type)
+    large_error, large_line = _parse_error(large, file_type)
+    failures = 0
+    worst = ("", 0.0)
+
+    for stage, func in stages(file_type):
+        small_seconds = _timed(lambda: func(small, small_error, small_line), repeat)
+        large_seconds = _timed(lambda: func(large, large_error, large_line), repeat)
+        per_mb = large_seconds / (len(large) / 1024 / 1024)
+        growth = ((max(large_seconds, MIN_SECONDS) / len(large))
+                  / (max(small_seconds, MIN_SECONDS) / len(small)))
+        if per_mb > worst[1]:
+            worst = (stage, per_mb)
+        if per_mb > max_per_mb or growth > max_growth:
+            failures += 1
+            print(f"  ✗ {name} / {stage} : {per_mb:.2f} s/Mo, ×{growth:.1f} par octet "
+                  f"quand l'entrée est 4 fois plus grande")
+
+    print(f"{name:<32} {file_type:>4} {len(large) / 1024:>7.0f}Ko "
+          f"{worst[1]:>8.2f} s/Mo  ({worst[0]})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-kb", type=int, default=1024)
+    parser.add_argument("--max-per-mb", type=float, default=10.0)
+    parser.add_argument("--max-growth", type=float, default=2.5)
+    parser.add_argument("--cases", type=int, default=12, help="entrées de bruit aléatoire")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="exécutions par taille (on garde la meilleure)")
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    size = args.size_kb * 1024
+
+    cases = list(ADVERSARIAL)
+    cases.append(("types.xml sur une ligne", "xml", vanilla_one_line))
+    for index in range(args.cases):
+        cases.append((f"bruit aléatoire {index + 1}", rng.choice(["xml", "json"]), random_noise(rng)))
+
+    print(f"{'entrée':<32} {'type':>4} {'taille':>9} {'pire étape':>13}")
+    failures = sum(run_case(name, file_type, build, size, args.max_per_mb, args.max_growth, args.repeat)
+                   for name, file_type, build in cases)
+
+    print(f"\n{failures} étape(s) au-dessus de {args.max_per_mb} s/Mo ou non linéaire(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+batch.py
+Validation de plusieurs documents en parallèle, pour les backends asyncio.
+Le travail CPU (parsing, matching, correction) part dans un executor :
+la boucle d'événements de l'appelant n'est jamais bloquée.
+
+Chaque résultat est exactement le dict retourné par validator.validate().
+
+correct_folder() corrige un dossier entier (après une modification en masse
+qui a cassé des dizaines de fichiers) : copies corrigées ou patchs dans un
+dossier de sortie, plus un rapport unique des corrections par fichier.
+
+    python -m modules.batch config/ config_corrige/ [--patch] [--workers 4]
+"""
+
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from difflib import unified_diff
+from pathlib import Path
+
+from modules.repair import correct_until_valid, correct_window, search_minimal_repair, WINDOW_MIN_SIZE
+from modules.corrector import compose_edits
+from modules.messages import Message, message_fields
+from modules.validator import validate
+
+
+# ==============================
+# EXÉCUTION D'UN DOCUMENT (côté worker)
+# ==============================
+def _validate_safe(content, file_type, version=None):
+    """
+    Appelle validate() dans le worker.
+    Une exception sur un document ne doit pas faire tomber tout le lot :
+    on la convertit en résultat invalide au format habituel.
+    """
+    try:
+        return validate(content, file_type, version)
+    except Exception as e:
+        return {
+            "valid": False,
+            "file_type": file_type,
+            "dayz_type": None,
+            "dayz_version": None,
+            "error": {
+                "line": 0,
+                "column": 0,
+                **message_fields("message_brut", Message("validator.erreur_interne", error=str(e))),
+                "matched": None,
+                "other_matches": [],
+                "location": None
+            },
+            "formatted": None,
+            "corrected": None,
+            "edits": None,
+            "corrected_valid": None,
+            "repair_confidence": None,
+            "semantic_warnings": None,
+            "semantic_edits": None
+        }
+
+
+# ==============================
+# RÉSULTATS AU FIL DE L'EAU
+# ==============================
+async def validate_as_completed(docs, concurrency=4, executor=None):
+    """
+    Valide plusieurs documents et les rend au fur et à mesure qu'ils finissent.
+
+    Paramètres :
+        docs        → itérable de (content, file_type) ou (content, file_type, version)
+                      (sans version : détection automatique, document par document,
+                      ce qui permet de valider un parc de serveurs mixte)
+        concurrency → nombre max de documents en cours de traitement
+        executor    → executor à utiliser (par défaut : un ProcessPoolExecutor
+                      créé pour l'appel puis arrêté à la fin)
+
+    Rend (async for) :
+        (index, result) → index du document dans docs + dict de validate()
+
+    Annulation : si l'appelant annule la tâche ou arrête d'itérer,
+    les documents pas encore démarrés sont abandonnés.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency doit être >= 1")
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=concurrency)
+
+    async def run_one(index, doc):
+        async with semaphore:
+            result = await loop.run_in_executor(executor, _validate_safe, *doc)
+            return index, result
+
+    tasks = [
+        asyncio.ensure_future(run_one(index, tuple(doc)))
+        for index, doc in enumerate(docs)
+    ]
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Laisse les tâches annulées se terminer proprement
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ==============================
+# FONCTION PRINCIPALE
+# ==============================
+async def validate_many(docs, concurrency=4, executor=None):
+    """
+    Valide plusieurs documents et retourne tous les résultats.
+
+    Paramètres : voir validate_as_completed()
+
+    Retourne :
+        list → un dict de validate() par document, dans l'ordre de docs
+    """
+    docs = list(docs)
+    results = [None] * len(docs)
+    async for index, result in validate_as_completed(docs, concurrency, executor):
+        results[index] = result
+    return results
+
+
+# ==============================
+# CORRECTION D'UN DOSSIER
+# ==============================
+FILE_TYPES = {".xml": "xml", ".json": "json"}
+
+
+def _patch_text(content, corrected, relative):
+    """Patch unifié (appliquable avec `patch -p1` depuis le dossier d'origine)"""
+    out = []
+    for line in unified_diff(
+        content.splitlines(keepends=True),
+        corrected.splitlines(keepends=True),
+        fromfile=f"a/{relative}",
+        tofile=f"b/{relative}",
+    ):
+        out.append(line)
+        # Dernière ligne sans retour à la ligne : marqueur attendu par patch
+        if not line.endswith("\n"):
+            out.append("\n\\ No newline at end of file\n")
+    return "".join(out)
+
+
+def _correct_file(path, relative, output_dir, mode):
+    """
+    Corrige un fichier dans le worker et écrit le résultat dans output_dir.
+    Seul le résumé remonte au processus principal (pas le contenu).
+    """
+    start = time.perf_counter()
+    summary = {
+        "file": relative,
+        "file_type": FILE_TYPES.get(Path(path).suffix.lower()),
+        "status": None,
+        "applied_corrections": [],
+        "edits": 0,
+        "valid_after": None,
+        "output": None,
+        "error": None,
+        "seconds": 0.0,
+    }
+
+    try:
+        content = Path(path).read_text(encoding="utf-8")
+        file_type = summary["file_type"]
+        if file_type == "xml" and len(content) >= WINDOW_MIN_SIZE:
+            correction = correct_window(content, file_type)
+        else:
+            correction = correct_until_valid(content, file_type)
+
+        corrected = correction["corrected"]
+        edits = correction["edits"]
+        applied = list(correction["applied_corrections"])
+        valid = correction["valid"]
+
+        # Erreur non répertoriée : même relais que validate()
+        if not valid and correction["error"] is not None:
+            repair = search_minimal_repair(corrected, file_type)
+            if repair is not None and repair["valid"]:
+                edits = compose_edits(content, edits, repair["edits"])
+                corrected = repair["corrected"]
+                applied.append(f"{repair['description']} (confiance {repair['confidence']:.0%})")
+                valid = True
+
+        summary["applied_corrections"] = applied
+        summary["edits"] = len(edits)
+        summary["valid_after"] = valid
+
+        if not edits:
+            summary["status"] = "valide" if valid else "non corrigé"
+        else:
+            summary["status"] = "corrigé" if valid else "partiellement corrigé"
+            target = Path(output_dir) / relative
+            if mode == "patch":
+                target = target.with_name(target.name + ".patch")
+                text = _patch_text(content, corrected, relative)
+            else:
+                text = corrected
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(text, encoding="utf-8")
+            summary["output"] = str(target)
+
+    except Exception as e:
+        summary["status"] = "erreur"
+        summary["error"] = str(e)
+
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+
+def _correct_file_args(args):
+    return _correct_file(*args)
+
+
+def iter_folder_files(folder, patterns=("*.xml", "*.json")):
+    """Fichiers à corriger (récursif, triés), en chemins relatifs à folder"""
+    folder = Path(folder)
+    paths = set()
+    for pattern in patterns:
+        paths.update(path for path in folder.rglob(pattern) if path.is_file())
+    return [path.relative_to(folder).as_posix() for path in sorted(paths)]
+
+
+def correct_folder(folder, output_dir, mode="copy", patterns=("*.xml", "*.json"),
+                   workers=4, executor=None):
+    """
+    Corrige tous les fichiers XML / JSON d'un dossier, en parallèle.
+
+    Les fichiers d'origine ne sont jamais modifiés. Seuls les fichiers qui
+    ont reçu au moins une correction sont écrits dans output_dir, avec la
+    même arborescence.
+
+    Paramètres :
+        folder     → dossier à corriger
+        output_dir → dossier de sortie (créé si besoin)
+        mode       → "copy" (copies corrigées) ou "patch" (un .patch unifié par fichier)
+        patterns   → motifs glob des fichiers à traiter
+        workers    → nombre de processus
+        executor   → executor à utiliser (par défaut : un ProcessPoolExecutor
+                     créé pour l'appel puis arrêté à la fin)
+
+    Retourne :
+        {
+            "folder": str,
+            "output_dir": str,
+            "mode": str,
+            "files": [résumé, ...],      → un par fichier, dans l'ordre des chemins
+            "totals": {statut: nombre, ..., "files": int, "edits": int},
+            "seconds": float,
+            "files_per_second": float,
+            "bytes_per_second": float
+        }
+    """
+    if mode not in ("copy", "patch"):
+        raise ValueError(f"Mode de sortie inconnu : {mode} (attendu : copy, patch)")
+    if workers < 1:
+        raise ValueError("workers doit être >= 1")
+
+    folder = Path(folder)
+    output_dir = Path(output_dir)
+    if output_dir.resolve() == folder.resolve():
+        raise ValueError("Le dossier de sortie doit être différent du dossier corrigé")
+
+    relatives = iter_folder_files(folder, patterns)
+    jobs = [(str(folder / relative), relative, str(output_dir), mode) for relative in relatives]
+    total_bytes = sum((folder / relative).stat().st_size for relative in relatives)
+
+    start = time.perf_counter()
+    if workers == 1 and executor is None:
+        files = [_correct_file_args(job) for job in jobs]
+    else:
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            # Petits lots : moins d'allers-retours entre processus sur les gros dossiers
+            chunksize = max(1, len(jobs) // (workers * 8))
+            files = list(executor.map(_correct_file_args, jobs, chunksize=chunksize))
+        finally:
+            if own_executor:
+                executor.shutdown()
+    elapsed = time.perf_counter() - start
+
+    totals = {"files": len(files), "edits": sum(f["edits"] for f in files)}
+    for summary in files:
+        totals[summary["status"]] = totals.get(summary["status"], 0) + 1
+
+    return {
+        "folder": str(folder),
+        "output_dir": str(output_dir),
+        "mode": mode,
+        "files": files,
+        "totals": totals,
+        "seconds": elapsed,
+        "files_per_second": len(files) / elapsed if elapsed else 0.0,
+        "bytes_per_second": total_bytes / elapsed if elapsed else 0.0,
+    }
+
+
+# ==============================
+# RAPPORT DE CORRECTION
+# ==============================
+def format_correction_report(report):
+    """Rapport texte lisible : une ligne par fichier + corrections appliquées"""
+    lines = [f"Correction de {report['folder']} → {report['output_dir']} ({report['mode']})", ""]
+    for summary in report["files"]:
+        lines.append(f"[{summary['status']}] {summary['file']}")
+        for correction in summary["applied_corrections"]:
+            lines.append(f"    - {correction}")
+        if summary["error"]:
+            lines.append(f"    ! {summary['error']}")
+
+    totals = report["totals"]
+    counts = ", ".join(f"{status} : {count}" for status, count in totals.items()
+                       if status not in ("files", "edits"))
+    lines.append("")
+    lines.append(f"{totals['files']} fichier(s) — {counts} — {totals['edits']} édition(s)")
+    lines.append(f"{report['seconds']:.2f} s — {report['files_per_second']:.1f} fichiers/s — "
+                 f"{report['bytes_per_second'] / 1024:.0f} Ko/s")
+    return "\n".join(lines)
+
+
+def write_correction_report(report, target):
+    """Écrit le rapport complet en JSON (target : chemin ou "-" pour stdout)"""
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if target == "-":
+        print(text)
+    else:
+        Path(target).write_text(text + "\n", encoding="utf-8")
+
+
+# ==============================
+# LIGNE DE COMMANDE
+# ==============================
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m modules.batch",
+        description="Corrige tous les fichiers XML / JSON d'un dossier.",
+    )
+    parser.add_argument("folder", help="dossier à corriger (jamais modifié)")
+    parser.add_argument("output_dir", help="dossier où écrire les copies corrigées ou les patchs")
+    parser.add_argument("--patch", action="store_true", help="écrire des .patch au lieu de copies corrigées")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--report", help="écrire aussi le rapport complet en JSON (chemin ou -)")
+    args = parser.parse_args(argv)
+
+    try:
+        report = correct_folder(args.folder, args.output_dir,
+                                mode="patch" if args.patch else "copy", workers=args.workers)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    print(format_correction_report(report))
+    if args.report:
+        write_correction_report(report, args.report)
+
+    totals = report["totals"]
+    return 1 if totals.get("erreur") or totals.get("non corrigé") or totals.get("partiellement corrigé") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
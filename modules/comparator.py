@@ -5,8 +5,11 @@ Affichage côte à côte pour que l'utilisateur voie exactement ce qui a changé
 """
 
 import re
+from bisect import bisect_right
 from difflib import unified_diff
 
+from modules.context import line_index
+
 
 # ==============================
 # FONCTION PRINCIPALE
@@ -65,6 +68,101 @@ def compare_before_after(before, after):
     }
 
 
+# ==============================
+# DIFF DIRECT À PARTIR DES ÉDITIONS
+# ==============================
+def diff_from_edits(content, edits, context=1):
+    """
+    Même résultat que compare_before_after, mais construit directement depuis
+    la liste d'éditions du correcteur : pas de texte corrigé complet, pas de
+    re-diff. Seules les lignes touchées (et leur contexte) sont découpées ;
+    deux blocs dont les contextes se chevauchent forment un seul hunk.
+    
+    Paramètres :
+        content → contenu original (string)
+        edits   → éditions de corrector.compute_corrections / auto_correct
+        context → lignes de contexte autour de chaque bloc
+    
+    Retourne : voir compare_before_after
+    """
+    # Import local : corrector n'a pas à être chargé pour un simple diff texte
+    from modules.corrector import apply_edits
+
+    if not edits:
+        return {
+            "has_changes": False,
+            "changes_count": 0,
+            "diff_text": "",
+            "summary": "Aucune modification détectée."
+        }
+
+    # Début de chaque ligne, relevé une fois (et partagé avec les extraits
+    # de modules/context.py) : pas de rfind depuis le début du fichier par
+    # édition, quadratique sur un fichier minifié d'une seule ligne
+    starts = line_index(content)
+
+    def line_text(idx):
+        end = starts[idx + 1] - 1 if idx + 1 < len(starts) else len(content)
+        return content[starts[idx]:end]
+
+    # 1. Regroupe les éditions par bloc de lignes touchées (indices 0-based)
+    blocks = []          # [première ligne, dernière ligne, [éditions]]
+    for edit in sorted(edits, key=lambda e: (e["offset"], e["length"])):
+        first = bisect_right(starts, edit["offset"]) - 1
+        last = bisect_right(starts, edit["offset"] + edit["length"]) - 1
+        if blocks and first <= blocks[-1][1]:
+            blocks[-1][1] = max(blocks[-1][1], last)
+            blocks[-1][2].append(edit)
+            continue
+        blocks.append([first, last, [edit]])
+
+    # 2. Blocs dont les contextes se touchent : un seul hunk, sans lignes répétées
+    hunks = []
+    for block in blocks:
+        if hunks and block[0] - hunks[-1][-1][1] - 1 <= 2 * context:
+            hunks[-1].append(block)
+        else:
+            hunks.append([block])
+
+    # 3. Rend chaque hunk : contexte, puis pour chaque bloc lignes avant /
+    #    lignes après, séparés par les lignes inchangées entre blocs
+    formatted = []
+    changes_count = 0
+    line_delta = 0
+    for hunk in hunks:
+        hunk_first = max(0, hunk[0][0] - context)
+        hunk_last = min(len(starts) - 1, hunk[-1][1] + context)
+        body = []
+        hunk_delta = 0
+        cursor = hunk_first
+        for first, last, block_edits in hunk:
+            body.extend(f"    {line_text(idx)}" for idx in range(cursor, first))
+            start = starts[first]
+            end = starts[last + 1] - 1 if last + 1 < len(starts) else len(content)
+            shifted = [dict(e, offset=e["offset"] - start) for e in block_edits]
+            before_lines = content[start:end].split('\n')
+            after_lines = apply_edits(content[start:end], shifted).split('\n')
+            body.extend(f"❌ AVANT  : {line}" for line in before_lines)
+            body.extend(f"✅ APRÈS  : {line}" for line in after_lines)
+            changes_count += len(before_lines) + len(after_lines)
+            hunk_delta += len(after_lines) - len(before_lines)
+            cursor = last + 1
+        body.extend(f"    {line_text(idx)}" for idx in range(cursor, hunk_last + 1))
+
+        old_count = hunk_last - hunk_first + 1
+        formatted.append(f"\n@@ -{hunk_first + 1},{old_count} "
+                         f"+{hunk_first + 1 + line_delta},{old_count + hunk_delta} @@\n")
+        formatted.extend(body)
+        line_delta += hunk_delta
+
+    return {
+        "has_changes": True,
+        "changes_count": changes_count,
+        "diff_text": "\n".join(formatted),
+        "summary": f"{len(edits)} modification(s) appliquée(s)."
+    }
+
+
 # ==============================
 # FORMATAGE DU DIFF
 # ==============================
@@ -0,0 +1,188 @@
+"""
+context.py
+Extraits de code autour des erreurs (ligne du parseur, cause probable
+trouvée par le locator...), pour l'affichage.
+
+Seules les lignes montrées sont découpées : la position de chaque début de
+ligne est relevée une fois par document (line_index, en cache le temps
+d'un document_scope(), voir modules/document_cache.py), puis chaque
+extrait se tranche directement dans le contenu. Le coût d'un extrait ne
+dépend plus de la taille du fichier, et on peut en demander beaucoup d'un
+coup (build_contexts).
+
+Les lignes très longues (fichier minifié sur une ligne) sont tronquées
+autour de la colonne en cause, et le HTML produit est échappé : un < du
+XML ne casse plus la page.
+"""
+
+import html
+from itertools import accumulate
+
+from modules.document_cache import document_scope, per_document
+
+
+# Lignes affichées avant et après la ligne en cause
+CONTEXT_LINES = 2
+# Au-delà, une ligne est tronquée (autour de la colonne en cause si connue)
+MAX_LINE_CHARS = 160
+# Part de la fenêtre gardée avant la colonne en cause quand on tronque
+_LEAD_CHARS = 40
+
+
+# ==============================
+# INDEX DES LIGNES
+# ==============================
+@per_document
+def line_index(content):
+    """
+    Position du début de chaque ligne, gardée en cache dans le
+    document_scope() courant.
+
+    Retourne :
+        tuple → (0, début de la ligne 2, ...), une entrée par ligne
+    """
+    return tuple(accumulate((len(line) + 1 for line in content.split("\n")[:-1]), initial=0))
+
+
+def line_bounds(content, line):
+    """
+    (début, fin) de la ligne line (1-based) dans content, fin sans le \\n
+    (ni le \\r d'une fin de ligne Windows). None si la ligne n'existe pas.
+    """
+    starts = line_index(content)
+    if not 1 <= line <= len(starts):
+        return None
+    start = starts[line - 1]
+    end = starts[line] - 1 if line < len(starts) else len(content)
+    if end > start and content[end - 1] == "\r":
+        end -= 1
+    return start, end
+
+
+# ==============================
+# EXTRAITS
+# ==============================
+@document_scope()
+def build_context(content, line, column=None, length=1, context_lines=CONTEXT_LINES,
+                  max_chars=MAX_LINE_CHARS):
+    """
+    Extrait autour d'une ligne.
+
+    Paramètres :
+        content       → contenu brut du fichier
+        line          → ligne en cause (1-based)
+        column        → colonne en cause (1-based), None si inconnue
+        length        → longueur du passage à surligner à partir de column
+                        (limité à la fin de la ligne)
+        context_lines → lignes montrées avant et après
+        max_chars     → longueur maximale d'une ligne affichée
+
+    Retourne :
+        {
+            "line": int,
+            "lines": [
+                {
+                    "num": int,
+                    "text": str,            → texte brut (non échappé), éventuellement tronqué
+                    "is_error": bool,
+                    "cut_before": bool,     → début de ligne coupé
+                    "cut_after": bool,      → fin de ligne coupée
+                    "highlight": (début, fin) ou None   → dans text
+                },
+                ...
+            ]
+        }
+    """
+    starts = line_index(content)
+    first = max(1, line - context_lines)
+    last = min(len(starts), line + context_lines)
+
+    lines = []
+    for num in range(first, last + 1):
+        start, end = line_bounds(content, num)
+        focus = None
+        if num == line and column is not None:
+            focus = min(max(column - 1, 0), end - start)
+        lines.append(_slice_line(content, num, start, end, num == line, focus, length, max_chars))
+    return {"line": line, "lines": lines}
+
+
+@document_scope()
+def build_contexts(content, findings, context_lines=CONTEXT_LINES, max_chars=MAX_LINE_CHARS):
+    """
+    Extraits pour plusieurs constats d'un même document (index des lignes
+    partagé).
+
+    Paramètres :
+        findings → [{"line": int, "column": int (facultatif), "length": int (facultatif)}, ...]
+                   (candidats du locator, erreur du parseur...)
+
+    Retourne :
+        [extrait (voir build_context), ...] dans l'ordre de findings ;
+        None pour un constat sans ligne exploitable
+    """
+    starts = line_index(content)
+    contexts = []
+    for finding in findings:
+        line = finding.get("line") or 0
+        if not 1 <= line <= len(starts):
+            contexts.append(None)
+            continue
+        contexts.append(build_context(content, line, finding.get("column") or None,
+                                      finding.get("length") or 1, context_lines, max_chars))
+    return contexts
+
+
+def _slice_line(content, num, start, end, is_error, focus, length, max_chars):
+    """Une ligne de l'extrait, tronquée autour de focus (colonne 0-based) si trop longue"""
+    width = end - start
+    window_start = 0
+    if width > max_chars and focus is not None:
+        window_start = min(max(focus - _LEAD_CHARS, 0), width - max_chars)
+    window_end = min(width, window_start + max_chars)
+
+    highlight = None
+    if focus is not None:
+        mark_start = min(max(focus, window_start), window_end)
+        mark_end = min(max(focus + max(length, 1), mark_start), window_end)
+        if mark_end > mark_start:
+            highlight = (mark_start - window_start, mark_end - window_start)
+
+    return {
+        "num": num,
+        "text": content[start + window_start:start + window_end],
+        "is_error": is_error,
+        "cut_before": window_start > 0,
+        "cut_after": window_end < width,
+        "highlight": highlight,
+    }
+
+
+# ==============================
+# RENDU HTML
+# ==============================
+def render_context_html(context):
+    """
+    HTML d'un extrait (classes CSS context-code de utils/styles.py), texte
+    échappé, passage en cause dans <span class="mark">.
+    """
+    parts = ['<div class="context-code">']
+    for line in context["lines"]:
+        text = line["text"]
+        if line["highlight"]:
+            mark_start, mark_end = line["highlight"]
+            body = (html.escape(text[:mark_start])
+                    + '<span class="mark">' + html.escape(text[mark_start:mark_end]) + '</span>'
+                    + html.escape(text[mark_end:]))
+        else:
+            body = html.escape(text)
+        if line["cut_before"]:
+            body = '<span class="cut">…</span>' + body
+        if line["cut_after"]:
+            body += '<span class="cut">…</span>'
+
+        arrow = "❌ " if line["is_error"] else "   "
+        parts.append(f'<div class="{"line error" if line["is_error"] else "line"}">'
+                     f'<span class="line-num">{arrow}{line["num"]}</span>{body}</div>')
+    parts.append('</div>')
+    return "".join(parts)
@@ -5,330 +5,873 @@ Corrections basiques et sûres uniquement
 """
 
 import re
-import json
-from pathlib import Path
+from bisect import bisect_right
+
+from modules.knowledge_base import get_knowledge_base
+from modules.rules import CORRECTION_ACTIONS, detect_rules
+from modules.xml_scanner import (
+    AMP, BARE_AMP_RE, BROKEN, CLOSE, COMMENT, OPEN, SELF_CLOSE, iter_xml_events, scan_xml,
+)
 
 
 # ==============================
 # CHARGEMENT DE LA BASE
 # ==============================
-def load_errors_db():
-    """Charge errors_db.json pour savoir quelles corrections sont auto"""
-    db_path = Path(__file__).parent.parent / "data" / "errors_db.json"
-    with open(db_path, "r", encoding="utf-8") as f:
-        return json.load(f)["errors"]
+# Même base que le matcher (modules/knowledge_base.py)
 
-_ERRORS_DB = None
+def load_errors_db():
+    """Relit errors_db.json pour savoir quelles corrections sont auto"""
+    kb = get_knowledge_base()
+    kb.reload(force=True)
+    return kb.entries()
 
 def get_errors_db():
-    global _ERRORS_DB
-    if _ERRORS_DB is None:
-        _ERRORS_DB = load_errors_db()
-    return _ERRORS_DB
+    return get_knowledge_base().entries()
 
 
-# ==============================
-# CORRECTIONS XML
-# ==============================
+def get_rules():
+    """Règles compilées de errors_db (balises auto-fermantes, ids corrigeables...)"""
+    return get_knowledge_base().rules()
 
-def fix_xml_self_closing_tags(content):
+
+def correction_actions(matches):
     """
-    Corrige les balises auto-fermantes mal écrites
-    <current actual="0.45"> → <current actual="0.45" />
+    Actions de correction des entrées matchées : seules celles-ci sont
+    appliquées (une faute détectée ne déclenche pas les autres correcteurs).
+
+    Paramètres :
+        matches → entrées de errors_db (match_all_errors), dans n'importe quel ordre
+
+    Retourne :
+        frozenset d'actions (voir rules.CORRECTION_ACTIONS), vide = rien à corriger
     """
-    corrected = content
-    applied = []
-    
-    # Liste des balises DayZ connues comme auto-fermantes
-    self_closing_tags = [
-        'current', 'fog', 'overcast', 'rain', 'storm',
-        'hoarder', 'damage', 'usage', 'value', 'category',
-        'tier', 'cargo', 'item'
-    ]
-    
-    for tag in self_closing_tags:
-        # Pattern : <tag ...> (sans /> et sans contenu ni </tag>)
-        pattern = rf'<{tag}(\s[^>]*)?(?<!/)>'
-        
-        # Vérifier qu'il n'y a pas de </tag> après
-        matches = list(re.finditer(pattern, corrected))
-        
-        for match in reversed(matches):  # Parcourir à l'envers pour ne pas décaler les positions
-            tag_content = match.group(0)
-            start_pos = match.start()
-            end_pos = match.end()
-            
-            # Vérifier qu'il n'y a pas de balise fermante correspondante
-            after_tag = corrected[end_pos:end_pos+100]
-            if f'</{tag}>' not in after_tag:
-                # C'est bien une balise qui devrait être auto-fermante
-                corrected_tag = tag_content[:-1] + ' />'
-                corrected = corrected[:start_pos] + corrected_tag + corrected[end_pos:]
-                applied.append(f"Ajout de /> à la balise <{tag}>")
-    
-    return corrected, applied
+    by_id = get_rules()["by_id"]
+    return frozenset(
+        by_id[entry["id"]]["action"] for entry in matches
+        if entry.get("id") in by_id and by_id[entry["id"]]["action"]
+    )
 
 
-def fix_xml_unclosed_comments(content):
+def detected_actions(content, error, file_type):
     """
-    Corrige les commentaires XML non fermés
-    <!-- commentaire → <!-- commentaire -->
+    Mêmes actions que correction_actions(match_all_errors(...)), sans
+    construire ni enrichir les entrées (nom de balise...) : seuls les
+    détecteurs tournent.
+
+    Paramètres :
+        content   → contenu brut du fichier
+        error     → exception du parseur
+        file_type → "json" ou "xml"
     """
-    corrected = content
-    applied = []
-    
-    # Compter les <!-- et les -->
-    open_count = content.count('<!--')
-    close_count = content.count('-->')
-    
-    if open_count > close_count:
-        # Il manque des fermetures
-        missing = open_count - close_count
-        corrected += '\n' + ('-->\n' * missing)
-        applied.append(f"Fermeture de {missing} commentaire(s) XML")
-    
-    return corrected, applied
+    detected = detect_rules(get_rules(), file_type, content, str(error).lower())
+    return frozenset(rule["action"] for rule, _ in detected if rule["action"])
 
 
-def fix_xml_unescaped_chars(content):
+# ==============================
+# ÉDITIONS
+# ==============================
+# Une correction = une édition à une position du texte d'origine :
+#     {
+#         "offset": int,     → position dans le texte d'origine
+#         "length": int,     → nombre de caractères remplacés (0 = insertion)
+#         "text": str,       → texte inséré à la place ("" = suppression)
+#         "kind": "insert" | "replace" | "delete",
+#         "reason": str      → explication lisible
+#     }
+# Les éditions d'une même liste portent toutes sur le texte d'origine
+# et ne se chevauchent pas.
+
+def make_edit(offset, length, text, reason):
+    """Construit une édition (le kind est déduit de length / text)"""
+    if length == 0:
+        kind = "insert"
+    elif text:
+        kind = "replace"
+    else:
+        kind = "delete"
+    return {"offset": offset, "length": length, "text": text, "kind": kind, "reason": reason}
+
+
+def apply_edits(content, edits):
     """
-    Échappe les caractères spéciaux XML
-    & → &amp; (sauf si déjà échappé)
+    Applique une liste d'éditions en une seule concaténation.
+
+    Lève ValueError si deux éditions se chevauchent.
     """
-    corrected = content
-    applied = []
-    
-    # Échapper & qui ne sont pas déjà échappés
-    unescaped_count = len(re.findall(r'&(?!(amp|lt|gt|quot|apos);)', corrected))
-    if unescaped_count > 0:
-        corrected = re.sub(r'&(?!(amp|lt|gt|quot|apos);)', '&amp;', corrected)
-        applied.append(f"Échappement de {unescaped_count} caractère(s) &")
-    
-    return corrected, applied
+    if not edits:
+        return content
+
+    pieces = []
+    last = 0
+    for edit in sorted(edits, key=lambda e: (e["offset"], e["length"])):
+        offset = edit["offset"]
+        if offset < last:
+            raise ValueError(f"Éditions qui se chevauchent à la position {offset}")
+        pieces.append(content[last:offset])
+        pieces.append(edit["text"])
+        last = offset + edit["length"]
+    pieces.append(content[last:])
+    return ''.join(pieces)
+
+
+def compose_edits(content, first, second):
+    """
+    Combine deux séries d'éditions : first porte sur content, second sur le
+    texte obtenu après first. Le résultat porte sur content et donne le même
+    texte final que les deux séries appliquées l'une après l'autre.
+    Les éditions qui se chevauchent ou se touchent sont fusionnées.
+    """
+    if not first:
+        return list(second)
+    if not second:
+        return list(first)
+
+    first = sorted(first, key=lambda e: (e["offset"], e["length"]))
+
+    # Position de chaque édition de first dans le texte intermédiaire
+    starts = []
+    delta = 0
+    for edit in first:
+        starts.append(edit["offset"] + delta)
+        delta += len(edit["text"]) - edit["length"]
+
+    def to_original(pos, is_end):
+        """Position dans le texte intermédiaire → position dans content"""
+        idx = bisect_right(starts, pos) - 1
+        if idx < 0:
+            return pos
+        edit = first[idx]
+        inter_end = starts[idx] + len(edit["text"])
+        if pos < inter_end or (is_end and pos == inter_end and pos > starts[idx]):
+            # Dans le texte inséré par first : on englobe toute son édition
+            return edit["offset"] + edit["length"] if is_end else edit["offset"]
+        return pos - (inter_end - (edit["offset"] + edit["length"]))
+
+    # Toutes les éditions ramenées sur content : (début, fin, série, édition)
+    spans = [(e["offset"], e["offset"] + e["length"], 0, e) for e in first]
+    for edit in second:
+        start = to_original(edit["offset"], False)
+        end = max(start, to_original(edit["offset"] + edit["length"], True))
+        spans.append((start, end, 1, edit))
+    spans.sort(key=lambda span: (span[0], span[1], span[2]))
+
+    groups = []
+    for span in spans:
+        if groups and span[0] <= groups[-1][1]:
+            groups[-1][1] = max(groups[-1][1], span[1])
+            groups[-1][2].append(span)
+        else:
+            groups.append([span[0], span[1], [span]])
+
+    # Texte final de chaque groupe : first puis second, appliqués localement
+    result = []
+    first_delta = 0
+    for start, end, members in groups:
+        group_first = [m[3] for m in members if m[2] == 0]
+        group_second = [m[3] for m in members if m[2] == 1]
+
+        if not group_second:
+            result.extend(group_first)
+        else:
+            inter_start = start + first_delta
+            local = apply_edits(content[start:end], [dict(e, offset=e["offset"] - start) for e in group_first])
+            local = apply_edits(local, [dict(e, offset=e["offset"] - inter_start) for e in group_second])
+            reasons = dict.fromkeys(e["reason"] for e in group_first + group_second)
+            result.append(make_edit(start, end - start, local, " ; ".join(reasons)))
+
+        first_delta += sum(len(e["text"]) - e["length"] for e in group_first)
+
+    return result
+
+
+def _common_prefix_length(a, b):
+    """Longueur du préfixe commun (recherche dichotomique, comparaisons en C)"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[:mid] == b[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _edit_between(before, after, reason):
+    """
+    Une seule édition qui transforme before en after
+    (on retire le préfixe et le suffixe communs, sans diff ligne à ligne).
+    """
+    prefix = _common_prefix_length(before, after)
+    suffix = _common_prefix_length(before[prefix:][::-1], after[prefix:][::-1])
+    return make_edit(prefix, len(before) - prefix - suffix, after[prefix:len(after) - suffix], reason)
 
 
-def fix_xml_unclosed_tags(content):
+# ==============================
+# CORRECTION XML EN UNE PASSE
+# ==============================
+# Un seul tokenizer linéaire parcourt le document, collecte toutes les
+# corrections sous forme d'éditions (voir make_edit), puis le texte
+# corrigé est produit une seule fois par apply_edits. L'ancienne chaîne de
+# fix_xml_* (un passage complet par correction) n'existe plus que comme
+# référence dans benchmarks/bench_corrector.py.
+
+# Le découpage en balises, entités, commentaires... est celui de
+# modules/xml_scanner.py, partagé avec le matcher, le locator et la réparation.
+# Écart minimal (en caractères) entre deux points de reprise, allongé de
+# _CHECKPOINT_COST par balise ouverte : chaque point copie la pile, et une
+# pile de 100 000 balises copiée tous les 16 Ko rendrait le parcours quadratique
+_CHECKPOINT_SPACING = 16 * 1024
+_CHECKPOINT_COST = 16
+
+
+_INDENT_RE = re.compile(r'[ \t]*')
+
+
+def _line_indents(content, positions):
     """
-    Détecte et ferme les balises XML non fermées
+    {position: (début de sa ligne, indentation de la ligne)} en un seul
+    parcours : chaque début de ligne se déduit du précédent (positions
+    triées). Un rfind par position relirait toute la ligne à chaque fois,
+    en temps quadratique sur un fichier d'une seule ligne.
     """
-    lines = content.split('\n')
-    open_tags = []
-    applied = []
-    
-    for line_num, line in enumerate(lines, start=1):
-        # Ignorer commentaires
-        line_clean = re.sub(r'<!--.*?-->', '', line)
-        
-        # Ignorer balises auto-fermantes
-        line_clean = re.sub(r'<[^>]+/>', '', line_clean)
-        
-        # Trouver balises fermantes
-        closing_tags = re.findall(r'</(\w+)>', line_clean)
-        for tag in closing_tags:
-            if open_tags and open_tags[-1][0] == tag:
-                open_tags.pop()
-        
-        # Trouver balises ouvrantes
-        opening_tags = re.findall(r'<(\w+)(?:\s[^>]*)?>(?![^<]*/>)', line_clean)
-        for tag in opening_tags:
-            open_tags.append((tag, line_num, line))
-    
-    # Ajouter les balises fermantes manquantes
-    if open_tags:
-        corrected = content
-        for tag_name, line_num, original_line in reversed(open_tags):
-            indent = len(original_line) - len(original_line.lstrip())
-            closing_tag = '\n' + (' ' * indent) + f'</{tag_name}>'
-            corrected += closing_tag
-            applied.append(f"Ajout de </{tag_name}>")
-        
-        return corrected, applied
-    
-    return content, []
+    lines = {}
+    line_start, seen, indent = 0, 0, None
+    for pos in sorted(set(positions)):
+        newline = content.rfind('\n', seen, pos)
+        if newline != -1:
+            line_start, indent = newline + 1, None
+        if indent is None:
+            indent = _INDENT_RE.match(content, line_start, pos).end() - line_start
+        seen = pos
+        lines[pos] = (line_start, indent)
+    return lines
+
+
+def _tag_indent(content, gap_start, i):
+    """
+    Indentation de la balise en i si elle commence sa ligne, sinon None.
+    Ne regarde que le texte depuis le token précédent (gap_start) :
+    le coût total reste linéaire, même sur un fichier d'une seule ligne.
+    """
+    line_start = content.rfind('\n', gap_start, i) + 1
+    if line_start == 0:
+        if gap_start != 0 and content[gap_start - 1] != '\n':
+            return None
+        line_start = gap_start
+    # Appelée pour chaque balise : pas de copie du texte, un seul match
+    if _INDENT_RE.match(content, line_start, i).end() != i:
+        return None
+    return i - line_start
+
+
+def _resolve_inline(content, entry):
+    """
+    Balise sans contenu plus indenté, dont la ligne suivante a repris le
+    niveau (entry["cue"]) : si elle n'a que du texte sur sa ligne (<min>0),
+    sa reprise est la fin de ce texte. Calculé seulement quand on en a
+    besoin (balise à fermer, ou parent d'une fermante) : dans un fichier
+    valide, la plupart des feuilles ne sont jamais regardées.
+    """
+    cue = entry["cue"]
+    entry["cue"] = None
+    line_end = content.find('\n', entry["end"], cue)
+    if line_end != -1:
+        text = content[entry["end"]:line_end].rstrip()
+        if text.strip() and '<' not in text:
+            entry["resume"] = entry["end"] + len(text)
+            entry["inline"] = True
 
 
-def _correct_xml(content):
-    """Applique toutes les corrections automatiques XML"""
-    corrected = content
-    all_applied = []
-    
-    # 1. Balises auto-fermantes
-    corrected, applied = fix_xml_self_closing_tags(corrected)
-    all_applied.extend(applied)
-    
-    # 2. Caractères non échappés
-    corrected, applied = fix_xml_unescaped_chars(corrected)
-    all_applied.extend(applied)
-    
-    # 3. Commentaires non fermés
-    corrected, applied = fix_xml_unclosed_comments(corrected)
-    all_applied.extend(applied)
-    
-    # 4. Balises non fermées
-    corrected, applied = fix_xml_unclosed_tags(corrected)
-    all_applied.extend(applied)
-    
-    return {
-        "corrected": corrected,
-        "applied_corrections": all_applied,
-        "has_changes": len(all_applied) > 0
-    }
+def _place_closers(unclosed, limit):
+    """
+    Choisit où fermer chaque balise restée ouverte.
 
+    Une balise ouverte en début de ligne est fermée là où la structure
+    reprend au même niveau : première ligne suivante qui commence par une
+    balise indentée au plus comme elle ("resume", relevé pendant le parcours),
+    ou en fin de sa ligne si elle n'y contient que du texte (<min>0).
+    Sinon (pas d'indice, ou indice incompatible avec l'imbrication), elle est
+    fermée à limit, comme avant.
 
-# ==============================
-# CORRECTIONS JSON
-# ==============================
+    Paramètres :
+        unclosed → balises ouvertes, de la plus externe à la plus interne
+        limit    → position de repli (fermante révélatrice ou fin de fichier)
 
-def fix_json_trailing_commas(content):
+    Retourne :
+        [(balise, position, indice utilisé), ...] de la plus interne à la plus externe
+        indice utilisé → True si la position vient de l'indentation
     """
-    Supprime les virgules finales avant } ou ]
-    {"key": "value",} → {"key": "value"}
+    placements = []
+    placed = []           # [(début, position)] déjà placées, débuts décroissants
+    for entry in reversed(unclosed):
+        resume = entry["resume"]
+        cued = resume is not None and entry["child_end"] <= resume <= limit
+        position = resume if cued else limit
+        # Les balises internes ouvertes avant cette position doivent être
+        # fermées avant elle ; sinon on se replie sur limit
+        while placed and placed[-1][0] < position:
+            if placed.pop()[1] > position:
+                position, cued = limit, False
+        placed.append((entry["start"], position))
+        placements.append((entry, position, cued))
+    return placements
+
+
+def _scan_xml_fixes(content, start=0, end=None, open_stack=(), actions=None):
     """
-    corrected = content
-    applied = []
-    
-    if re.search(r',\s*[}\]]', corrected):
-        corrected = re.sub(r',\s*}', '}', corrected)
-        corrected = re.sub(r',\s*]', ']', corrected)
-        applied.append("Suppression des virgules finales")
-    
-    return corrected, applied
+    Parcourt le XML une seule fois et collecte les corrections des actions
+    demandées.
 
+    Paramètres :
+        content    → contenu brut du fichier
+        start, end → fenêtre à parcourir (par défaut tout le document) ;
+                     start doit être un début de ligne
+        open_stack → balises ouvertes avant start : [(nom, début, fin), ...]
+        actions    → actions à appliquer (voir correction_actions) ;
+                     None = toutes celles du XML
 
-def fix_json_single_quotes(content):
-    """
-    Convertit les guillemets simples en doubles
-    {'key': 'value'} → {"key": "value"}
+    Les balises de open_stack ne sont jamais fermées par la fenêtre. Avant la
+    fin du document, une balise de la fenêtre encore ouverte à end n'est fermée
+    que si l'indentation montre où (elle peut se fermer plus loin).
+
+    Retourne :
+        (edits, applied, checkpoints)
+        edits       → [édition, ...] (voir make_edit)
+        applied     → messages de corrections ("Ajout de </type>"...)
+        checkpoints → [(position, pile des balises ouvertes), ...] relevés
+                      régulièrement entre deux balises, pour reprendre un
+                      parsing en cours de document (voir modules/repair.py)
     """
-    corrected = content
+    edits = []
     applied = []
-    
-    # Remplacer ' par " SEULEMENT pour les clés (pattern 'clé':)
-    if re.search(r"'[^']*'\s*:", corrected):
-        corrected = corrected.replace("'", '"')
-        applied.append("Conversion guillemets simples → doubles")
-    
-    return corrected, applied
+    checkpoints = []
+    last_checkpoint = start
+    stack = []            # balises ouvertes (dicts, voir plus bas)
+    pending = []          # balises en début de ligne sans reprise connue, indentation croissante
+    escaped_amps = 0
+    unclosed_comment = False
+    at_document_end = end is None or end >= len(content)
+    length = len(content) if at_document_end else end
+    if actions is None:
+        actions = CORRECTION_ACTIONS["xml"]
+    self_closing_tags = get_rules()["self_closing_tags"] if "auto_fermante" in actions else ()
+    close_tags = "fermeture_balises" in actions
+    rename_closers = "renommage_fermante" in actions
+    escape_amps = "echappement" in actions
+
+    open_counts = {}      # nombre de balises ouvertes de chaque nom dans stack
+    line = {"seen": start, "start": content.rfind('\n', 0, start) + 1}
+
+    def line_start_of(offset):
+        """Début de ligne de offset (offsets croissants : chaque caractère lu une fois)"""
+        newline = content.rfind('\n', line["seen"], offset)
+        if newline != -1:
+            line["start"] = newline + 1
+        line["seen"] = offset
+        return line["start"]
+
+    # Balises ouvertes avant la fenêtre : fermables dedans, jamais une reprise
+    lines = _line_indents(content, [tag_start for _, tag_start, _ in open_stack])
+    for name, tag_start, tag_end in open_stack:
+        line_start, indent = lines[tag_start]
+        indent = indent if line_start + indent == tag_start else None
+        stack.append({"name": name, "start": tag_start, "end": tag_end, "indent": indent,
+                      "deeper": True, "resume": None, "inline": False, "cue": None,
+                      "child_end": tag_end})
+        open_counts[name] = open_counts.get(name, 0) + 1
+
+    def close_unclosed(unclosed, limit, at_eof=False, cued_only=False):
+        for entry in unclosed:
+            if entry["cue"] is not None:
+                _resolve_inline(content, entry)
+        placements = _place_closers(unclosed, limit)
+        if at_eof:
+            lines = _line_indents(content, [entry["start"] for entry, _, _ in placements
+                                            if entry["indent"] is None])
+        for entry, position, cued in placements:
+            # Balise ouverte avant la fenêtre : sa place n'est pas dans la fenêtre
+            if (cued_only and not cued) or entry["start"] < start:
+                continue
+            name = entry["name"]
+            if cued and entry["inline"]:
+                text = f'</{name}>'
+            elif cued:
+                text = ' ' * entry["indent"] + f'</{name}>\n'
+            elif at_eof:
+                indent = entry["indent"]
+                if indent is None:
+                    indent = lines[entry["start"]][1]
+                text = '\n' + (' ' * indent) + f'</{name}>'
+            else:
+                text = f'</{name}>'
+            edits.append(make_edit(position, 0, text, f"Ajout de </{name}>"))
+            applied.append(f"Ajout de </{name}>")
+
+    # Document entier : événements partagés (et gardés en cache) avec le
+    # matcher et le locator ; fenêtre : découpage de la seule fenêtre
+    if start == 0 and at_document_end:
+        events = scan_xml(content)
+    else:
+        events = iter_xml_events(content, start, length)
+
+    gap_start = start
+    for kind, i, pos, name, well_formed in events:
+        if kind == BROKEN:
+            # Balise mal formée (guillemets, pas de >) : on n'y touche pas,
+            # sauf pour échapper ses &
+            if escape_amps:
+                for amp in BARE_AMP_RE.finditer(content, i, pos):
+                    edits.append(make_edit(amp.start(), 1, '&amp;', "Échappement de & en &amp;"))
+                    escaped_amps += 1
+            gap_start = pos
+            continue
+
+        if kind in (OPEN, SELF_CLOSE, CLOSE):
+            # Une balise en début de ligne marque la reprise de toutes les
+            # balises en attente indentées au moins autant qu'elle. L'indice
+            # n'est retenu que si la balise avait du contenu plus indenté
+            # (un fichier sans indentation ne donne aucun indice).
+            indent = _tag_indent(content, gap_start, i)
+            if indent is not None:
+                while pending and pending[-1]["indent"] >= indent:
+                    entry = pending.pop()
+                    if entry["deeper"]:
+                        entry["resume"] = i - indent
+                    else:
+                        # Pas de contenu plus indenté : texte seul sur la ligne ?
+                        # (vérifié plus tard, voir _resolve_inline)
+                        entry["cue"] = i
+                if pending:
+                    pending[-1]["deeper"] = True
+
+        # ── Balise ouvrante ou auto-fermante
+        if kind == OPEN or kind == SELF_CLOSE:
+            if escape_amps and not well_formed and content.find('&', i, pos) != -1:
+                for amp in BARE_AMP_RE.finditer(content, i, pos):
+                    edits.append(make_edit(amp.start(), 1, '&amp;', "Échappement de & en &amp;"))
+                    escaped_amps += 1
+            if kind == OPEN:
+                if name in self_closing_tags and content.find(f'</{name}>', pos, pos + 100) == -1:
+                    edits.append(make_edit(pos - 1, 0, ' /', f"Ajout de /> à la balise <{name}>"))
+                    applied.append(f"Ajout de /> à la balise <{name}>")
+                else:
+                    entry = {"name": name, "start": i, "end": pos, "indent": indent,
+                             "deeper": False, "resume": None, "inline": False, "cue": None,
+                             "child_end": pos}
+                    stack.append(entry)
+                    open_counts[name] = open_counts.get(name, 0) + 1
+                    if indent is not None:
+                        pending.append(entry)
+            if pos - last_checkpoint >= _CHECKPOINT_SPACING + _CHECKPOINT_COST * len(stack):
+                checkpoints.append((pos, tuple((e["name"], e["start"], e["end"]) for e in stack)))
+                last_checkpoint = pos
+
+        # ── Balise fermante
+        elif kind == CLOSE:
+            closed = None
+            # Aucune ouvrante de ce nom dans la pile : inutile de la parcourir
+            depth = len(stack) - 1 if open_counts.get(name) else -1
+            while depth >= 0 and stack[depth]["name"] != name:
+                depth -= 1
+            if depth >= 0:
+                # Les balises ouvertes au-dessus n'ont jamais été fermées
+                # (cas courant : aucune, la fermante ferme le sommet de la pile)
+                if close_tags and depth + 1 < len(stack):
+                    close_unclosed(stack[depth + 1:], i)
+                closed = stack[depth]
+                for entry in stack[depth:]:
+                    open_counts[entry["name"]] -= 1
+                del stack[depth:]
+            else:
+                # Fermante orpheline : faute de frappe sur la balise ouverte
+                # si elle est sur la même ligne ou au même niveau d'indentation
+                top = stack[-1] if stack else None
+                if rename_closers and top is not None and (
+                        line_start_of(i) <= top["end"]
+                        or (indent is not None and indent == top["indent"])):
+                    name_start = content.find(name, i + 2, pos)
+                    edits.append(make_edit(name_start, len(name), top["name"],
+                                           f"Renommage de </{name}> en </{top['name']}>"))
+                    applied.append(f"Renommage de </{name}> en </{top['name']}>")
+                    closed = stack.pop()
+                    open_counts[closed["name"]] -= 1
+            # Un enfant ouvert avant la reprise du parent doit rester dedans
+            if closed is not None and stack:
+                parent = stack[-1]
+                if parent["cue"] is not None:
+                    _resolve_inline(content, parent)
+                if parent["resume"] is None or closed["start"] < parent["resume"]:
+                    parent["child_end"] = pos
+            if pos - last_checkpoint >= _CHECKPOINT_SPACING + _CHECKPOINT_COST * len(stack):
+                checkpoints.append((pos, tuple((e["name"], e["start"], e["end"]) for e in stack)))
+                last_checkpoint = pos
+
+        # ── & dans le texte (les entités valides ne sont pas des événements)
+        elif kind == AMP:
+            if escape_amps:
+                edits.append(make_edit(i, 1, '&amp;', "Échappement de & en &amp;"))
+                escaped_amps += 1
+
+        # ── Commentaire (CDATA, instructions de traitement... : rien à faire)
+        elif kind == COMMENT and pos is None:
+            unclosed_comment = True
+            break
+
+        gap_start = pos
+
+    if escaped_amps:
+        applied.append(f"Échappement de {escaped_amps} caractère(s) &")
+
+    # ── Fin de fenêtre : la suite du document peut encore tout fermer
+    if not at_document_end:
+        if close_tags:
+            close_unclosed([entry for entry in stack if entry["start"] >= start], length,
+                           cued_only=True)
+        return edits, applied, checkpoints
+
+    # ── Fin de fichier : commentaire puis balises restées ouvertes
+    if unclosed_comment:
+        if "fermeture_commentaire" not in actions:
+            # Des fermantes ajoutées ici finiraient dans le commentaire
+            return edits, applied, checkpoints
+        edits.append(make_edit(length, 0, '\n-->\n', "Fermeture du commentaire XML"))
+        applied.append("Fermeture de 1 commentaire(s) XML")
+
+    if close_tags:
+        close_unclosed(stack, length, at_eof=True)
+
+    return edits, applied, checkpoints
+
+
+def _correction(edits, applied, **extra):
+    """
+    Dict de correction commun à tous les chemins (document entier, fenêtre,
+    JSON) : il y a une correction dès qu'il y a une édition.
+    """
+    return {
+        "edits": edits,
+        **extra,
+        "applied_corrections": applied,
+        "has_changes": len(edits) > 0
+    }
+
 
+def _correct_xml(content, actions=None):
+    """Calcule les corrections automatiques XML (un seul passage)"""
+    edits, applied, checkpoints = _scan_xml_fixes(content, actions=actions)
+    return _correction(edits, applied, checkpoints=checkpoints)
 
-def fix_json_missing_quotes(content):
+
+def compute_window_corrections(content, start, end, open_stack=(), actions=None):
     """
-    Ajoute des guillemets aux clés sans guillemets
-    {key: "value"} → {"key": "value"}
+    Corrections XML limitées à une fenêtre du document (voir repair.correct_window).
+
+    Paramètres :
+        content    → contenu brut du fichier
+        start, end → fenêtre (start en début de ligne)
+        open_stack → balises ouvertes avant start : [(nom, début, fin), ...]
+        actions    → actions à appliquer (None = toutes, voir correction_actions)
+
+    Retourne :
+        {
+            "edits": [édition, ...],        → positions dans content
+            "applied_corrections": [str, ...],
+            "has_changes": bool
+        }
     """
-    corrected = content
-    applied = []
-    
-    # Pattern pour détecter clés sans guillemets
-    pattern = r'(\{|,)\s*([a-zA-Z_]\w*)\s*:'
-    matches = list(re.finditer(pattern, corrected))
-    
-    if matches:
-        # Parcourir à l'envers pour ne pas décaler les positions
-        for match in reversed(matches):
-            key_name = match.group(2)
-            full_match = match.group(0)
-            
-            # Remplacer par version avec guillemets
-            prefix = match.group(1)
-            replacement = f'{prefix} "{key_name}":'
-            
-            start = match.start()
-            end = match.end()
-            corrected = corrected[:start] + replacement + corrected[end:]
-        
-        applied.append(f"Ajout de guillemets à {len(matches)} clé(s)")
-    
-    return corrected, applied
+    edits, applied, _ = _scan_xml_fixes(content, start, end, open_stack, actions)
+    return _correction(edits, applied)
 
 
-def fix_json_unclosed_brackets(content):
+# ==============================
+# CORRECTION JSON EN UNE PASSE
+# ==============================
+# Des remplacements sur le texte brut changeraient l'apostrophe de "l'arme"
+# en guillemet, supprimeraient une virgule suivie de } dans une chaîne et
+# ajouteraient les accolades manquantes en fin de fichier quelle que soit
+# l'imbrication. Ici un tokenizer suit l'état chaîne / échappement
+# et la pile des conteneurs : chaque correction est placée au bon endroit,
+# en un seul passage (voir make_edit).
+
+# Chaque caractère démarre exactement un token : finditer couvre tout le texte.
+# Une chaîne sans guillemet fermant s'arrête en fin de ligne.
+_JSON_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<string>"[^"\\\n]*(?:\\.[^"\\\n]*)*(?P<string_end>")?)
+  | (?P<single>'[^'\\\n]*(?:\\.[^'\\\n]*)*(?P<single_end>')?)
+  | (?P<punct>[{}\[\],:])
+  | (?P<word>[^\s{}\[\],:"']+)
+""", re.VERBOSE)
+# Dans une chaîne entre apostrophes : échappement, ou guillemet à échapper
+_JSON_SINGLE_BODY_RE = re.compile(r'\\(.)|"')
+
+_JSON_CLOSERS = {'{': '}', '[': ']'}
+_JSON_OPENERS = {'}': '{', ']': '['}
+
+
+def _single_to_double(token):
+    """Chaîne entre apostrophes → chaîne JSON entre guillemets (contenu conservé)"""
+    def convert(match):
+        if match.group(1) is None:
+            return '\\"'
+        return "'" if match.group(1) == "'" else match.group(0)
+    return '"' + _JSON_SINGLE_BODY_RE.sub(convert, token[1:-1]) + '"'
+
+
+def _scan_json_fixes(content, actions=None):
     """
-    Ferme les accolades/crochets manquants
-    {"key": "value" → {"key": "value"}
+    Parcourt le JSON une seule fois et collecte les corrections des actions
+    demandées (None = toutes celles du JSON, voir correction_actions).
+
+    Corrige : virgules finales (virgules_finales), chaînes entre apostrophes
+    et chaînes non terminées (guillemets_doubles), clés sans guillemets
+    (guillemets_cles), accolades / crochets manquants (fermeture_conteneurs :
+    fermés là où le conteneur se termine vraiment, pas en fin de fichier
+    quand ce n'est pas le cas).
+
+    Une fermeture supprimée au milieu du fichier se voit à l'indentation :
+    un conteneur dont le contenu était plus indenté que sa ligne d'ouverture
+    se termine avant la première ligne qui revient à ce niveau (autre que
+    sa propre fermeture). Cet indice ne sert que s'il manque des fermantes
+    de ce type dans le texte : un JSON complet mais mal indenté n'y passe pas.
+
+    Retourne :
+        (edits, applied) → éditions (voir make_edit) + messages de corrections
     """
-    corrected = content
+    edits = []
+    # [[ouvrant, état, position de l'ouvrant, indentation de sa ligne,
+    #   contenu plus indenté vu]]
+    stack = []
+    open_counts = {'{': 0, '[': 0}    # nombre de { et de [ dans la pile
+    # Fermantes manquantes d'après le texte brut (chaînes comprises : approché)
+    missing = {'{': content.count('{') - content.count('}'),
+               '[': content.count('[') - content.count(']')}
+    line_start = True   # prochain token significatif = premier de sa ligne
+    indent = 0          # indentation de la ligne du dernier token significatif
+    recent = []         # 3 derniers tokens significatifs : (type, début, fin)
+    anchor = 0          # fin du dernier token significatif hors virgule
+    counts = {"commas": 0, "separators": 0, "quotes": 0, "keys": 0, "strings": 0, "{": 0, "[": 0}
+    if actions is None:
+        actions = CORRECTION_ACTIONS["json"]
+    fix_commas = "virgules_finales" in actions
+    fix_quotes = "guillemets_doubles" in actions
+    fix_keys = "guillemets_cles" in actions
+    close_containers = "fermeture_conteneurs" in actions
+
+    def close_frames(count, offset):
+        """Ferme les count conteneurs du haut de la pile, à offset"""
+        for _ in range(count):
+            opener = stack.pop()[0]
+            open_counts[opener] -= 1
+            missing[opener] -= 1
+            if close_containers:
+                closer = _JSON_CLOSERS[opener]
+                edits.append(make_edit(offset, 0, closer, f"Ajout de {closer}"))
+                counts[opener] += 1
+
+    for token in _JSON_TOKEN_RE.finditer(content):
+        kind = token.lastgroup
+        if kind == 'ws':
+            newline = token.group().rfind('\n')
+            if newline != -1:
+                line_start = True
+                indent = token.end() - token.start() - newline - 1
+            elif token.start() == 0:
+                indent = token.end()
+            continue
+        start, end = token.span()
+
+        # ── Premier token de la ligne : conteneurs terminés d'après l'indentation
+        if line_start:
+            line_start = False
+            closed = 0
+            while (close_containers and stack and stack[-1][4] and missing[stack[-1][0]] > 0
+                   and (indent < stack[-1][3]
+                        or (indent == stack[-1][3] and token.group() not in '}],'))):
+                close_frames(1, anchor)
+                closed += 1
+            # La fermeture supprimée emportait souvent sa virgule ("],")
+            if (closed and stack and stack[-1][1] == 'comma'
+                    and (kind != 'punct' or token.group() in '{[')):
+                if not (recent and recent[-1][0] == ','):
+                    edits.append(make_edit(anchor, 0, ',', "Ajout d'une virgule"))
+                    counts["separators"] += 1
+                stack[-1][1] = 'key' if stack[-1][0] == '{' else 'value'
+            if stack and indent > stack[-1][3]:
+                stack[-1][4] = True
+        top = stack[-1] if stack else None
+
+        # ── Valeurs (et clés) : chaînes et mots
+        if kind in ('string', 'single', 'word'):
+            if not fix_quotes:
+                pass    # chaînes laissées telles quelles
+            elif kind == 'string' and token.group('string_end') is None:
+                text_end = start + len(token.group().rstrip())
+                edits.append(make_edit(text_end, 0, '"', "Fermeture de la chaîne"))
+                counts["strings"] += 1
+            elif kind == 'single' and token.group('single_end') is not None:
+                edits.append(make_edit(start, end - start, _single_to_double(token.group()),
+                                       "Conversion guillemets simples → doubles"))
+                counts["quotes"] += 1
+
+            if top is not None and top[0] == '{' and top[1] == 'key':
+                if kind == 'word' and fix_keys:
+                    edits.append(make_edit(start, end - start, f'"{token.group()}"',
+                                           "Ajout de guillemets à la clé"))
+                    counts["keys"] += 1
+                top[1] = 'colon'
+            elif top is not None:
+                top[1] = 'comma'
+            anchor = end
+
+        # ── Ouverture d'un conteneur
+        elif kind == 'punct' and token.group() in '{[':
+            if top is not None:
+                top[1] = 'comma'
+            stack.append([token.group(), 'key' if token.group() == '{' else 'value', start,
+                          indent, False])
+            open_counts[token.group()] += 1
+            anchor = end
+
+        # ── Fermeture d'un conteneur
+        elif kind == 'punct' and token.group() in '}]':
+            if fix_commas and recent and recent[-1][0] == ',':
+                edits.append(make_edit(recent[-1][1], 1, '', "Suppression de la virgule finale"))
+                counts["commas"] += 1
+            opener = _JSON_OPENERS[token.group()]
+            # Sans ouvrant correspondant dans la pile, inutile de la parcourir
+            if open_counts[opener]:
+                for index in range(len(stack) - 1, -1, -1):
+                    if stack[index][0] == opener:
+                        # Les conteneurs au-dessus n'ont jamais été fermés :
+                        # on les ferme juste après leur dernière valeur
+                        close_frames(len(stack) - 1 - index, anchor)
+                        stack.pop()
+                        open_counts[opener] -= 1
+                        break
+            anchor = end
+
+        # ── Deux-points
+        elif token.group() == ':':
+            if top is not None and top[0] == '{' and top[1] == 'colon':
+                top[1] = 'value'
+            elif (top is not None and top[0] == '[' and open_counts['{']
+                  and len(recent) >= 3 and recent[-1][0] == 'string' and recent[-2][0] == ','):
+                # "clé": dans un tableau → le tableau aurait dû être fermé avant cette clé
+                depth = len(stack) - 1
+                while depth >= 0 and stack[depth][0] == '[':
+                    depth -= 1
+                if depth >= 0:
+                    close_frames(len(stack) - 1 - depth, recent[-3][2])
+                    stack[-1][1] = 'value'
+
+        # ── Virgule
+        elif token.group() == ',':
+            if top is not None and top[1] == 'comma':
+                top[1] = 'key' if top[0] == '{' else 'value'
+
+        significant = 'string' if kind in ('string', 'single') else token.group() if kind == 'punct' else kind
+        recent.append((significant, start, end))
+        if len(recent) > 3:
+            del recent[0]
+
+    # ── Fin de fichier : conteneurs restés ouverts
+    if stack and close_containers:
+        if fix_commas and recent and recent[-1][0] == ',':
+            edits.append(make_edit(recent[-1][1], 1, '', "Suppression de la virgule finale"))
+            counts["commas"] += 1
+        lines = _line_indents(content, [frame[2] for frame in stack] + [anchor])
+        anchor_line_start = lines[anchor][0]
+        while stack:
+            opener, _, opened_at, _, _ = stack.pop()
+            closer = _JSON_CLOSERS[opener]
+            if opened_at >= anchor_line_start:
+                text = closer
+            else:
+                text = '\n' + (' ' * lines[opened_at][1]) + closer
+            edits.append(make_edit(anchor, 0, text, f"Ajout de {closer}"))
+            counts[opener] += 1
+
     applied = []
-    
-    # Compter les accolades et crochets
-    open_braces = content.count('{')
-    close_braces = content.count('}')
-    open_brackets = content.count('[')
-    close_brackets = content.count(']')
-    
-    # Ajouter les fermetures manquantes
-    if open_braces > close_braces:
-        missing = open_braces - close_braces
-        corrected += '\n' + ('}' * missing)
-        applied.append(f"Fermeture de {missing} accolade(s)")
-    
-    if open_brackets > close_brackets:
-        missing = open_brackets - close_brackets
-        corrected += '\n' + (']' * missing)
-        applied.append(f"Fermeture de {missing} crochet(s)")
-    
-    return corrected, applied
+    if counts["commas"]:
+        applied.append("Suppression des virgules finales")
+    if counts["separators"]:
+        applied.append(f"Ajout de {counts['separators']} virgule(s)")
+    if counts["quotes"]:
+        applied.append("Conversion guillemets simples → doubles")
+    if counts["keys"]:
+        applied.append(f"Ajout de guillemets à {counts['keys']} clé(s)")
+    if counts["strings"]:
+        applied.append(f"Fermeture de {counts['strings']} chaîne(s)")
+    if counts["{"]:
+        applied.append(f"Fermeture de {counts['{']} accolade(s)")
+    if counts["["]:
+        applied.append(f"Fermeture de {counts['[']} crochet(s)")
 
+    return edits, applied
 
-def _correct_json(content):
-    """Applique toutes les corrections automatiques JSON"""
-    corrected = content
-    all_applied = []
-    
-    # 1. Virgules finales
-    corrected, applied = fix_json_trailing_commas(corrected)
-    all_applied.extend(applied)
-    
-    # 2. Guillemets simples → doubles
-    corrected, applied = fix_json_single_quotes(corrected)
-    all_applied.extend(applied)
-    
-    # 3. Clés sans guillemets
-    corrected, applied = fix_json_missing_quotes(corrected)
-    all_applied.extend(applied)
-    
-    # 4. Accolades/crochets non fermés
-    corrected, applied = fix_json_unclosed_brackets(corrected)
-    all_applied.extend(applied)
-    
-    return {
-        "corrected": corrected,
-        "applied_corrections": all_applied,
-        "has_changes": len(all_applied) > 0
-    }
+
+def _correct_json(content, actions=None):
+    """Calcule les corrections automatiques JSON (un seul passage)"""
+    edits, applied = _scan_json_fixes(content, actions)
+    return _correction(edits, applied)
 
 
 # ==============================
 # FONCTION PRINCIPALE
 # ==============================
-def auto_correct(content, file_type):
+def compute_corrections(content, file_type, actions=None):
     """
-    Applique les corrections automatiques au contenu.
+    Calcule les corrections automatiques sans produire le texte corrigé.
     
     Paramètres :
         content   → contenu brut du fichier
         file_type → "json" ou "xml"
+        actions   → actions à appliquer (voir correction_actions) ;
+                    None = toutes celles du type de fichier
     
     Retourne :
         {
-            "corrected": str,
+            "edits": [édition, ...],        → voir make_edit
             "applied_corrections": [str, ...],
             "has_changes": bool
         }
     """
     if file_type == "json":
-        return _correct_json(content)
+        return _correct_json(content, actions)
     elif file_type == "xml":
-        return _correct_xml(content)
+        return _correct_xml(content, actions)
     
     # Type inconnu → aucune correction
     return {
-        "corrected": content,
+        "edits": [],
         "applied_corrections": [],
         "has_changes": False
     }
 
 
+def auto_correct(content, file_type, actions=None):
+    """
+    Applique les corrections automatiques au contenu.
+    
+    Paramètres :
+        content   → contenu brut du fichier
+        file_type → "json" ou "xml"
+        actions   → voir compute_corrections
+    
+    Retourne :
+        {
+            "corrected": str,
+            "edits": [édition, ...],        → voir make_edit
+            "applied_corrections": [str, ...],
+            "has_changes": bool
+        }
+    """
+    correction = compute_corrections(content, file_type, actions)
+    correction["corrected"] = apply_edits(content, correction["edits"])
+    return correction
+
+
 # ==============================
 # VÉRIFICATION DE FAISABILITÉ
 # ==============================
@@ -342,20 +885,8 @@ def can_auto_correct(error_matched):
     if not error_matched:
         return False
     
-    # Liste étendue des erreurs auto-corrigeables
-    auto_correctable_ids = [
-        "XML_001",  # Balise auto-fermante
-        "XML_002",  # Balise non fermée
-        "XML_004",  # Commentaire non fermé
-        "XML_005",  # Caractères non échappés
-        "XML_006",  # Balises mismatch
-        "JSON_001", # Virgule finale
-        "JSON_002", # Guillemets simples
-        "JSON_003", # Clé sans guillemets
-        "JSON_004"  # Accolade non fermée
-    ]
-    
-    if error_matched.get("id") in auto_correctable_ids:
+    # Règles de errors_db qui ont une action de correction implémentée
+    if error_matched.get("id") in get_rules()["auto_ids"]:
         return True
     
     return error_matched.get("correction_automatique", False)
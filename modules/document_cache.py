@@ -0,0 +1,77 @@
+"""
+document_cache.py
+Calculs faits une fois par document (événements XML, index des lignes),
+gardés le temps d'une validation et pas plus.
+
+Un lru_cache global gardait les derniers documents vus (plusieurs Mo
+chacun) et leurs résultats pendant toute la vie du processus Streamlit.
+Ici le cache n'existe qu'à l'intérieur d'un document_scope() : validate()
+en ouvre un, et les étapes appelées dedans (matcher, locator, correcteur,
+réparation) partagent le même découpage. À la sortie du bloc, tout est
+libéré. Hors d'un scope, chaque appel recalcule.
+
+    @per_document
+    def scan_xml(content): ...
+
+    with document_scope():
+        events = scan_xml(content)       # calculé
+        events = scan_xml(content)       # même tuple, sans nouveau parcours
+        scan_xml.cached(other)           # None : pas encore calculé (sans calculer)
+
+Le scope est propre à chaque thread et à chaque tâche asyncio
+(contextvars) : deux validations en parallèle ne partagent rien.
+document_scope() sert aussi de décorateur pour les points d'entrée
+publics (validate(), match_all_errors(), correct_window()...).
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+
+# Documents gardés par calcul dans un même scope : la boucle de correction
+# produit un nouveau texte à chaque tour, seuls les derniers resservent
+MAX_DOCUMENTS = 2
+
+_caches = ContextVar("document_caches", default=None)
+
+
+@contextmanager
+def document_scope():
+    """
+    Ouvre le cache par document jusqu'à la fin du bloc. Un scope ouvert
+    dans un autre réutilise celui du dessus (le plus externe le libère).
+    """
+    if _caches.get() is not None:
+        yield
+        return
+    token = _caches.set({})
+    try:
+        yield
+    finally:
+        _caches.reset(token)
+
+
+def per_document(func):
+    """Garde func(content) en cache dans le document_scope() courant, par texte (voir le module)"""
+    @wraps(func)
+    def wrapper(content):
+        caches = _caches.get()
+        if caches is None:
+            return func(content)
+        cache = caches.setdefault(func, {})
+        result = cache.get(content)
+        if result is None:
+            result = func(content)
+            if len(cache) >= MAX_DOCUMENTS:
+                del cache[next(iter(cache))]
+            cache[content] = result
+        return result
+
+    def cached(content):
+        """Résultat déjà calculé pour content dans le scope courant, ou None (sans calculer)"""
+        caches = _caches.get()
+        return None if caches is None else caches.get(func, {}).get(content)
+
+    wrapper.cached = cached
+    return wrapper
@@ -5,27 +5,30 @@ Retourne le bon message, les exemples, et le niveau (novice/modder)
 ✨ AMÉLIORÉ : Extrait le nom exact des balises problématiques
 """
 
-import json
 import re
-from pathlib import Path
+
+from modules.document_cache import document_scope
+from modules.knowledge_base import get_knowledge_base
+from modules.messages import (
+    ENTRY_TEXT_FIELDS, Message, entry_messages, field_message, message_fields,
+)
+from modules.rules import detect_rules
+from modules.xml_scanner import CLOSE, OPEN, events_before, scan_xml
 
 # ==============================
 # CHARGEMENT DE LA BASE
 # ==============================
-def load_errors_db():
-    """Charge errors_db.json depuis le dossier data/"""
-    db_path = Path(__file__).parent.parent / "data" / "errors_db.json"
-    with open(db_path, "r", encoding="utf-8") as f:
-        return json.load(f)["errors"]
+# errors_db vit dans la base de connaissances partagée (modules/knowledge_base.py) :
+# indexée, compilée une fois, rechargée quand le fichier change.
 
-# Cache en mémoire pour ne pas relire le fichier à chaque fois
-_ERRORS_DB = None
+def load_errors_db():
+    """Relit errors_db.json depuis le dossier data/"""
+    kb = get_knowledge_base()
+    kb.reload(force=True)
+    return kb.entries()
 
 def get_errors_db():
-    global _ERRORS_DB
-    if _ERRORS_DB is None:
-        _ERRORS_DB = load_errors_db()
-    return _ERRORS_DB
+    return get_knowledge_base().entries()
 
 
 # ==============================
@@ -78,168 +81,184 @@ def find_unclosed_tag_name(content, error_line):
     Returns:
         str: Nom de la balise non fermée ou None
     """
-    lines = content.split('\n')
+    # Fin de la ligne d'erreur
+    limit = -1
+    for _ in range(max(error_line, 1)):
+        limit = content.find('\n', limit + 1)
+        if limit == -1:
+            limit = len(content)
+            break
+
+    # Parser jusqu'à la ligne d'erreur (événements partagés, voir modules/xml_scanner.py)
     open_tags = []
-    
-    # Parser jusqu'à la ligne d'erreur
-    for i, line in enumerate(lines[:error_line], start=1):
-        # Ignorer commentaires
-        line_clean = re.sub(r'<!--.*?-->', '', line)
-        
-        # Ignorer balises auto-fermantes
-        line_clean = re.sub(r'<[^>]+/>', '', line_clean)
-        
-        # Trouver balises fermantes
-        closing_tags = re.findall(r'</(\w+)>', line_clean)
-        for tag in closing_tags:
-            if open_tags and open_tags[-1] == tag:
+    for kind, start, end, name, well_formed in events_before(scan_xml(content), limit):
+        if kind == OPEN:
+            open_tags.append(name)
+        elif kind == CLOSE:
+            if open_tags and open_tags[-1] == name:
                 open_tags.pop()
-        
-        # Trouver balises ouvrantes
-        opening_tags = re.findall(r'<(\w+)(?:\s[^>]*)?>(?![^<]*/>)', line_clean)
-        for tag in opening_tags:
-            open_tags.append(tag)
     
     # La dernière balise ouverte = balise non fermée
     return open_tags[-1] if open_tags else None
 
 
 # ==============================
-# MATCHING — JSON
+# ENRICHISSEMENT DES MESSAGES
 # ==============================
-def match_json_error(content, error):
+# Le message d'origine (reconstruit depuis sa clé) est enveloppé dans un
+# message qui ajoute le nom de la balise : clé et valeurs sont réécrites
+# ensemble (message_fields de modules/messages.py).
+def _enrich_mismatched_tag(matched, content, error, error_line):
+    """Ajoute le nom de la balise fermante fautive (XML_006)"""
+    tag_name = extract_tag_name_from_error(str(error), content, error_line)
+    if not tag_name:
+        return matched
+    matched = matched.copy()
+    matched.update(message_fields("message_novice", Message(
+        "matcher.fermante_concernee", message=field_message(matched, "message_novice"), tag=tag_name)))
+    matched.update(message_fields("message_modder", Message(
+        "matcher.balise_problematique", message=field_message(matched, "message_modder"), tag=tag_name)))
+    matched["tag_name"] = tag_name
+    return matched
+
+
+def _enrich_unclosed_tag(matched, content, error, error_line):
+    """Ajoute le nom de la balise restée ouverte (XML_002)"""
+    tag_name = find_unclosed_tag_name(content, error_line)
+    if not tag_name:
+        return matched
+    matched = matched.copy()
+    matched.update(message_fields("message_novice", Message(
+        "matcher.ouvrante_concernee", message=field_message(matched, "message_novice"), tag=tag_name)))
+    matched.update(message_fields("message_modder", Message(
+        "matcher.balise_non_fermee", message=field_message(matched, "message_modder"), tag=tag_name)))
+    matched["tag_name"] = tag_name
+    return matched
+
+
+# Noms utilisables dans le champ "extraction" des règles de errors_db
+_EXTRACTIONS = {
+    "balise_du_message": _enrich_mismatched_tag,
+    "balise_non_fermee": _enrich_unclosed_tag,
+}
+
+
+# ==============================
+# MATCHING PAR RÈGLES
+# ==============================
+# Au-delà de cette distance (en lignes), un indice ne compte plus que pour moitié
+_PROXIMITY_LINES = 50
+
+
+def _error_line(error):
+    """Ligne signalée par le parseur (ParseError ou JSONDecodeError)"""
+    if hasattr(error, 'position'):
+        return error.position[0]
+    return getattr(error, 'lineno', 0)
+
+
+def _lines_of(content, positions):
     """
-    Prend le contenu du fichier + l'erreur JSONDecodeError
-    Retourne l'entrée correspondante de errors_db ou None
+    Numéros de ligne (1-based) des positions, en un seul parcours :
+    chaque ligne se déduit de la précédente en comptant les \\n entre les deux.
     """
-    db = get_errors_db()
-    msg = str(error).lower()
+    lines = []
+    line, last = 1, 0
+    for pos in sorted(positions):
+        line += content.count("\n", last, pos)
+        last = pos
+        lines.append(line)
+    return lines
 
-    # Virgule finale avant } ou ]
-    if re.search(r',\s*[}\]]', content):
-        return _get_by_id("JSON_001")
 
-    # Guillemets simples
-    if "'" in content and ("expecting" in msg or "expecting property" in msg):
-        return _get_by_id("JSON_002")
+def _proximity(line, error_line):
+    """
+    1 sur la ligne du parseur, décroît avec la distance. Un indice après
+    la ligne du parseur ne peut pas être la cause de l'erreur (le parseur
+    s'arrête au premier problème) : c'est un autre problème, compté à moitié.
+    """
+    distance = abs(line - error_line)
+    weight = 0.5 if line > error_line else 1.0
+    return weight / (1 + distance / _PROXIMITY_LINES)
 
-    # Clé sans guillemets
-    if "expecting property name" in msg:
-        return _get_by_id("JSON_003")
 
-    # Accolade / crochet non fermé
-    if _check_parentheses_balance(content):
-        return _get_by_id("JSON_004")
+@document_scope()
+def match_all_errors(content, error, file_type):
+    """
+    Toutes les entrées de errors_db qui s'appliquent, classées.
 
-    return None
+    Tous les détecteurs du type de fichier tournent ensemble, chaque motif
+    une seule fois (voir rules.scan_detectors). Chaque règle détectée reçoit une
+    confiance : sa confiance de base (errors_db) × la proximité de l'indice
+    le plus proche de la ligne signalée par le parseur. Une règle détectée
+    par le message du parseur seul est à la ligne du parseur.
+
+    Retourne :
+        [entrée, ...] de la plus probable à la moins probable
+        (copies de errors_db, enrichies comme par match_error, avec en plus
+         "confidence": float (0 à 1) et "match_line": int ; titre,
+         message_novice et message_modder ne sont rangés que par leurs
+         clés et valeurs (titre_key, titre_params...), rendus à
+         l'affichage dans la langue de la requête, voir modules/messages.py)
+    """
+    msg = str(error).lower()
+    error_line = _error_line(error)
+    detected = detect_rules(get_rules(), file_type, content, msg)
+    if not detected:
+        return []
+
+    ranked = []
+    for rule, positions in detected:
+        entry = _get_by_id(rule["id"])
+        if not entry:
+            continue
+        if positions:
+            # Indice le plus proche, en préférant ceux avant (ou sur) la ligne du parseur
+            line = min(_lines_of(content, positions), key=lambda l: (l > error_line, abs(l - error_line)))
+        else:
+            line = error_line
+        confidence = rule["confiance"] * _proximity(line, error_line)
+        ranked.append((-confidence, abs(line - error_line), rule["priorite"], rule, entry, line, confidence))
+
+    ranked.sort(key=lambda item: item[:3])
+
+    results = []
+    for _, _, _, rule, entry, line, confidence in ranked:
+        entry = {key: value for key, value in entry.items() if key not in ENTRY_TEXT_FIELDS}
+        entry.update(entry_messages(entry["id"]))
+        enrich = _EXTRACTIONS.get(rule["extraction"])
+        if enrich:
+            entry = enrich(entry, content, error, error_line)
+        entry = dict(entry, confidence=round(confidence, 2), match_line=line)
+        results.append(entry)
+    return results
+
+
+def match_json_error(content, error):
+    """
+    Prend le contenu du fichier + l'erreur JSONDecodeError
+    Retourne l'entrée la plus probable de errors_db ou None
+    """
+    matches = match_all_errors(content, error, "json")
+    return matches[0] if matches else None
 
 
-# ==============================
-# MATCHING — XML
-# ==============================
 def match_xml_error(content, error):
     """
     Prend le contenu du fichier + l'erreur ParseError
-    Retourne l'entrée correspondante de errors_db ou None
+    Retourne l'entrée la plus probable de errors_db ou None
     ✨ AMÉLIORÉ : Ajoute le nom de la balise dans le résultat
     """
-    msg = str(error).lower()
-    error_line = error.position[0] if hasattr(error, 'position') else 0
-
-    # Commentaire non fermé (vérifie en premier — bloque tout le reste)
-    if _check_unclosed_comment(content):
-        return _get_by_id("XML_004")
-
-    # Caractère spécial non échappé
-    if re.search(r'&(?!(amp|lt|gt|quot|apos);)', content):
-        return _get_by_id("XML_005")
-
-    # ✨ Mismatch tag (balise fermante qui ne correspond pas)
-    if "mismatched tag" in msg or "opening and ending tag mismatch" in msg:
-        matched = _get_by_id("XML_006")
-        if matched:
-            tag_name = extract_tag_name_from_error(str(error), content, error_line)
-            if tag_name:
-                # Enrichir les messages avec le nom exact
-                matched = matched.copy()
-                matched["message_novice"] = matched["message_novice"].replace(
-                    "comme </fog>", 
-                    f"</{tag_name}>"
-                )
-                matched["message_modder"] = matched["message_modder"] + f" Balise problématique : <{tag_name}>"
-                matched["tag_name"] = tag_name
-        return matched
-
-    # ✨ Balise ouvrante sans fermeture
-    if "no element found" in msg or "unclosed token" in msg:
-        matched = _get_by_id("XML_002")
-        if matched:
-            tag_name = find_unclosed_tag_name(content, error_line)
-            if tag_name:
-                # Enrichir les messages avec le nom exact
-                matched = matched.copy()
-                matched["message_novice"] = matched["message_novice"].replace(
-                    "<overcast>",
-                    f"<{tag_name}>"
-                ).replace(
-                    "</overcast>",
-                    f"</{tag_name}>"
-                )
-                matched["message_modder"] = matched["message_modder"] + f" Balise non fermée : <{tag_name}>"
-                matched["tag_name"] = tag_name
-        return matched
-
-    # Attribut mal formé
-    if "not well-formed" in msg or "syntax error" in msg:
-        # Vérifie si c'est vraiment un attribut
-        if _check_malformed_attribute(content):
-            return _get_by_id("XML_003")
-        # Sinon c'est probablement une balise auto-fermante mal écrite
-        if _check_missing_self_close(content):
-            return _get_by_id("XML_001")
-
-    return None
+    matches = match_all_errors(content, error, "xml")
+    return matches[0] if matches else None
 
 
 # ==============================
-# CHECKS INTERNES
+# TABLE DES RÈGLES
 # ==============================
-def _check_parentheses_balance(content):
-    """Vérifie si les { } [ ] sont bien équilibrés"""
-    return (
-        content.count("{") != content.count("}") or
-        content.count("[") != content.count("]")
-    )
-
-def _check_unclosed_comment(content):
-    """Vérifie s'il y a un commentaire XML non fermé"""
-    opens = [m.start() for m in re.finditer(r'<!--', content)]
-    closes = [m.start() for m in re.finditer(r'-->', content)]
-    return len(opens) > len(closes)
-
-def _check_malformed_attribute(content):
-    """Vérifie s'il y a un attribut mal formé dans le contenu"""
-    # Attribut sans valeur : name= sans guillemets après
-    if re.search(r'\w+=\s*[^"\s>]', content):
-        return True
-    # Attribut avec = mais rien après
-    if re.search(r'\w+=\s*[>\/]', content):
-        return True
-    return False
-
-def _check_missing_self_close(content):
-    """Vérifie les balises qui devraient être auto-fermantes mais ne le sont pas"""
-    # Liste des balises connues comme auto-fermantes dans DayZ
-    self_closing_tags = [
-        "current", "limits", "timelimits", "changelimits",
-        "thresholds", "storm", "item", "type", "zone"
-    ]
-    for tag in self_closing_tags:
-        # Cherche une balise ouverte sans /> ni </tag>
-        pattern = rf'<{tag}\s[^>]*[^/]>'
-        if re.search(pattern, content):
-            return True
-    return False
+def get_rules():
+    """Règles de errors_db compilées (voir modules/rules.py)"""
+    return get_knowledge_base().rules()
 
 
 # ==============================
@@ -247,11 +266,7 @@ def _check_missing_self_close(content):
 # ==============================
 def _get_by_id(error_id):
     """Retourne l'entrée de errors_db correspondant à l'id"""
-    db = get_errors_db()
-    for entry in db:
-        if entry["id"] == error_id:
-            return entry
-    return None
+    return get_knowledge_base().get(error_id)
 
 
 # ==============================
@@ -267,9 +282,11 @@ def match_error(content, error, file_type):
         file_type → "json" ou "xml"
     
     Retourne :
-        dict avec : id, titre, message_novice, message_modder,
+        dict avec : id, titre, message_novice, message_modder (clés et
+                    valeurs : titre_key, titre_params..., voir render_field),
                     exemple_avant, exemple_après, correction_automatique
                     ✨ + tag_name si balise détectée
+                    ✨ + confidence, match_line (voir match_all_errors)
         ou None si rien ne matche
     """
     if file_type == "json":
@@ -0,0 +1,478 @@
+"""
+indexer.py
+Index SQLite des classnames d'une mission DayZ.
+Ingère types.xml, events.xml, cfgeventspawns.xml et les fichiers de territoires
+une seule fois, puis répond aux questions du genre
+"quels fichiers mentionnent AKM ?" ou "tous les items Tier4 avec nominal > 20"
+sans reparser le moindre XML.
+
+La mise à jour est incrémentale : un fichier n'est réindexé que si son hash a changé.
+"""
+
+import hashlib
+import sqlite3
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+
+# ==============================
+# SCHÉMA DE LA BASE
+# ==============================
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id         INTEGER PRIMARY KEY,
+    path       TEXT NOT NULL UNIQUE,
+    kind       TEXT NOT NULL,
+    sha1       TEXT NOT NULL,
+    indexed_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS types (
+    id       INTEGER PRIMARY KEY,
+    file_id  INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name     TEXT NOT NULL COLLATE NOCASE,
+    nominal  INTEGER,
+    min      INTEGER,
+    lifetime INTEGER,
+    restock  INTEGER,
+    quantmin INTEGER,
+    quantmax INTEGER,
+    cost     INTEGER,
+    category TEXT COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS idx_types_name     ON types(name);
+CREATE INDEX IF NOT EXISTS idx_types_category ON types(category);
+CREATE INDEX IF NOT EXISTS idx_types_nominal  ON types(nominal);
+CREATE INDEX IF NOT EXISTS idx_types_file     ON types(file_id);
+
+CREATE TABLE IF NOT EXISTS type_usages (
+    type_id INTEGER NOT NULL REFERENCES types(id) ON DELETE CASCADE,
+    name    TEXT NOT NULL COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS idx_type_usages_name ON type_usages(name, type_id);
+
+CREATE TABLE IF NOT EXISTS type_values (
+    type_id INTEGER NOT NULL REFERENCES types(id) ON DELETE CASCADE,
+    name    TEXT NOT NULL COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS idx_type_values_name ON type_values(name, type_id);
+
+CREATE TABLE IF NOT EXISTS events (
+    id       INTEGER PRIMARY KEY,
+    file_id  INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name     TEXT NOT NULL COLLATE NOCASE,
+    nominal  INTEGER,
+    min      INTEGER,
+    max      INTEGER,
+    lifetime INTEGER,
+    active   INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_events_name ON events(name);
+CREATE INDEX IF NOT EXISTS idx_events_file ON events(file_id);
+
+CREATE TABLE IF NOT EXISTS event_children (
+    event_id INTEGER NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+    type     TEXT NOT NULL COLLATE NOCASE,
+    min      INTEGER,
+    max      INTEGER,
+    lootmin  INTEGER,
+    lootmax  INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_event_children_type ON event_children(type);
+
+CREATE TABLE IF NOT EXISTS event_spawns (
+    file_id    INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    event_name TEXT NOT NULL COLLATE NOCASE,
+    x          REAL,
+    z          REAL,
+    a          REAL
+);
+CREATE INDEX IF NOT EXISTS idx_event_spawns_name ON event_spawns(event_name);
+CREATE INDEX IF NOT EXISTS idx_event_spawns_file ON event_spawns(file_id);
+
+CREATE TABLE IF NOT EXISTS territory_zones (
+    file_id   INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    territory INTEGER NOT NULL,
+    name      TEXT NOT NULL COLLATE NOCASE,
+    x         REAL,
+    z         REAL,
+    r         REAL
+);
+CREATE INDEX IF NOT EXISTS idx_territory_zones_name ON territory_zones(name);
+CREATE INDEX IF NOT EXISTS idx_territory_zones_file ON territory_zones(file_id);
+
+-- Table de renvoi : un classname → les fichiers qui le citent (et à quel titre)
+CREATE TABLE IF NOT EXISTS mentions (
+    classname TEXT NOT NULL COLLATE NOCASE,
+    file_id   INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    role      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_mentions_classname ON mentions(classname);
+CREATE INDEX IF NOT EXISTS idx_mentions_file      ON mentions(file_id);
+"""
+
+# Balise racine → type de fichier indexé
+_ROOT_KINDS = {
+    "types": "types",
+    "events": "events",
+    "eventposdef": "eventspawns",
+    "territory-type": "territories",
+}
+
+# Issue de l'indexation d'un fichier (index_folder)
+INDEXED, UNCHANGED, BROKEN, UNSUPPORTED = "indexed", "unchanged", "broken", "unsupported"
+
+
+# ==============================
+# HELPERS
+# ==============================
+def _to_int(text):
+    """int() tolérant : None si la valeur est absente ou invalide"""
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(text):
+    """float() tolérant : None si la valeur est absente ou invalide"""
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def _file_sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+# ==============================
+# INDEX
+# ==============================
+class ClassnameIndex:
+    """
+    Index SQLite d'une mission.
+
+    Usage :
+        index = ClassnameIndex("mission_index.sqlite")
+        index.index_folder("mpmissions/dayzOffline.chernarusplus")
+        index.files_mentioning("AKM")
+        index.find_types(tier="Tier4", nominal_gt=20)
+    """
+
+    def __init__(self, db_path=":memory:"):
+        self.db_path = str(db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------
+    # INGESTION
+    # ------------------------------
+    def index_file(self, path):
+        """
+        Indexe un fichier si son contenu a changé depuis la dernière fois.
+
+        Retourne :
+            bool → True si le fichier a été (ré)indexé, False s'il était à jour,
+                   cassé ou si son type n'est pas pris en charge
+        """
+        return self._index_file(path) == INDEXED
+
+    def _index_file(self, path):
+        """index_file, avec le détail : INDEXED, UNCHANGED, BROKEN ou UNSUPPORTED"""
+        path = Path(path).resolve()
+        data = path.read_bytes()
+        sha1 = _file_sha1(data)
+
+        row = self.conn.execute(
+            "SELECT id, sha1 FROM files WHERE path = ?", (str(path),)
+        ).fetchone()
+        if row is not None and row["sha1"] == sha1:
+            return UNCHANGED
+
+        try:
+            root = ET.fromstring(data)
+        except ET.ParseError:
+            # Fichier cassé : on retire l'ancienne version de l'index
+            if row is not None:
+                with self.conn:
+                    self.conn.execute("DELETE FROM files WHERE id = ?", (row["id"],))
+            return BROKEN
+
+        kind = _ROOT_KINDS.get(root.tag)
+        if kind is None:
+            return UNSUPPORTED
+
+        with self.conn:
+            if row is not None:
+                # ON DELETE CASCADE nettoie toutes les tables filles
+                self.conn.execute("DELETE FROM files WHERE id = ?", (row["id"],))
+            file_id = self.conn.execute(
+                "INSERT INTO files (path, kind, sha1, indexed_at) VALUES (?, ?, ?, ?)",
+                (str(path), kind, sha1, time.time())
+            ).lastrowid
+
+            if kind == "types":
+                self._ingest_types(file_id, root)
+            elif kind == "events":
+                self._ingest_events(file_id, root)
+            elif kind == "eventspawns":
+                self._ingest_eventspawns(file_id, root)
+            elif kind == "territories":
+                self._ingest_territories(file_id, root)
+
+        return INDEXED
+
+    def index_folder(self, folder, pattern="*.xml"):
+        """
+        Indexe récursivement tous les fichiers XML d'un dossier.
+        Les fichiers disparus du dossier sont retirés de l'index.
+
+        Retourne :
+            {
+                "indexed": [path, ...],
+                "unchanged": int,
+                "broken": [path, ...],   → XML invalide, retiré de l'index
+                "unsupported": int,      → racine qui n'est pas un fichier de mission connu
+                "removed": int
+            }
+        """
+        folder = Path(folder).resolve()
+        seen = set()
+        indexed = []
+        broken = []
+        unchanged = 0
+        unsupported = 0
+
+        for path in sorted(folder.rglob(pattern)):
+            seen.add(str(path))
+            status = self._index_file(path)
+            if status == INDEXED:
+                indexed.append(str(path))
+            elif status == BROKEN:
+                broken.append(str(path))
+            elif status == UNSUPPORTED:
+                unsupported += 1
+            else:
+                unchanged += 1
+
+        removed = 0
+        for row in self.conn.execute("SELECT id, path FROM files").fetchall():
+            # is_relative_to et non startswith : /data/mod ne doit pas toucher /data/mod2
+            if Path(row["path"]).is_relative_to(folder) and row["path"] not in seen:
+                with self.conn:
+                    self.conn.execute("DELETE FROM files WHERE id = ?", (row["id"],))
+                removed += 1
+
+        return {
+            "indexed": indexed,
+            "unchanged": unchanged,
+            "broken": broken,
+            "unsupported": unsupported,
+            "removed": removed,
+        }
+
+    def _ingest_types(self, file_id, root):
+        cur = self.conn.cursor()
+        mentions = []
+        for type_elem in root.iter("type"):
+            name = (type_elem.get("name") or "").strip()
+            if not name:
+                continue
+            category = type_elem.find("category")
+            type_id = cur.execute(
+                "INSERT INTO types (file_id, name, nominal, min, lifetime, restock, "
+                "quantmin, quantmax, cost, category) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    file_id, name,
+                    _to_int(type_elem.findtext("nominal")),
+                    _to_int(type_elem.findtext("min")),
+                    _to_int(type_elem.findtext("lifetime")),
+                    _to_int(type_elem.findtext("restock")),
+                    _to_int(type_elem.findtext("quantmin")),
+                    _to_int(type_elem.findtext("quantmax")),
+                    _to_int(type_elem.findtext("cost")),
+                    category.get("name") if category is not None else None,
+                )
+            ).lastrowid
+            cur.executemany(
+                "INSERT INTO type_usages (type_id, name) VALUES (?, ?)",
+                [(type_id, u.get("name", "")) for u in type_elem.findall("usage")]
+            )
+            cur.executemany(
+                "INSERT INTO type_values (type_id, name) VALUES (?, ?)",
+                [(type_id, v.get("name", "")) for v in type_elem.findall("value")]
+            )
+            mentions.append((name, file_id, "type"))
+        cur.executemany("INSERT INTO mentions (classname, file_id, role) VALUES (?, ?, ?)", mentions)
+
+    def _ingest_events(self, file_id, root):
+        cur = self.conn.cursor()
+        mentions = []
+        for event_elem in root.iter("event"):
+            name = (event_elem.get("name") or "").strip()
+            if not name:
+                continue
+            event_id = cur.execute(
+                "INSERT INTO events (file_id, name, nominal, min, max, lifetime, active) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    file_id, name,
+                    _to_int(event_elem.findtext("nominal")),
+                    _to_int(event_elem.findtext("min")),
+                    _to_int(event_elem.findtext("max")),
+                    _to_int(event_elem.findtext("lifetime")),
+                    _to_int(event_elem.findtext("active")),
+                )
+            ).lastrowid
+            mentions.append((name, file_id, "event"))
+            for child in event_elem.iter("child"):
+                child_type = child.get("type", "")
+                cur.execute(
+                    "INSERT INTO event_children (event_id, type, min, max, lootmin, lootmax) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        event_id, child_type,
+                        _to_int(child.get("min")), _to_int(child.get("max")),
+                        _to_int(child.get("lootmin")), _to_int(child.get("lootmax")),
+                    )
+                )
+                if child_type:
+                    mentions.append((child_type, file_id, "event_child"))
+        cur.executemany("INSERT INTO mentions (classname, file_id, role) VALUES (?, ?, ?)", mentions)
+
+    def _ingest_eventspawns(self, file_id, root):
+        cur = self.conn.cursor()
+        for event_elem in root.iter("event"):
+            name = (event_elem.get("name") or "").strip()
+            if not name:
+                continue
+            cur.executemany(
+                "INSERT INTO event_spawns (file_id, event_name, x, z, a) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (file_id, name, _to_float(p.get("x")), _to_float(p.get("z")), _to_float(p.get("a")))
+                    for p in event_elem.iter("pos")
+                ]
+            )
+            cur.execute(
+                "INSERT INTO mentions (classname, file_id, role) VALUES (?, ?, ?)",
+                (name, file_id, "event_spawn")
+            )
+
+    def _ingest_territories(self, file_id, root):
+        cur = self.conn.cursor()
+        names = set()
+        for territory_idx, territory in enumerate(root.iter("territory")):
+            rows = []
+            for zone in territory.iter("zone"):
+                name = zone.get("name", "")
+                names.add(name)
+                rows.append((
+                    file_id, territory_idx, name,
+                    _to_float(zone.get("x")), _to_float(zone.get("z")), _to_float(zone.get("r")),
+                ))
+            cur.executemany(
+                "INSERT INTO territory_zones (file_id, territory, name, x, z, r) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        cur.executemany(
+            "INSERT INTO mentions (classname, file_id, role) VALUES (?, ?, ?)",
+            [(name, file_id, "territory_zone") for name in names if name]
+        )
+
+    # ------------------------------
+    # REQUÊTES
+    # ------------------------------
+    def files_mentioning(self, classname):
+        """
+        Quels fichiers mentionnent ce classname ? (insensible à la casse)
+
+        Retourne :
+            [{"path": str, "kind": str, "roles": [str, ...]}, ...]
+        """
+        rows = self.conn.execute(
+            "SELECT f.path, f.kind, GROUP_CONCAT(DISTINCT m.role) AS roles "
+            "FROM mentions m JOIN files f ON f.id = m.file_id "
+            "WHERE m.classname = ? GROUP BY f.id ORDER BY f.path",
+            (classname,)
+        ).fetchall()
+        return [
+            {"path": r["path"], "kind": r["kind"], "roles": sorted(r["roles"].split(","))}
+            for r in rows
+        ]
+
+    def find_types(self, category=None, usage=None, tier=None,
+                   nominal_gt=None, nominal_lt=None, name=None):
+        """
+        Recherche des items dans les types.xml indexés.
+        Tous les critères sont optionnels et combinés en ET.
+
+        Paramètres :
+            category   → nom de catégorie (ex: "weapons")
+            usage      → nom d'usage (ex: "Military")
+            tier       → valeur/tier (ex: "Tier4")
+            nominal_gt → nominal strictement supérieur à
+            nominal_lt → nominal strictement inférieur à
+            name       → classname exact
+
+        Retourne :
+            [{"name", "path", "nominal", "min", "lifetime", "restock",
+              "quantmin", "quantmax", "cost", "category"}, ...]
+        """
+        clauses = []
+        params = []
+
+        if name is not None:
+            clauses.append("t.name = ?")
+            params.append(name)
+        if category is not None:
+            clauses.append("t.category = ?")
+            params.append(category)
+        if nominal_gt is not None:
+            clauses.append("t.nominal > ?")
+            params.append(nominal_gt)
+        if nominal_lt is not None:
+            clauses.append("t.nominal < ?")
+            params.append(nominal_lt)
+        if usage is not None:
+            clauses.append("t.id IN (SELECT type_id FROM type_usages WHERE name = ?)")
+            params.append(usage)
+        if tier is not None:
+            clauses.append("t.id IN (SELECT type_id FROM type_values WHERE name = ?)")
+            params.append(tier)
+
+        sql = (
+            "SELECT t.name, f.path, t.nominal, t.min, t.lifetime, t.restock, "
+            "t.quantmin, t.quantmax, t.cost, t.category "
+            "FROM types t JOIN files f ON f.id = t.file_id"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY t.name, f.path"
+
+        return [dict(r) for r in self.conn.execute(sql, params).fetchall()]
+
+    def event_spawn_count(self, event_name):
+        """Nombre de positions de spawn déclarées pour un event (tous fichiers confondus)"""
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS n FROM event_spawns WHERE event_name = ?", (event_name,)
+        ).fetchone()
+        return row["n"]
+
+    def indexed_files(self):
+        """Liste des fichiers présents dans l'index"""
+        return [dict(r) for r in self.conn.execute(
+            "SELECT path, kind, sha1, indexed_at FROM files ORDER BY path"
+        ).fetchall()]
@@ -0,0 +1,141 @@
+"""
+knowledge_base.py
+Base de connaissances des erreurs (data/errors_db.json), partagée par le
+matcher, le correcteur, les rapports et l'interface.
+
+Une seule instance par processus (get_knowledge_base()), sûre entre threads :
+le serveur Streamlit sert plusieurs sessions en parallèle. Les entrées sont
+indexées par id et par type de fichier, les règles compilées une fois
+(voir modules/rules.py), et le fichier est rechargé automatiquement quand
+il change sur le disque (date de modification).
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from modules.rules import compile_rules
+
+
+DB_PATH = Path(__file__).parent.parent / "data" / "errors_db.json"
+# Écart minimal (secondes) entre deux vérifications de la date du fichier
+RELOAD_CHECK_INTERVAL = 1.0
+
+
+# ==============================
+# BASE DE CONNAISSANCES
+# ==============================
+class KnowledgeBase:
+    """
+    errors_db.json chargé, indexé et compilé.
+
+    Chaque chargement produit un état complet (entrées, index, règles)
+    remplacé d'un seul coup : un lecteur voit toujours un état cohérent,
+    même pendant un rechargement.
+    """
+
+    def __init__(self, path=DB_PATH, check_interval=RELOAD_CHECK_INTERVAL):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._state = None
+        self._mtime = None
+        self._last_check = 0.0
+
+    # ── Chargement
+    def _build_state(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        entries = data["errors"]
+
+        by_type = {}
+        for entry in entries:
+            by_type.setdefault(entry.get("type", "").lower(), []).append(entry)
+
+        return {
+            "version": data.get("version"),
+            "entries": entries,
+            "by_id": {entry["id"]: entry for entry in entries},
+            "by_type": by_type,
+            "rules": compile_rules(entries),
+        }
+
+    def reload(self, force=False):
+        """
+        Recharge le fichier s'il a changé (ou toujours si force).
+        Un fichier illisible (en cours d'édition...) est signalé et l'état
+        précédent est conservé ; au premier chargement, l'erreur remonte.
+
+        Retourne :
+            bool → True si la base a été (re)chargée
+        """
+        with self._lock:
+            self._last_check = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                if self._state is None:
+                    raise
+                return False
+            if not force and self._state is not None and mtime == self._mtime:
+                return False
+
+            try:
+                state = self._build_state()
+            except (OSError, ValueError, KeyError) as e:
+                if self._state is None:
+                    raise
+                print(f"❌ errors_db illisible, ancienne version conservée : {e}")
+                return False
+
+            self._state = state
+            self._mtime = mtime
+            return True
+
+    def _current(self):
+        """État courant, après rechargement si le fichier a changé"""
+        state = self._state
+        if state is None or time.monotonic() - self._last_check >= self.check_interval:
+            self.reload()
+            state = self._state
+        return state
+
+    # ── Lecture
+    @property
+    def version(self):
+        return self._current()["version"]
+
+    def entries(self):
+        """Toutes les entrées, dans l'ordre du fichier"""
+        return self._current()["entries"]
+
+    def get(self, error_id):
+        """Entrée d'id error_id, ou None"""
+        return self._current()["by_id"].get(error_id)
+
+    def entries_for(self, file_type):
+        """Entrées d'un type de fichier ("json" ou "xml")"""
+        return self._current()["by_type"].get(file_type, [])
+
+    def rules(self):
+        """Règles compilées (voir rules.compile_rules)"""
+        return self._current()["rules"]
+
+
+# ==============================
+# INSTANCE PARTAGÉE
+# ==============================
+_INSTANCE = None
+_INSTANCE_LOCK = threading.Lock()
+
+
+def get_knowledge_base():
+    """Instance unique de KnowledgeBase (créée au premier appel)"""
+    global _INSTANCE
+    if _INSTANCE is None:
+        with _INSTANCE_LOCK:
+            if _INSTANCE is None:
+                _INSTANCE = KnowledgeBase()
+    return _INSTANCE
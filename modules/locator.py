@@ -4,236 +4,538 @@ Remonte depuis la ligne signalée par le parseur pour trouver la vraie source de
 Le parseur XML Python remonte souvent l'erreur en fin de fichier alors que la cause réelle est plus haut.
 Ce module cherche cette cause réelle.
 
-Utilisé uniquement pour du XML. En JSON, le parseur donne déjà la bonne ligne.
+En JSON, le parseur donne la bonne ligne pour une erreur de syntaxe locale,
+mais signale une accolade ou un crochet manquant en fin de fichier :
+locate_json_error() remonte à l'endroit où la structure a été ouverte.
+
+Tout est relevé en un seul parcours du fichier (_scan, _scan_json) : état
+commentaire, pile des balises, syntaxe des attributs et entités (XML, à
+partir des événements de modules/xml_scanner.py), pile des { [, chaînes et
+clés (JSON). Chaque problème relevé
+devient un candidat (position exacte, étendue, confiance), et les candidats
+sont classés (voir locate_candidates).
 """
 
 import re
 
+from modules.messages import Message, message_fields
+from modules.xml_scanner import AMP, BARE_AMP_RE, BROKEN, CLOSE, COMMENT, OPEN, SELF_CLOSE, scan_xml
+
 
 # ==============================
-# FONCTION PRINCIPALE
+# FONCTIONS PRINCIPALES
 # ==============================
 def locate_real_error(content, reported_line):
     """
     Fonction principale appelée par app.py après une erreur XML.
-    
+
     Paramètres :
         content        → contenu brut du fichier XML
         reported_line  → ligne signalée par le parseur (peut être fausse)
-    
+
     Retourne :
         {
             "real_line": int,           → ligne probable de la vraie cause
-            "confidence": str,          → "haute" / "moyenne" / "faible"
-            "reason": str,              → explication en français pourquoi cette ligne
-            "reported_line": int        → ligne du parseur (pour comparaison)
+            "confidence": float,        → 0 à 1 : confiance du premier candidat
+                                          (0.0 si rien n'a été trouvé)
+            "confidence_label": str,    → "haute" / "moyenne" / "faible"
+            "reason_key": str,          → clé et valeurs de l'explication, rendue
+            "reason_params": dict,        à l'affichage dans la langue voulue
+                                          (render_field, modules/messages.py)
+            "reported_line": int,       → ligne du parseur (pour comparaison)
+            "column": int,              → colonne (1-based) de la cause, 0 si inconnue
+            "offset": int ou None,      → position de la cause dans content
+            "length": int,              → longueur du passage en cause
+            "candidates": [...]         → tous les candidats classés (locate_candidates)
         }
     """
-    lines = content.splitlines()
-
     # Si le fichier est vide ou la ligne invalide
-    if not lines or reported_line < 1:
+    if not content.strip() or reported_line < 1:
         return _no_result(reported_line)
 
-    # On cherche dans cet ordre de priorité
-    checks = [
-        _find_unclosed_comment,
-        _find_unclosed_tag,
-        _find_orphan_closing_tag,
-        _find_malformed_attribute,
-        _find_unescaped_special_char,
-    ]
+    return _best_result(locate_candidates(content, reported_line), reported_line)
 
-    for check in checks:
-        result = check(lines, reported_line)
-        if result:
-            return result
-
-    # Rien trouvé → on garde la ligne du parseur
-    return _no_result(reported_line)
 
+def _best_result(candidates, reported_line):
+    """Candidats classés → dict de locate_real_error (le premier candidat)"""
+    if not candidates:
+        # Rien trouvé → on garde la ligne du parseur
+        return _no_result(reported_line)
 
-# ==============================
-# CHECK 1 : Commentaire non fermé
-# ==============================
-def _find_unclosed_comment(lines, reported_line):
+    best = candidates[0]
+    return {
+        "real_line": best["line"],
+        "confidence": best["confidence"],
+        "confidence_label": _confidence_label(best["confidence"]),
+        "reason_key": best["reason_key"],
+        "reason_params": best["reason_params"],
+        "reported_line": reported_line,
+        "column": best["column"],
+        "offset": best["offset"],
+        "length": best["length"],
+        "candidates": candidates
+    }
+
+
+def locate_candidates(content, reported_line):
     """
-    Cherche un <!-- sans --> correspondant.
-    Remonte depuis le début du fichier (un commentaire non fermé bloque tout).
+    Tous les endroits qui peuvent être la cause de l'erreur, du plus
+    probable au moins probable.
+
+    La confiance d'un candidat part de celle de sa sorte (CANDIDATE_KINDS),
+    diminue pour chaque occurrence suivante de la même sorte, et est
+    divisée par deux après la ligne du parseur : le parseur s'arrête au
+    premier problème, ce qui est plus bas est un autre problème.
+
+    Paramètres :
+        content        → contenu brut du fichier XML
+        reported_line  → ligne signalée par le parseur
+
+    Retourne :
+        [
+            {
+                "kind": str,            → clé de CANDIDATE_KINDS
+                "offset": int,          → position dans content (caractères)
+                "byte_offset": int,     → position dans le fichier encodé en UTF-8
+                "line": int,            → 1-based
+                "column": int,          → 1-based
+                "length": int,          → longueur du passage (caractères)
+                "confidence": float,    → 0 à 1
+                "reason_key": str,      → explication : clé et valeurs
+                "reason_params": dict,    (comme pour locate_real_error)
+            },
+            ...
+        ]
     """
-    open_count = 0
-
-    for i, line in enumerate(lines):
-        opens = len(re.findall(r'<!--', line))
-        closes = len(re.findall(r'-->', line))
-        open_count += opens - closes
-
-        # Dès qu'on a plus d'ouvertures que de fermetures, c'est ici
-        if open_count > 0:
-            return {
-                "real_line": i + 1,
-                "confidence": "haute",
-                "reason": f"Commentaire ouvert à la ligne {i + 1} mais jamais fermé avec -->. Tout ce qui suit est ignoré.",
-                "reported_line": reported_line
-            }
+    found = _scan(content)
+    # Une fermante orpheline laisse son ouvrante dans la pile : la balise
+    # "non fermée" n'est alors souvent qu'une conséquence
+    if any(item["kind"] == "orpheline" for item in found):
+        for item in found:
+            if item["kind"] == "ouvrante":
+                item["weight"] = 0.4
+    return _rank_candidates(content, found, CANDIDATE_KINDS, reported_line)
+
+
+def _rank_candidates(content, found, kinds, reported_line):
+    """Problèmes relevés par un scan → candidats classés (voir locate_candidates)"""
+    positions = _resolve_positions(content, [item["offset"] for item in found])
+
+    candidates = []
+    occurrences = {}
+    for item in found:
+        kind = item["kind"]
+        rank = occurrences.get(kind, 0)
+        occurrences[kind] = rank + 1
+        line, column, byte_offset = positions[item["offset"]]
+
+        confidence = kinds[kind]["confidence"] * _REPEAT_DECAY ** rank * item.get("weight", 1.0)
+        if line > reported_line:
+            confidence *= 0.5
+
+        candidates.append({
+            "kind": kind,
+            "offset": item["offset"],
+            "byte_offset": byte_offset,
+            "line": line,
+            "column": column,
+            "length": item["length"],
+            "confidence": round(confidence, 3),
+            **message_fields("reason", Message(kinds[kind]["message"], line=line, **item["details"])),
+        })
+
+    candidates.sort(key=lambda candidate: (-candidate["confidence"], candidate["offset"]))
+    return candidates
 
-    return None
+
+# ==============================
+# SORTES DE CANDIDATS
+# ==============================
+# Confiance de base de chaque sorte, dans l'ordre de priorité historique :
+# un commentaire non fermé masque tout ce qui suit, puis les balises.
+# message : clé de l'explication dans le catalogue (modules/messages.py).
+CANDIDATE_KINDS = {
+    "commentaire": {
+        "confidence": 0.95,
+        "message": "locator.commentaire",
+    },
+    "ouvrante": {
+        "confidence": 0.9,
+        "message": "locator.ouvrante",
+    },
+    "orpheline": {
+        "confidence": 0.85,
+        "message": "locator.orpheline",
+    },
+    "attribut_incomplet": {
+        "confidence": 0.8,
+        "message": "locator.attribut_incomplet",
+    },
+    "attribut_sans_guillemets": {
+        "confidence": 0.6,
+        "message": "locator.attribut_sans_guillemets",
+    },
+    "esperluette": {
+        "confidence": 0.55,
+        "message": "locator.esperluette",
+    },
+}
+
+# Occurrences suivantes d'une même sorte : confiance × 0.8 à chaque fois
+_REPEAT_DECAY = 0.8
+# Au-delà, les occurrences d'une même sorte ne sont plus relevées
+_MAX_PER_KIND = 5
+
+
+def _confidence_label(confidence):
+    """Confiance numérique → "haute" / "moyenne" / "faible" """
+    if confidence >= 0.75:
+        return "haute"
+    if confidence >= 0.5:
+        return "moyenne"
+    return "faible"
 
 
 # ==============================
-# CHECK 2 : Balise ouvrante sans fermeture
+# PARCOURS UNIQUE
 # ==============================
-def _find_unclosed_tag(lines, reported_line):
+# max=> ou min=/ : le = termine les attributs (le / éventuel est déjà retiré).
+# Les motifs commencent par le = (nom vérifié en arrière) : re saute
+# directement aux =, au lieu de retenter chaque caractère d'un long nom
+_INCOMPLETE_ATTR = re.compile(r'=(?<=[\w:.-]=)\s*$')
+_UNQUOTED_ATTR = re.compile(r'=(?<=[\w:.-]=)\s*[^"\'\s]\S*')
+_NAME_CHAR = re.compile(r'[\w:.-]')
+
+
+def _attribute_start(attributes, equals):
+    """Début du nom d'attribut qui précède le = en equals"""
+    start = equals
+    while start and _NAME_CHAR.match(attributes, start - 1):
+        start -= 1
+    return start
+
+
+def _check_attributes(attributes):
     """
-    Garde une pile des balises ouvrantes.
-    Si une balise reste dans la pile à la fin → elle n'a jamais été fermée.
-    Remonte depuis le début pour être précis.
+    Syntaxe des attributs d'une balise que le scanner n'a pas reconnue
+    bien formée. Retourne (sorte, début, fin) dans attributes, ou None.
     """
-    stack = []  # Liste de (nom_balise, numéro_ligne)
-
-    for i, line in enumerate(lines):
-        # Ignore les commentaires
-        clean_line = re.sub(r'<!--.*?-->', '', line)
-
-        # Balises auto-fermantes → on les ignore
-        # <current actual="0.45" />
-        auto_close = re.findall(r'<(\w+)[^>]*/>', clean_line)
-
-        # Balises ouvrantes : <overcast> ou <weather reset="0">
-        opens = re.findall(r'<(\w+)(?:\s[^>]*)?>',  clean_line)
-
-        # Balises fermantes : </overcast>
-        closes = re.findall(r'</(\w+)>', clean_line)
-
-        # Ajoute les ouvrantes (sauf auto-fermantes et déclaration XML)
-        # On skip aussi les balises avec un attribut mal formé → laissées pour _find_malformed_attribute
-        for tag in opens:
-            if tag not in auto_close and tag != '?xml':
-                if not re.search(r'\w+=\s*[>\/]', line) and not re.search(r'\w+=\s*[^"\s>][^>]*>', line):
-                    stack.append((tag, i + 1))
-
-        # Retire les fermantes de la pile
-        for tag in closes:
-            found = False
-            for j in range(len(stack) - 1, -1, -1):
-                if stack[j][0] == tag:
-                    stack.pop(j)
-                    found = True
-                    break
-            # Si la fermante ne correspond à rien dans la pile → c'est un mismatch
-            # On laisse _find_orphan_closing_tag gérer ce cas (message plus précis)
-            if not found:
-                return None
-
-    # Si la pile n'est pas vide → balise(s) non fermée(s)
-    if stack:
-        # On prend la première balise non fermée (la plus haute dans le fichier)
-        tag_name, line_num = stack[0]
-        return {
-            "real_line": line_num,
-            "confidence": "haute",
-            "reason": f"La balise <{tag_name}> ouverte à la ligne {line_num} n'est jamais fermée avec </{tag_name}>.",
-            "reported_line": reported_line
-        }
-
+    problem = _INCOMPLETE_ATTR.search(attributes)
+    if problem:
+        return "attribut_incomplet", _attribute_start(attributes, problem.start()), problem.end()
+    problem = _UNQUOTED_ATTR.search(attributes)
+    if problem:
+        return "attribut_sans_guillemets", _attribute_start(attributes, problem.start()), problem.end()
     return None
 
 
-# ==============================
-# CHECK 3 : Balise fermante orpheline (mismatch)
-# ==============================
-def _find_orphan_closing_tag(lines, reported_line):
+def _scan(content):
     """
-    Cherche une balise fermante qui ne correspond à aucune ouvrante.
-    Exemple : </fog> alors que la balise ouverte était <overcast>
-    """
-    stack = []
+    Parcourt les événements du document (xml_scanner, une seule fois) et
+    relève les problèmes (au plus _MAX_PER_KIND de chaque sorte), dans
+    l'ordre du fichier.
 
-    for i, line in enumerate(lines):
-        clean_line = re.sub(r'<!--.*?-->', '', line)
+    Retourne :
+        [{"kind": str, "offset": int, "length": int, "details": {...}}, ...]
+        details → valeurs des messages (tag, expected)
+    """
+    found = []
+    counts = dict.fromkeys(CANDIDATE_KINDS, 0)
 
-        auto_close = re.findall(r'<(\w+)[^>]*/>', clean_line)
-        opens = re.findall(r'<(\w+)(?:\s[^>]*)?>',  clean_line)
-        closes = re.findall(r'</(\w+)>', clean_line)
+    def record(kind, offset, length, **details):
+        if counts[kind] < _MAX_PER_KIND:
+            counts[kind] += 1
+            found.append({"kind": kind, "offset": offset, "length": length, "details": details})
 
-        for tag in opens:
-            if tag not in auto_close and tag != '?xml':
-                stack.append((tag, i + 1))
+    # Pile des ouvrantes : (nom, position, longueur, attributs_mal_formés)
+    stack = []
 
-        for tag in closes:
-            # Cherche dans la pile
-            found = False
-            for j in range(len(stack) - 1, -1, -1):
-                if stack[j][0] == tag:
-                    stack.pop(j)
-                    found = True
+    for kind, start, end, name, well_formed in scan_xml(content):
+        if kind == COMMENT:
+            # Sans --> : tout ce qui suit est du commentaire. Un <!-- avant
+            # le --> : c'est le --> d'un commentaire suivant qui le termine
+            if end is None or content.find("<!--", start + 4, end - 3) != -1:
+                record("commentaire", start, 4)
+
+        elif kind == AMP:
+            record("esperluette", start, 1)
+
+        elif kind == OPEN or kind == SELF_CLOSE or kind == BROKEN:
+            if kind == BROKEN:
+                # Guillemets non refermés : balise lue jusqu'au > ; sans > du tout,
+                # le parseur le signale déjà à la bonne place
+                if content[end - 1] != ">":
+                    continue
+                kind = SELF_CLOSE if content[end - 2] == "/" else OPEN
+            malformed = False
+            if not well_formed:
+                attributes_start = start + 1 + len(name)
+                attributes = content[attributes_start:end - (2 if kind == SELF_CLOSE else 1)]
+                problem = _check_attributes(attributes)
+                if problem:
+                    malformed = True
+                    problem_kind, problem_start, problem_end = problem
+                    record(problem_kind, attributes_start + problem_start, problem_end - problem_start)
+                if "&" in attributes:
+                    for amp in BARE_AMP_RE.finditer(attributes):
+                        record("esperluette", attributes_start + amp.start(), 1)
+            if kind == OPEN:
+                stack.append((name, start, end - start, malformed))
+
+        elif kind == CLOSE:
+            # Retire l'ouvrante correspondante la plus proche
+            for index in range(len(stack) - 1, -1, -1):
+                if stack[index][0] == name:
+                    del stack[index]
                     break
-
-            # Pas trouvé dans la pile → orpheline
-            if not found:
+            else:
                 expected = stack[-1][0] if stack else "inconnue"
-                return {
-                    "real_line": i + 1,
-                    "confidence": "haute",
-                    "reason": f"Balise </{tag}> à la ligne {i + 1} ne correspond à rien. La dernière balise ouverte est <{expected}>.",
-                    "reported_line": reported_line
-                }
+                record("orpheline", start, end - start, tag=name, expected=expected)
 
-    return None
+    # Les balises aux attributs mal formés sont déjà signalées par leur attribut
+    for name, start, length, malformed in stack:
+        if not malformed:
+            record("ouvrante", start, length, tag=name)
+
+    return found
 
 
 # ==============================
-# CHECK 4 : Attribut mal formé
+# LOCALISATION JSON
 # ==============================
-def _find_malformed_attribute(lines, reported_line):
+def locate_json_error(content, reported_line):
+    """
+    Équivalent de locate_real_error pour le JSON.
+
+    json.loads signale une accolade ou un crochet manquant en fin de
+    fichier ; ici on retrouve où la structure a été ouverte, où traîne une
+    virgule finale, une clé sans guillemets...
+
+    Paramètres :
+        content        → contenu brut du fichier JSON
+        reported_line  → ligne de la JSONDecodeError (lineno)
+
+    Retourne :
+        même dict que locate_real_error (candidats : JSON_CANDIDATE_KINDS)
     """
-    Cherche un attribut incomplet dans les balises.
-    Exemples : max=> ou min= sans valeur
+    if not content.strip() or reported_line < 1:
+        return _no_result(reported_line)
+    return _best_result(_rank_candidates(content, _scan_json(content), JSON_CANDIDATE_KINDS, reported_line),
+                        reported_line)
+
+
+JSON_CANDIDATE_KINDS = {
+    "chaine_non_fermee": {
+        "confidence": 0.95,
+        "message": "locator.chaine_non_fermee",
+    },
+    "apostrophe_non_fermee": {
+        "confidence": 0.95,
+        "message": "locator.apostrophe_non_fermee",
+    },
+    "fermeture_inattendue": {
+        "confidence": 0.9,
+        "message": "locator.fermeture_inattendue",
+    },
+    "virgule_finale": {
+        "confidence": 0.9,
+        "message": "locator.virgule_finale",
+    },
+    "cle_sans_guillemets": {
+        "confidence": 0.9,
+        "message": "locator.cle_sans_guillemets",
+    },
+    "guillemets_simples": {
+        "confidence": 0.85,
+        "message": "locator.guillemets_simples",
+    },
+    "fermeture_mal_placee": {
+        "confidence": 0.8,
+        "message": "locator.fermeture_mal_placee",
+    },
+    "conteneur_non_ferme": {
+        "confidence": 0.7,
+        "message": "locator.conteneur_non_ferme",
+    },
+}
+
+_JSON_PAIRS = {"{": "}", "[": "]"}
+_JSON_OPENER_OF = {"}": "{", "]": "["}
+
+# Le moteur de regex saute lui-même les chaînes, nombres, virgules
+# ordinaires et espaces : seuls les éléments qui changent l'état
+# remontent à Python.
+_JSON_TOKEN = re.compile(r"""
+    (?:"(?:[^"\\\n]++|\\.)*+"|[^"{}\[\],'A-Za-z_]++|,(?!\s*+[}\]]))*+
+    (?:
+        ([{\[])                         # 1 : ouverture
+      | ([}\]])                         # 2 : fermeture
+      | (,)                             # 3 : virgule finale (suivie de } ou ])
+      | ([A-Za-z_][\w$-]*+)(\s*+:)?      # 4 : mot (true, null...), 5 : suivi de : → clé
+      | (')                             # 6 : apostrophe hors chaîne
+      | (")                             # 7 : guillemet sans fin sur la ligne
+      | (\Z)                            # 8 : fin du texte (sans elle, re retenterait
+    )                                   #     la recherche à chaque position du bruit final)
+""", re.VERBOSE)
+
+_JSON_NEXT_CLOSER = re.compile(r'\s*([}\]])')
+
+
+# Indentation d'une ligne (espaces et tabulations en tête)
+_JSON_INDENT = re.compile(r'[^\S\n]*')
+
+
+def _scan_json(content):
     """
-    for i, line in enumerate(lines):
-        # Attribut avec = mais pas de valeur entre guillemets après
-        if re.search(r'\w+=\s*[>\/]', line):
-            return {
-                "real_line": i + 1,
-                "confidence": "haute",
-                "reason": f"Attribut incomplet à la ligne {i + 1}. Format attendu : nom=\"valeur\".",
-                "reported_line": reported_line
-            }
-        # Attribut avec = et une valeur sans guillemets
-        if re.search(r'\w+=\s*[^"\s>][^>]*>', line):
-            # Vérifie que c'est bien dans une balise XML
-            if re.search(r'<\w+', line):
-                return {
-                    "real_line": i + 1,
-                    "confidence": "moyenne",
-                    "reason": f"Attribut sans guillemets à la ligne {i + 1}. Entoure la valeur de doubles guillemets.",
-                    "reported_line": reported_line
-                }
+    Parcourt le JSON une seule fois : pile des { [, état des chaînes,
+    clés. Relève les problèmes (au plus _MAX_PER_KIND de chaque sorte).
 
-    return None
+    Retourne :
+        [{"kind": str, "offset": int, "length": int, "details": {...}}, ...]
+    """
+    found = []
+    counts = dict.fromkeys(JSON_CANDIDATE_KINDS, 0)
+
+    def record(kind, offset, length, **details):
+        if counts[kind] < _MAX_PER_KIND:
+            counts[kind] += 1
+            found.append({"kind": kind, "offset": offset, "length": length, "details": details})
+
+    def wanted(kind):
+        """Encore de la place pour cette sorte (les détails coûteux sont calculés après)"""
+        return counts[kind] < _MAX_PER_KIND
+
+    # Les lignes et indentations ne sont calculées que pour des positions
+    # croissantes, depuis la précédente : chaque caractère n'est relu
+    # qu'une fois, même sur un fichier d'une seule ligne
+    line = {"seen": 0, "start": 0, "indent_start": -1, "indent": 0}
+
+    def line_start(offset):
+        newline = content.rfind("\n", line["seen"], offset)
+        if newline != -1:
+            line["start"] = newline + 1
+        line["seen"] = offset
+        return line["start"]
+
+    def line_indent(start):
+        if line["indent_start"] != start:
+            line["indent_start"] = start
+            line["indent"] = _JSON_INDENT.match(content, start).end() - start
+        return line["indent"]
+
+    # Pile des ouvertures : (caractère, position, indentation de sa ligne),
+    # et nombre de { et de [ qu'elle contient
+    stack = []
+    depth = {"{": 0, "[": 0}
+    search = _JSON_TOKEN.search
+    pos = 0
+
+    while True:
+        match = search(content, pos)
+        if match is None:
+            break
+        pos = match.end()
+        group = match.lastindex
+
+        if group == 1:
+            at = match.start(1)
+            start = line_start(at)
+            opener = match.group(1)
+            stack.append((opener, at, line_indent(start)))
+            depth[opener] += 1
+
+        elif group == 2:
+            closer, at = match.group(2), match.start(2)
+            start = line_start(at)
+            if stack and _JSON_PAIRS[stack[-1][0]] == closer:
+                opener, opened_at, opened_indent = stack.pop()
+                depth[opener] -= 1
+                # Fermeture en début de ligne, pas à l'indentation de la ligne
+                # d'ouverture : il manque une fermeture entre les deux
+                if opened_at >= start:
+                    continue
+                closer_indent = line_indent(start)
+                if start + closer_indent == at and closer_indent != opened_indent \
+                        and wanted("fermeture_mal_placee"):
+                    record("fermeture_mal_placee", opened_at, 1, opener=opener,
+                           closed_line=content.count("\n", 0, at) + 1)
+                continue
+
+            if wanted("fermeture_inattendue"):
+                if stack:
+                    opener, opened_at, _ = stack[-1]
+                    record("fermeture_inattendue", at, 1, closer=closer, opener=opener,
+                           expected=_JSON_PAIRS[opener], opened_line=content.count("\n", 0, opened_at) + 1)
+                else:
+                    record("fermeture_inattendue", at, 1, closer=closer, opener="(rien)",
+                           expected="début de document", opened_line=0)
+            # Les ouvertures au-dessus de celle qui correspond ne seront jamais
+            # fermées (aucune dans la pile : inutile de la parcourir)
+            if depth[_JSON_OPENER_OF[closer]]:
+                for index in range(len(stack) - 1, -1, -1):
+                    if _JSON_PAIRS[stack[index][0]] == closer:
+                        for opener, opened_at, _ in stack[index:]:
+                            depth[opener] -= 1
+                        for opener, opened_at, _ in stack[index + 1:]:
+                            record("conteneur_non_ferme", opened_at, 1, opener=opener, expected=_JSON_PAIRS[opener])
+                        del stack[index:]
+                        break
+
+        elif group == 3:
+            closer = _JSON_NEXT_CLOSER.match(content, pos).group(1)
+            record("virgule_finale", match.start(3), 1, closer=closer)
+
+        elif group == 5:
+            # Un mot suivi de : est une clé (true, 12... en valeur sont ignorés)
+            word = match.group(4)
+            record("cle_sans_guillemets", match.start(4), len(word), key=word)
+
+        elif group == 6:
+            # Saute le texte entre apostrophes (il peut contenir { , ou ")
+            end = content.find("'", pos)
+            if end != -1 and content.find("\n", pos, end) == -1:
+                record("guillemets_simples", match.start(6), 1)
+                pos = end + 1
+            else:
+                # Jamais refermé sur la ligne : un " dans ce texte n'ouvre
+                # pas de chaîne, on passe à la ligne suivante
+                record("apostrophe_non_fermee", match.start(6), 1)
+                line_end = content.find("\n", pos)
+                pos = len(content) if line_end == -1 else line_end + 1
+
+        elif group == 7:
+            record("chaine_non_fermee", match.start(7), 1)
+            line_end = content.find("\n", pos)
+            pos = len(content) if line_end == -1 else line_end + 1
+
+        elif group == 8:
+            break
+
+    for opener, opened_at, _ in stack:
+        record("conteneur_non_ferme", opened_at, 1, opener=opener, expected=_JSON_PAIRS[opener])
+
+    return found
 
 
 # ==============================
-# CHECK 5 : Caractère spécial non échappé
+# POSITIONS
 # ==============================
-def _find_unescaped_special_char(lines, reported_line):
+def _resolve_positions(content, offsets):
     """
-    Cherche un & qui n'est pas suivi d'une entité connue (amp; lt; gt; quot; apos;)
+    offset → (ligne, colonne, position en octets UTF-8), en un seul
+    parcours : chaque position se déduit de la précédente.
     """
-    for i, line in enumerate(lines):
-        # Ignore les commentaires
-        clean_line = re.sub(r'<!--.*?-->', '', line)
-
-        match = re.search(r'&(?!(amp|lt|gt|quot|apos);)', clean_line)
-        if match:
-            return {
-                "real_line": i + 1,
-                "confidence": "haute",
-                "reason": f"Caractère & non échappé à la ligne {i + 1}. Remplace par &amp;.",
-                "reported_line": reported_line
-            }
-
-    return None
+    resolved = {}
+    line, line_start, byte_offset, last = 1, 0, 0, 0
+    for offset in sorted(set(offsets)):
+        newlines = content.count("\n", last, offset)
+        if newlines:
+            line += newlines
+            line_start = content.rfind("\n", last, offset) + 1
+        byte_offset += len(content[last:offset].encode("utf-8", "surrogatepass"))
+        last = offset
+        resolved[offset] = (line, offset - line_start + 1, byte_offset)
+    return resolved
 
 
 # ==============================
@@ -243,7 +545,12 @@ def _no_result(reported_line):
     """Retourne quand on ne trouve rien de mieux que la ligne du parseur"""
     return {
         "real_line": reported_line,
-        "confidence": "faible",
-        "reason": "Impossible de localiser la cause exacte. Vérifie autour de la ligne indiquée.",
-        "reported_line": reported_line
-    }
\ No newline at end of file
+        "confidence": 0.0,
+        "confidence_label": "faible",
+        **message_fields("reason", Message("locator.introuvable")),
+        "reported_line": reported_line,
+        "column": 0,
+        "offset": None,
+        "length": 0,
+        "candidates": []
+    }
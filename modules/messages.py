@@ -0,0 +1,430 @@
+"""
+messages.py
+Catalogue des messages montrés à l'utilisateur, par clé et par langue.
+
+Les textes venaient de trois endroits (errors_db.json, les
+error_message_fr / error_message_en des schémas, des f-strings dans
+validator.py et locator.py) et étaient tous formatés tout de suite, même
+quand personne ne les affichait. Ici un message n'est qu'une clé et ses
+valeurs ; le texte n'est produit qu'à l'affichage, dans la langue demandée
+par la requête :
+
+    message = Message("locator.ouvrante", tag="type", line=12)
+    render(message, "en")     → "The <type> tag opened on line 12 ..."
+    str(message)              → texte en français (DEFAULT_LOCALE)
+
+Clés :
+    "locator.ouvrante"...                → CATALOG ci-dessous
+    "errors_db/<id>/<champ>"             → champ d'une entrée de errors_db
+                                           (champ_en pour l'anglais)
+    "schema/<version>/<type>/<règle>"    → error_message_<langue> d'une règle
+                                           de validation_rules du schéma
+
+Une langue absente retombe sur le français. Les modèles sont découpés une
+fois (lru_cache) : le rendu n'est plus qu'une concaténation. Une valeur qui
+est elle-même un Message est rendue dans la même langue.
+
+Dans les résultats (validate(), locator, matcher...), un message n'est
+rangé que par sa clé et ses valeurs (message_fields) : rien n'est rendu
+tant que personne ne l'affiche, et le résultat se sérialise en JSON. La
+page et les writers de rapport le rendent dans la langue de la requête :
+
+    {"reason_key": "locator.ouvrante", "reason_params": {"tag": "type", "line": 12}}
+    render_field(location, "reason", "en")   → "The <type> tag ..."
+
+Un appelant qui veut des textes (export, API...) passe le résultat par
+render_fields(result, locale) : copie où chaque message est aussi rendu.
+Les textes qui ne viennent pas du catalogue (message du parseur) restent
+des chaînes, rendues telles quelles.
+"""
+
+from functools import lru_cache
+from string import Formatter
+
+from modules.knowledge_base import get_knowledge_base
+from modules.schemas import get_schema
+
+
+LOCALES = ("fr", "en")
+DEFAULT_LOCALE = "fr"
+LOCALE_NAMES = {"fr": "Français", "en": "English"}
+
+# Champs d'une entrée de errors_db traduits (champ_en dans errors_db.json)
+ENTRY_FIELDS = ("titre", "message_novice", "message_modder")
+# Leurs textes dans l'entrée (titre, titre_en...) : remplacés par des clés
+# dans les résultats (entry_messages)
+ENTRY_TEXT_FIELDS = frozenset(
+    ENTRY_FIELDS + tuple(f"{field}_{locale}" for field in ENTRY_FIELDS
+                         for locale in LOCALES if locale != DEFAULT_LOCALE)
+)
+
+
+# ==============================
+# CATALOGUE
+# ==============================
+CATALOG = {
+    # ── Localisation XML (locator.CANDIDATE_KINDS)
+    "locator.commentaire": {
+        "fr": "Commentaire ouvert à la ligne {line} mais jamais fermé avec -->. Tout ce qui suit est ignoré.",
+        "en": "Comment opened on line {line} but never closed with -->. Everything after it is ignored.",
+    },
+    "locator.ouvrante": {
+        "fr": "La balise <{tag}> ouverte à la ligne {line} n'est jamais fermée avec </{tag}>.",
+        "en": "The <{tag}> tag opened on line {line} is never closed with </{tag}>.",
+    },
+    "locator.orpheline": {
+        "fr": "Balise </{tag}> à la ligne {line} ne correspond à rien. La dernière balise ouverte est <{expected}>.",
+        "en": "The </{tag}> tag on line {line} matches nothing. The last open tag is <{expected}>.",
+    },
+    "locator.attribut_incomplet": {
+        "fr": "Attribut incomplet à la ligne {line}. Format attendu : nom=\"valeur\".",
+        "en": "Incomplete attribute on line {line}. Expected format: name=\"value\".",
+    },
+    "locator.attribut_sans_guillemets": {
+        "fr": "Attribut sans guillemets à la ligne {line}. Entoure la valeur de doubles guillemets.",
+        "en": "Unquoted attribute on line {line}. Wrap the value in double quotes.",
+    },
+    "locator.esperluette": {
+        "fr": "Caractère & non échappé à la ligne {line}. Remplace par &amp;.",
+        "en": "Unescaped & character on line {line}. Replace it with &amp;.",
+    },
+
+    # ── Localisation JSON (locator.JSON_CANDIDATE_KINDS)
+    "locator.chaine_non_fermee": {
+        "fr": "Texte ouvert par \" à la ligne {line} mais jamais refermé sur la même ligne.",
+        "en": "Text opened with \" on line {line} but never closed on the same line.",
+    },
+    "locator.fermeture_inattendue": {
+        "fr": "{closer} à la ligne {line} alors que le dernier {opener} ouvert (ligne {opened_line}) attend un {expected}.",
+        "en": "{closer} on line {line} while the last open {opener} (line {opened_line}) expects a {expected}.",
+    },
+    "locator.virgule_finale": {
+        "fr": "Virgule en trop à la ligne {line}, juste avant la fermeture {closer}. Supprime-la.",
+        "en": "Extra comma on line {line}, just before the closing {closer}. Remove it.",
+    },
+    "locator.cle_sans_guillemets": {
+        "fr": "Clé {key} sans guillemets à la ligne {line}. Écris \"{key}\".",
+        "en": "Key {key} without quotes on line {line}. Write \"{key}\".",
+    },
+    "locator.apostrophe_non_fermee": {
+        "fr": "Texte ouvert par ' à la ligne {line} mais jamais refermé sur la même ligne. "
+              "En JSON, un texte s'écrit entre doubles guillemets \".",
+        "en": "Text opened with ' on line {line} but never closed on the same line. "
+              "In JSON, text is written between double quotes \".",
+    },
+    "locator.guillemets_simples": {
+        "fr": "Apostrophe ' à la ligne {line} : le JSON n'accepte que les doubles guillemets \".",
+        "en": "Single quote ' on line {line}: JSON only accepts double quotes \".",
+    },
+    "locator.fermeture_mal_placee": {
+        "fr": "Le {opener} ouvert à la ligne {line} est refermé ligne {closed_line} avec un décalage "
+              "d'indentation : il manque sans doute une fermeture entre les deux.",
+        "en": "The {opener} opened on line {line} is closed on line {closed_line} at a different "
+              "indentation: a closer is probably missing in between.",
+    },
+    "locator.conteneur_non_ferme": {
+        "fr": "Le {opener} ouvert à la ligne {line} n'est jamais fermé avec {expected}.",
+        "en": "The {opener} opened on line {line} is never closed with {expected}.",
+    },
+    "locator.introuvable": {
+        "fr": "Impossible de localiser la cause exacte. Vérifie autour de la ligne indiquée.",
+        "en": "Could not locate the exact cause. Check around the reported line.",
+    },
+
+    # ── Noms de balises ajoutés aux entrées de errors_db (errors_matcher)
+    "matcher.balise_problematique": {
+        "fr": "{message} Balise problématique : <{tag}>",
+        "en": "{message} Offending tag: <{tag}>",
+    },
+    "matcher.fermante_concernee": {
+        "fr": "{message} Ici, c'est </{tag}>.",
+        "en": "{message} Here it is </{tag}>.",
+    },
+    "matcher.balise_non_fermee": {
+        "fr": "{message} Balise non fermée : <{tag}>",
+        "en": "{message} Unclosed tag: <{tag}>",
+    },
+    "matcher.ouvrante_concernee": {
+        "fr": "{message} Ici, c'est <{tag}> qui n'est jamais fermée.",
+        "en": "{message} Here it is <{tag}> that is never closed.",
+    },
+
+    # ── Validateur
+    "validator.imbrication_trop_profonde": {
+        "fr": "Imbrication trop profonde",
+        "en": "Nesting too deep",
+    },
+    "validator.type_non_supporte": {
+        "fr": "Type de fichier non supporté",
+        "en": "Unsupported file type",
+    },
+    "validator.erreur_interne": {
+        "fr": "Erreur interne du validateur : {error}",
+        "en": "Internal validator error: {error}",
+    },
+    # Règles métier : "<sujet>: <message de la règle dans le schéma>"
+    "semantic.sujet": {
+        "fr": "{subject}: {detail}",
+    },
+    "semantic.item": {
+        "fr": "Item '{name}'",
+    },
+    "semantic.event": {
+        "fr": "Event '{name}'",
+    },
+
+    # ── Rapports (report.GENERIC_RULES)
+    "report.SYNTAX": {
+        "fr": "Erreur de syntaxe signalée par le parseur",
+        "en": "Syntax error reported by the parser",
+    },
+    "report.LOCATOR": {
+        "fr": "Cause probable de l'erreur (locate_real_error / locate_json_error)",
+        "en": "Probable cause of the error (locate_real_error / locate_json_error)",
+    },
+    "report.SEMANTIC": {
+        "fr": "Règle métier DayZ non respectée",
+        "en": "DayZ business rule not respected",
+    },
+}
+
+
+# ==============================
+# MESSAGE DIFFÉRÉ
+# ==============================
+class Message:
+    """
+    Clé du catalogue + valeurs, rendue seulement quand on la demande
+    (render(message, locale) ou str(message) pour la langue par défaut).
+    """
+
+    __slots__ = ("key", "params")
+
+    # key positionnel uniquement : une valeur peut s'appeler key (clé JSON)
+    def __init__(self, key, /, **params):
+        self.key = key
+        self.params = params
+
+    def render(self, locale=None):
+        locale = normalize_locale(locale)
+        template, is_template = _lookup(self.key, locale)
+        if not is_template:
+            return template
+        parts = []
+        for literal, field, spec in _compile(template):
+            parts.append(literal)
+            if field is None:
+                continue
+            if field not in self.params:
+                # Valeur non fournie (modèle de schéma plus riche) : on la laisse visible
+                parts.append("{" + field + "}")
+                continue
+            value = self.params[field]
+            if isinstance(value, Message):
+                value = value.render(locale)
+            parts.append(format(value, spec))
+        return "".join(parts)
+
+    def __str__(self):
+        return self.render()
+
+    def to_dict(self):
+        """Forme sérialisable en JSON : {"key": str, "params": {...}} (Message imbriqués compris)"""
+        return {"key": self.key, "params": _params_to_dict(self.params)}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse de to_dict"""
+        return cls(data["key"], **{
+            name: cls.from_dict(value) if _is_message_dict(value) else value
+            for name, value in (data.get("params") or {}).items()
+        })
+
+    def __repr__(self):
+        return f"Message({self.key!r}, {self.params!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, Message) and (self.key, self.params) == (other.key, other.params)
+
+    def __hash__(self):
+        return hash(self.key)
+
+
+def render(message, locale=None):
+    """
+    Texte d'un message dans une langue.
+
+    Paramètres :
+        message → Message, texte déjà rendu (str) ou None
+        locale  → "fr", "en"... (None = DEFAULT_LOCALE, inconnue = DEFAULT_LOCALE)
+
+    Retourne :
+        str ("" pour None)
+    """
+    if isinstance(message, Message):
+        return message.render(locale)
+    return "" if message is None else str(message)
+
+
+def message_fields(field, message):
+    """
+    Champs à ranger dans un résultat pour un message (rien n'est rendu,
+    voir render_field / render_fields).
+
+    Paramètres :
+        field   → nom du champ ("reason", "message", "titre"...)
+        message → Message
+
+    Retourne :
+        {
+            field + "_key": str,      → clé du message
+            field + "_params": dict   → valeurs (sérialisables, Message
+                                        imbriqués en {"key", "params"})
+        }
+    """
+    return {
+        f"{field}_key": message.key,
+        f"{field}_params": _params_to_dict(message.params),
+    }
+
+
+def field_message(record, field):
+    """
+    Message d'un champ rangé par message_fields, reconstruit depuis
+    field_key / field_params ; à défaut, le texte du champ tel quel
+    (message du parseur...).
+    """
+    key = record.get(f"{field}_key")
+    if key is None:
+        return record.get(field)
+    return Message.from_dict({"key": key, "params": record.get(f"{field}_params")})
+
+
+def render_field(record, field, locale=None):
+    """Texte d'un champ de résultat dans une langue (voir message_fields)"""
+    return render(field_message(record, field), locale)
+
+
+def render_fields(value, locale=None):
+    """
+    Copie d'un résultat où chaque message rangé par message_fields est
+    aussi rendu en texte (field: str, à côté de field_key / field_params),
+    à toute profondeur. Pour les appelants qui veulent des chaînes.
+
+    Paramètres :
+        value  → résultat (dict, liste...) de validate(), du locator...
+        locale → langue du rendu (None = DEFAULT_LOCALE)
+    """
+    if isinstance(value, dict):
+        rendered = {key: render_fields(item, locale) for key, item in value.items()}
+        for key in value:
+            if isinstance(key, str) and key.endswith("_key") and f"{key[:-4]}_params" in value:
+                rendered[key[:-4]] = render_field(value, key[:-4], locale)
+        return rendered
+    if isinstance(value, (list, tuple)):
+        return [render_fields(item, locale) for item in value]
+    return value
+
+
+def _params_to_dict(params):
+    return {name: value.to_dict() if isinstance(value, Message) else value
+            for name, value in params.items()}
+
+
+def _is_message_dict(value):
+    return isinstance(value, dict) and value.keys() == {"key", "params"}
+
+
+def normalize_locale(locale):
+    """'en_US', 'EN-gb' → 'en' ; langue inconnue ou None → DEFAULT_LOCALE"""
+    if not locale:
+        return DEFAULT_LOCALE
+    locale = locale.replace("-", "_").split("_")[0].lower()
+    return locale if locale in LOCALES else DEFAULT_LOCALE
+
+
+# ==============================
+# RACCOURCIS DE CLÉS
+# ==============================
+def entry_message(error_id, field):
+    """Champ traduit (voir ENTRY_FIELDS) d'une entrée de errors_db"""
+    return Message(f"errors_db/{error_id}/{field}")
+
+
+def entry_messages(error_id):
+    """
+    Champs traduits d'une entrée de errors_db, prêts à ranger dans un
+    résultat à la place de ses textes (voir message_fields,
+    ENTRY_TEXT_FIELDS) : titre_key, titre_params...
+    """
+    fields = {}
+    for field in ENTRY_FIELDS:
+        fields.update(message_fields(field, entry_message(error_id, field)))
+    return fields
+
+
+def schema_message(version, file_type, rule, /, **params):
+    """Message d'une règle de validation_rules du schéma (file_type, version)"""
+    return Message(f"schema/{version}/{file_type}/{rule}", **params)
+
+
+# ==============================
+# RÉSOLUTION DES CLÉS
+# ==============================
+def _lookup(key, locale):
+    """
+    Texte brut d'une clé dans une langue.
+
+    Retourne :
+        (texte, is_template) → is_template False pour un texte à afficher tel
+                               quel (errors_db contient des { } littéraux)
+    """
+    texts = CATALOG.get(key)
+    if texts is not None:
+        return texts.get(locale) or texts[DEFAULT_LOCALE], True
+
+    namespace, _, path = key.partition("/")
+    if namespace == "errors_db":
+        text = _errors_db_text(path, locale)
+        return (key if text is None else text), False
+    if namespace == "schema":
+        text = _schema_text(path, locale)
+        return (key, False) if text is None else (text, True)
+    # Clé inconnue : on l'affiche plutôt que de faire planter l'affichage
+    return key, False
+
+
+def _errors_db_text(path, locale):
+    """'XML_002/titre' → titre (ou titre_en) de l'entrée, None si inconnue"""
+    error_id, _, field = path.partition("/")
+    entry = get_knowledge_base().get(error_id)
+    if entry is None:
+        return None
+    if locale != DEFAULT_LOCALE and entry.get(f"{field}_{locale}"):
+        return entry[f"{field}_{locale}"]
+    return entry.get(field)
+
+
+def _schema_text(path, locale):
+    """'1.28/types/min_lte_nominal' → error_message_<locale> de la règle, None si inconnue"""
+    version, file_type, rule = path.rsplit("/", 2)
+    try:
+        schema = get_schema(file_type, version)
+    except (FileNotFoundError, ValueError):
+        return None
+    rule = ((schema or {}).get("validation_rules") or {}).get(rule) or {}
+    return rule.get(f"error_message_{locale}") or rule.get(f"error_message_{DEFAULT_LOCALE}")
+
+
+@lru_cache(maxsize=512)
+def _compile(template):
+    """
+    Modèle découpé une fois pour toutes.
+
+    Retourne :
+        ((texte littéral, nom du champ ou None, format), ...)
+    """
+    return tuple(
+        (literal, field, spec or "")
+        for literal, field, spec, _ in Formatter().parse(template)
+    )
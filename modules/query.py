@@ -0,0 +1,459 @@
+"""
+query.py
+Petit langage de filtre sur les entrées d'un types.xml.
+
+    category=weapons AND usage contains Military AND nominal>10
+    (tier=Tier4 OR tier=Tier3) AND NOT crafted=1
+    name contains AK AND quantmax >= 30
+
+L'expression est compilée en prédicat. Les champs category, usage, value (tier),
+flags et les champs numériques ont un index : une requête sélective
+ne parcourt pas tous les items.
+
+Utilisable en ligne de commande :
+    python -m modules.query data/vanilla/chernarus/types.xml "tier=Tier4 AND nominal>20"
+"""
+
+import re
+import sys
+import xml.etree.ElementTree as ET
+from bisect import bisect_left, bisect_right
+
+
+# ==============================
+# PARSING TYPES.XML
+# ==============================
+SIMPLE_FIELDS = ["nominal", "lifetime", "restock", "min",
+                 "quantmin", "quantmax", "cost"]
+FLAG_FIELDS   = ["count_in_cargo", "count_in_hoarder", "count_in_map",
+                 "count_in_player", "crafted", "deloot"]
+
+
+def parse_types(content):
+    """
+    Parse un types.xml → dict { classname: {champs} }
+    Gère : champs simples, flags, category, usage (liste), value (liste)
+
+    Lève ET.ParseError si le XML est invalide.
+    """
+    root = ET.fromstring(content)
+
+    items = {}
+    for type_elem in root.findall("type"):
+        name = type_elem.get("name", "").strip()
+        if not name:
+            continue
+
+        data = {}
+
+        # Champs simples
+        for field in SIMPLE_FIELDS:
+            elem = type_elem.find(field)
+            data[field] = int(elem.text) if elem is not None and elem.text else 0
+
+        # Flags (attributs d'une balise unique)
+        flags_elem = type_elem.find("flags")
+        for flag in FLAG_FIELDS:
+            data[f"flag_{flag}"] = flags_elem.get(flag, "0") if flags_elem is not None else "0"
+
+        # Category (unique)
+        cat = type_elem.find("category")
+        data["category"] = cat.get("name", "") if cat is not None else ""
+
+        # Usage / value (multiples) → listes triées pour comparaison stable
+        data["usage"] = sorted([u.get("name", "") for u in type_elem.findall("usage")])
+        data["value"] = sorted([v.get("name", "") for v in type_elem.findall("value")])
+
+        items[name] = data
+
+    return items
+
+
+# ==============================
+# ERREUR DE SYNTAXE
+# ==============================
+class QuerySyntaxError(ValueError):
+    """Expression de filtre invalide (message en français, affichable tel quel)"""
+
+
+# ==============================
+# CHAMPS
+# ==============================
+# Alias acceptés dans les expressions → nom du champ dans les items
+_FIELD_ALIASES = {
+    "name": "classname",
+    "classname": "classname",
+    "tier": "value",
+    "category": "category",
+    "usage": "usage",
+    "value": "value",
+}
+for _field in SIMPLE_FIELDS:
+    _FIELD_ALIASES[_field] = _field
+for _flag in FLAG_FIELDS:
+    _FIELD_ALIASES[_flag] = f"flag_{_flag}"
+    _FIELD_ALIASES[f"flag_{_flag}"] = f"flag_{_flag}"
+
+_NUMERIC_FIELDS = set(SIMPLE_FIELDS)
+_LIST_FIELDS = {"usage", "value"}
+
+
+# ==============================
+# TOKENIZER
+# ==============================
+_TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<lpar>\()
+      | (?P<rpar>\))
+      | (?P<string>"(?:[^"\\]|\\.)*")
+      | (?P<op>>=|<=|!=|=|>|<)
+      | (?P<word>[^\s()=<>!"]+)
+    )
+''', re.VERBOSE)
+_SPACES_RE = re.compile(r"\s*")
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            # Position du caractère fautif, pas des espaces qui le précèdent
+            pos = _SPACES_RE.match(text, pos).end()
+            if text[pos] == '"':
+                raise QuerySyntaxError(f"Guillemet ouvert en position {pos + 1} jamais fermé")
+            raise QuerySyntaxError(f"Caractère inattendu en position {pos + 1} : {text[pos]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        position = match.start(kind) + 1
+        if kind == "string":
+            value = re.sub(r'\\(.)', r'\1', value[1:-1])
+        elif kind == "word" and value.upper() in ("AND", "OR", "NOT"):
+            kind = value.upper()
+        elif kind == "word" and value.lower() == "contains":
+            kind, value = "op", "contains"
+        tokens.append((kind, value, position))
+        pos = match.end()
+    return tokens
+
+
+# ==============================
+# ARBRE DE LA REQUÊTE
+# ==============================
+class _Comparison:
+    def __init__(self, field, op, value):
+        self.field = field
+        self.op = op
+        self.raw = value
+        if field in _NUMERIC_FIELDS:
+            if op == "contains":
+                raise QuerySyntaxError(f"'contains' n'a pas de sens sur le champ numérique '{field}'")
+            try:
+                self.value = int(value)
+            except ValueError:
+                raise QuerySyntaxError(f"Valeur numérique attendue pour '{field}', reçu : {value!r}")
+        else:
+            if op in (">", ">=", "<", "<="):
+                raise QuerySyntaxError(f"L'opérateur '{op}' n'est utilisable que sur un champ numérique")
+            self.value = value.lower()
+
+    def matches(self, name, item):
+        actual = name if self.field == "classname" else item.get(self.field)
+        op, value = self.op, self.value
+
+        if self.field in _NUMERIC_FIELDS:
+            actual = actual if actual is not None else 0
+            if op == "=":
+                return actual == value
+            if op == "!=":
+                return actual != value
+            if op == ">":
+                return actual > value
+            if op == ">=":
+                return actual >= value
+            if op == "<":
+                return actual < value
+            return actual <= value
+
+        if self.field in _LIST_FIELDS:
+            elements = [e.lower() for e in (actual or [])]
+            if op == "=":
+                return value in elements
+            if op == "!=":
+                return value not in elements
+            return any(value in e for e in elements)
+
+        actual = str(actual or "").lower()
+        if op == "=":
+            return actual == value
+        if op == "!=":
+            return actual != value
+        return value in actual
+
+    def is_indexed(self):
+        return self.op != "!=" and not (self.field == "classname" and self.op == "contains")
+
+    def select(self, index):
+        if not self.is_indexed():
+            return {name for name, item in index.items.items() if self.matches(name, item)}
+        return index.lookup(self.field, self.op, self.value)
+
+
+class _And:
+    def __init__(self, children):
+        self.children = children
+
+    def matches(self, name, item):
+        return all(c.matches(name, item) for c in self.children)
+
+    def is_indexed(self):
+        return any(c.is_indexed() for c in self.children)
+
+    def select(self, index):
+        indexed = [c for c in self.children if c.is_indexed()]
+        residual = [c for c in self.children if not c.is_indexed()]
+
+        if indexed:
+            sets = sorted((c.select(index) for c in indexed), key=len)
+            candidates = sets[0].intersection(*sets[1:])
+        else:
+            candidates = set(index.items)
+
+        # Les critères non indexés ne sont évalués que sur les candidats restants
+        return {
+            name for name in candidates
+            if all(c.matches(name, index.items[name]) for c in residual)
+        }
+
+
+class _Or:
+    def __init__(self, children):
+        self.children = children
+
+    def matches(self, name, item):
+        return any(c.matches(name, item) for c in self.children)
+
+    def is_indexed(self):
+        return all(c.is_indexed() for c in self.children)
+
+    def select(self, index):
+        return set().union(*(c.select(index) for c in self.children))
+
+
+class _Not:
+    def __init__(self, child):
+        self.child = child
+
+    def matches(self, name, item):
+        return not self.child.matches(name, item)
+
+    def is_indexed(self):
+        return self.child.is_indexed()
+
+    def select(self, index):
+        return set(index.items) - self.child.select(index)
+
+
+# ==============================
+# PARSEUR (descente récursive)
+# ==============================
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None, None)
+
+    def take(self, kind=None):
+        token = self.peek()
+        if token[0] is None:
+            raise QuerySyntaxError("Expression incomplète")
+        if kind and token[0] != kind:
+            raise QuerySyntaxError(f"'{token[1]}' inattendu en position {token[2]}")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.parse_or()
+        if self.peek()[0] is not None:
+            _, value, position = self.peek()
+            raise QuerySyntaxError(f"'{value}' inattendu en position {position}")
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek()[0] == "OR":
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else _Or(children)
+
+    def parse_and(self):
+        children = [self.parse_not()]
+        while self.peek()[0] == "AND":
+            self.take()
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else _And(children)
+
+    def parse_not(self):
+        if self.peek()[0] == "NOT":
+            self.take()
+            return _Not(self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self):
+        if self.peek()[0] == "lpar":
+            self.take()
+            node = self.parse_or()
+            self.take("rpar")
+            return node
+
+        _, field, position = self.take("word")
+        key = _FIELD_ALIASES.get(field.lower())
+        if key is None:
+            raise QuerySyntaxError(f"Champ inconnu '{field}' en position {position}")
+        _, op, _ = self.take("op")
+        kind, value, position = self.take()
+        if kind not in ("word", "string"):
+            raise QuerySyntaxError(f"Valeur attendue en position {position}")
+        return _Comparison(key, op, value)
+
+
+# ==============================
+# REQUÊTE COMPILÉE
+# ==============================
+class Query:
+    """Expression compilée : prédicat + plan d'exécution sur un TypesIndex"""
+
+    def __init__(self, text, node):
+        self.text = text
+        self._node = node
+
+    def matches(self, name, item):
+        """Prédicat : l'item (classname, dict de champs) satisfait-il la requête ?"""
+        return self._node.matches(name, item)
+
+    def __repr__(self):
+        return f"Query({self.text!r})"
+
+
+def compile_query(text):
+    """
+    Compile une expression de filtre.
+
+    Retourne :
+        Query
+
+    Lève QuerySyntaxError si l'expression est invalide.
+    """
+    tokens = _tokenize(text)
+    if not tokens:
+        raise QuerySyntaxError("Expression vide")
+    return Query(text, _Parser(tokens).parse())
+
+
+# ==============================
+# INDEX PAR CHAMP
+# ==============================
+class TypesIndex:
+    """
+    Index d'une collection d'items { classname: {champs} } (format de parse_types).
+
+    - category, flags        → valeur exacte → set de classnames
+    - usage, value           → élément       → set de classnames
+    - champs numériques      → liste triée (valeur, classname) pour les plages
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self._exact = {}
+        self._sorted = {}
+
+        for field in ["category"] + [f"flag_{f}" for f in FLAG_FIELDS]:
+            table = self._exact.setdefault(field, {})
+            for name, item in items.items():
+                table.setdefault(str(item.get(field, "")).lower(), set()).add(name)
+
+        for field in _LIST_FIELDS:
+            table = self._exact.setdefault(field, {})
+            for name, item in items.items():
+                for element in item.get(field, []):
+                    table.setdefault(element.lower(), set()).add(name)
+
+        self._names = {}
+        for name in items:
+            self._names.setdefault(name.lower(), set()).add(name)
+
+        for field in SIMPLE_FIELDS:
+            pairs = sorted((item.get(field) or 0, name) for name, item in items.items())
+            self._sorted[field] = ([v for v, _ in pairs], [n for _, n in pairs])
+
+    def lookup(self, field, op, value):
+        if field in self._sorted:
+            keys, names = self._sorted[field]
+            if op == "=":
+                return set(names[bisect_left(keys, value):bisect_right(keys, value)])
+            if op == ">":
+                return set(names[bisect_right(keys, value):])
+            if op == ">=":
+                return set(names[bisect_left(keys, value):])
+            if op == "<":
+                return set(names[:bisect_left(keys, value)])
+            return set(names[:bisect_right(keys, value)])
+
+        table = self._names if field == "classname" else self._exact[field]
+        if op == "=":
+            return set(table.get(value, ()))
+        # contains : on ne parcourt que les valeurs distinctes de l'index, pas les items
+        result = set()
+        for key, names in table.items():
+            if value in key:
+                result |= names
+        return result
+
+    def filter(self, query):
+        """
+        Applique une requête (str ou Query).
+
+        Retourne :
+            set → classnames qui correspondent
+        """
+        if isinstance(query, str):
+            query = compile_query(query)
+        return query._node.select(self)
+
+
+# ==============================
+# LIGNE DE COMMANDE
+# ==============================
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m modules.query",
+        description="Filtre les entrées d'un types.xml avec une expression.",
+    )
+    parser.add_argument("types_xml", help="chemin du types.xml")
+    parser.add_argument("expression", help='ex: "category=weapons AND usage contains Military AND nominal>10"')
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.types_xml, "rb") as f:
+            items = parse_types(f.read())
+        names = TypesIndex(items).filter(args.expression)
+    except (OSError, ET.ParseError, QuerySyntaxError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    for name in sorted(names):
+        item = items[name]
+        print(f"{name}\tnominal={item['nominal']}\tcategory={item['category']}\t"
+              f"usage={','.join(item['usage'])}\tvalue={','.join(item['value'])}")
+    print(f"{len(names)} item(s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,707 @@
+"""
+repair.py
+Boucle de correction vérifiée par le parseur.
+
+auto_correct() fait un seul passage et ne vérifie pas que le résultat se parse.
+Ici on corrige, on re-parse, on re-matche la nouvelle erreur avec match_all_errors(),
+et on recommence tant que le fichier ne se parse pas et qu'il reste du budget
+(nombre d'itérations + temps). À chaque tour, seules les actions de correction
+des entrées détectées sont appliquées (voir corrector.correction_actions).
+
+Pour le XML, le re-parsing reprend au dernier point de reprise avant la première
+modification : la partie du document déjà validée n'est pas reparsée.
+
+correct_window() fait la même chose sur les gros fichiers XML en ne corrigeant
+qu'une fenêtre autour de l'erreur localisée, agrandie tant que le re-parsing
+échoue dedans (la vérification, elle, reste sur tout le document).
+
+search_minimal_repair() prend le relais quand aucune entrée de errors_db ne
+reconnaît l'erreur : on essaie de petites éditions autour de l'erreur et on
+garde celle qui fait parser le plus loin avec le moins de changements.
+"""
+
+import json
+import re
+import time
+import xml.etree.ElementTree as ET
+from bisect import bisect_left, bisect_right
+from xml.parsers import expat
+
+from modules.document_cache import document_scope
+from modules.errors_matcher import match_all_errors
+from modules.locator import locate_real_error
+from modules.corrector import (
+    compute_corrections, compute_window_corrections, apply_edits, compose_edits,
+    correction_actions, detected_actions, make_edit,
+)
+from modules.xml_scanner import CLOSE, OPEN, SELF_CLOSE, events_between, iter_xml_events, scan_xml
+
+
+# ==============================
+# PARSING
+# ==============================
+def _parse_error(text, file_type):
+    """Parse complet. Retourne l'exception du parseur ou None si valide."""
+    if file_type != "json":
+        return _xml_error(text)
+    try:
+        json.loads(text)
+    except json.JSONDecodeError as e:
+        return e
+    return None
+
+
+def _xml_error(text):
+    """
+    Vérifie le XML avec expat seul : ET.fromstring() construit en plus
+    l'arbre, qui ne sert pas ici (plusieurs fois plus lent sur un gros
+    fichier). Même parseur, même traitement des namespaces et des entités
+    non déclarées : mêmes erreurs.
+
+    Retourne :
+        ET.ParseError (code, position, même message que ET) ou None si valide
+    """
+    parser = expat.ParserCreate(None, "}")
+
+    def undefined_entity(name, is_parameter_entity):
+        # Entité non déclarée alors qu'une DTD externe existe : ET la refuse
+        # (code et message de ET), expat seul la laisserait passer
+        error = ET.ParseError(f"undefined entity &{name};: line {parser.CurrentLineNumber}, "
+                              f"column {parser.CurrentColumnNumber}")
+        error.code = expat.errors.codes[expat.errors.XML_ERROR_UNDEFINED_ENTITY]
+        error.position = (parser.CurrentLineNumber, parser.CurrentColumnNumber)
+        raise error
+
+    parser.SkippedEntityHandler = undefined_entity
+    try:
+        parser.Parse(text, True)
+    except expat.ExpatError as e:
+        error = ET.ParseError(str(e))
+        error.code = e.code
+        error.position = (e.lineno, e.offset)
+        return error
+    except ET.ParseError as error:
+        return error
+    return None
+
+
+def _error_offset(text, error, file_type, anchor=(1, 0)):
+    """
+    Position (en caractères) de l'erreur dans le texte.
+
+    anchor → (ligne, début de cette ligne) connus avant l'erreur : les lignes
+             ne sont comptées qu'à partir de là (sans anchor, depuis le bout
+             le plus proche du texte)
+    """
+    if file_type == "json":
+        return error.pos
+    line, column = error.position
+    if anchor[0] == 1:
+        last_line = text.count("\n") + 1
+        if line - 1 > last_line - line:
+            offset = len(text)
+            for _ in range(last_line - line + 1):
+                offset = text.rfind("\n", 0, offset)
+            return min(offset + 1 + column, len(text))
+    first_line, offset = anchor if anchor[0] <= line else (1, 0)
+    for _ in range(line - first_line):
+        offset = text.find("\n", offset) + 1
+        if offset == 0:
+            return len(text)
+    return min(offset + column, len(text))
+
+
+def _reparse_xml_from(text, checkpoints, limit):
+    """
+    Re-parse text en sautant le préfixe déjà validé.
+
+    On repart du dernier point de reprise situé avant limit : on rouvre les
+    balises qui étaient ouvertes à cet endroit (leur texte d'origine, pour
+    garder attributs et namespaces), puis on parse la suite du document.
+    La position d'une éventuelle erreur est ramenée dans le document complet.
+    """
+    idx = bisect_right([offset for offset, _ in checkpoints], limit) - 1
+    if idx < 0:
+        return _parse_error(text, "xml")
+
+    offset, stack = checkpoints[idx]
+    prefix = "".join(
+        text[start:end].replace("\r", " ").replace("\n", " ")
+        for _, start, end in stack
+    )
+
+    e = _xml_error(prefix + text[offset:])
+    if e is None:
+        return None
+    line, column = e.position
+    base_line = text.count("\n", 0, offset) + 1
+    if line == 1:
+        base_column = offset - (text.rfind("\n", 0, offset) + 1)
+        real_line, real_column = base_line, max(0, column - len(prefix)) + base_column
+    else:
+        real_line, real_column = base_line + line - 1, column
+
+    error = ET.ParseError(f"{expat.ErrorString(e.code)}: line {real_line}, column {real_column}")
+    error.code = e.code
+    error.position = (real_line, real_column)
+    return error
+
+
+# ==============================
+# FONCTION PRINCIPALE
+# ==============================
+@document_scope()
+def correct_until_valid(content, file_type, max_iterations=5, time_budget=2.0, first_error=None):
+    """
+    Corrige jusqu'à ce que le fichier se parse, ou jusqu'à épuisement du budget.
+
+    Paramètres :
+        content        → contenu brut du fichier
+        file_type      → "json" ou "xml"
+        max_iterations → nombre max de passes de correction
+        time_budget    → temps max (secondes, horloge murale)
+        first_error    → erreur du parseur déjà connue pour content (évite un parsing)
+
+    Retourne :
+        {
+            "corrected": str,
+            "edits": [édition, ...],           → sur content, voir corrector.make_edit
+            "applied_corrections": [str, ...],
+            "has_changes": bool,
+            "valid": bool,                     → le texte corrigé se parse
+            "iterations": int,
+            "budget_exhausted": bool,
+            "error": dict ou None              → erreur restante (même format que validate)
+        }
+    """
+    deadline = time.perf_counter() + time_budget
+    current = content
+    edits = []
+    applied = []
+    iterations = 0
+    budget_exhausted = False
+
+    error = first_error if first_error is not None else _parse_error(current, file_type)
+    matches = match_all_errors(current, error, file_type) if error is not None else []
+
+    while error is not None:
+        if iterations >= max_iterations or time.perf_counter() >= deadline:
+            budget_exhausted = True
+            break
+        # Seuls les correcteurs des fautes détectées (toutes, pas seulement la première)
+        actions = correction_actions(matches)
+        if not actions:
+            break
+
+        correction = compute_corrections(current, file_type, actions)
+        if not correction["has_changes"]:
+            break
+        corrected = apply_edits(current, correction["edits"])
+        if corrected == current:
+            break
+
+        iterations += 1
+        applied.extend(correction["applied_corrections"])
+        edits = compose_edits(content, edits, correction["edits"])
+
+        if file_type == "xml":
+            # Tout ce qui précède la première modification ET l'erreur précédente
+            # a déjà été parsé sans erreur
+            first_change = min(e["offset"] for e in correction["edits"])
+            limit = min(first_change, _error_offset(current, error, file_type))
+            error = _reparse_xml_from(corrected, correction.get("checkpoints", []), limit)
+        else:
+            error = _parse_error(corrected, file_type)
+
+        current = corrected
+        matches = match_all_errors(current, error, file_type) if error is not None else []
+
+    remaining = None
+    if error is not None:
+        if file_type == "json":
+            line, column, message = error.lineno, error.colno, error.msg
+        else:
+            (line, column), message = error.position, str(error)
+        remaining = {"line": line, "column": column, "message_brut": message,
+                     "matched": matches[0] if matches else None}
+
+    return {
+        "corrected": current,
+        "edits": edits,
+        "applied_corrections": applied,
+        "has_changes": current != content,
+        "valid": error is None,
+        "iterations": iterations,
+        "budget_exhausted": budget_exhausted,
+        "error": remaining,
+    }
+
+
+# ==============================
+# RECHERCHE DE RÉPARATION MINIMALE
+# ==============================
+# Balise ouvrante sur une ligne (guillemets non vérifiés : on cherche justement les erreurs)
+_LINE_TAG_RE = re.compile(r'<(?P<name>[A-Za-z_][\w:.-]*)(?P<attrs>[^<>]*)>')
+# Début de balise sans > avant la fin de ligne ou le prochain <
+_TRUNCATED_TAG_RE = re.compile(r'<(?P<name>[A-Za-z_][\w:.-]*)(?P<attrs>[^<>]*?)\s*(?=<|$)')
+# Valeur d'attribut sans guillemets : name=AK74
+_UNQUOTED_ATTR_RE = re.compile(r'(?<=[\s"\'])(?P<attr>[A-Za-z_][\w:.-]*)\s*=\s*(?P<value>[^\s"\'<>/=]+)')
+_CLOSE_TAG_RE = re.compile(r'</\s*([A-Za-z_][\w:.-]*)\s*>')
+_WHITESPACE_RE = re.compile(r'\s+')
+_CHECKPOINT_SPACING = 16 * 1024
+# Allongement de l'écart par balise ouverte (chaque point copie la pile)
+_CHECKPOINT_COST = 16
+_MAX_CANDIDATES = 60
+# Candidats du locator dont la ligne est explorée
+_LOCATED_LINES = 3
+
+
+class _OpenTags:
+    """
+    Points de reprise pour _reparse_xml_from() et pile des balises ouvertes,
+    tenus pour un document et les textes corrigés qui en dérivent.
+
+    Tout ce qui précède la position demandée a été accepté par le parseur :
+    une simple pile de balises suffit. Le document n'est parcouru qu'une
+    fois, et seulement jusqu'à la position la plus lointaine demandée :
+    chaque position repart du dernier point relevé avant elle, avec les
+    événements de scan_xml() s'ils sont déjà en cache, sinon en ne
+    découpant que le morceau utile (ou tout le document, gardé en cache
+    pour le locator et le matcher, si le morceau en dépasse la moitié).
+    Après une correction de fenêtre (voir apply()), les points d'avant la
+    fenêtre restent valables et ceux d'après sont simplement décalés :
+    seule la fenêtre est redécoupée.
+    """
+
+    def __init__(self, content):
+        self.text = content
+        self.points = [(0, ())]         # [(position, pile), ...] triés
+        self.positions = [0]
+
+    def _walk(self, position, stack, end, record=False):
+        """
+        Pile à end, en partant de stack à position.
+        record → relève des points de reprise au passage (position doit
+                 être le dernier point relevé)
+        """
+        events = scan_xml.cached(self.text)
+        if events is None and 2 * (end - position) > len(self.text):
+            events = scan_xml(self.text)
+        if events is not None:
+            events = events_between(events, position, end)
+        else:
+            events = iter_xml_events(self.text, position, end)
+        stack = list(stack)
+        last = position
+        for kind, start, stop, name, well_formed in events:
+            if kind not in (OPEN, SELF_CLOSE, CLOSE) or stop > end:
+                continue
+            if kind == CLOSE:
+                if stack and stack[-1][0] == name:
+                    stack.pop()
+            elif kind == OPEN:
+                stack.append((name, start, stop))
+            if record and stop - last >= _CHECKPOINT_SPACING + _CHECKPOINT_COST * len(stack):
+                self.points.append((stop, tuple(stack)))
+                self.positions.append(stop)
+                last = stop
+        return stack
+
+    def stack_at(self, position):
+        """Pile des balises ouvertes à position : [(nom, début, fin), ...]"""
+        index = bisect_right(self.positions, position) - 1
+        point, stack = self.points[index]
+        return self._walk(point, stack, position, record=index == len(self.points) - 1)
+
+    def apply(self, corrected, start, end, stack, edits):
+        """
+        Passe au texte corrigé, dont les edits sont tous dans la fenêtre
+        [start, end) de l'ancien texte ; stack → pile à start.
+
+        Les points d'après la fenêtre sont décalés si la pile à la fin de
+        la fenêtre n'a pas changé, oubliés sinon (une balise fermée ou
+        ouverte par la correction change la pile de toute la suite).
+        """
+        delta = len(corrected) - len(self.text)
+        kept = bisect_right(self.positions, start)
+        after = bisect_left(self.positions, end)
+        shifted = []
+        if after < len(self.points) and max(e["offset"] + e["length"] for e in edits) <= end:
+            before = self._walk(start, stack, end)
+            self.text = corrected
+            if self._walk(start, stack, end + delta) == before:
+                shifted = [
+                    (position + delta,
+                     tuple((name, opened + delta, closed + delta) if opened >= end
+                           else (name, opened, closed)
+                           for name, opened, closed in point_stack))
+                    for position, point_stack in self.points[after:]
+                ]
+        self.text = corrected
+        self.points = self.points[:kept] + shifted
+        self.positions = [position for position, _ in self.points]
+
+
+def _line_bounds(content, line):
+    """(début, fin) de la ligne line (1-based), fin sans le \\n"""
+    start = 0
+    for _ in range(line - 1):
+        start = content.find("\n", start) + 1
+        if start == 0:
+            return None
+    end = content.find("\n", start)
+    return start, len(content) if end == -1 else end
+
+
+def _xml_candidates(content, error_offset, lines, open_names):
+    """Éditions candidates autour des lignes suspectes et de la position de l'erreur"""
+    candidates = []
+
+    # Autour de la position signalée par le parseur (expat pointe parfois
+    # sur le nom de la balise, après le <)
+    if open_names:
+        name = open_names[-1]
+        tag_start = content.rfind("<", 0, error_offset + 1)
+        insert_at = tag_start if tag_start != -1 and error_offset - tag_start <= 2 else error_offset
+        candidates.append(make_edit(insert_at, 0, f"</{name}>", f"Ajout de </{name}>"))
+        close = _CLOSE_TAG_RE.match(content, insert_at)
+        if close and close.group(1) != name:
+            candidates.append(make_edit(close.start(1), len(close.group(1)), name,
+                                        f"Renommage de </{close.group(1)}> en </{name}>"))
+
+    for offset in (error_offset, error_offset - 1, error_offset + 1):
+        if 0 <= offset < len(content) and content[offset] not in " \t\r\n":
+            char = content[offset]
+            candidates.append(make_edit(offset, 1, "", f"Suppression du caractère {char!r}"))
+            if char == "&":
+                candidates.append(make_edit(offset, 1, "&amp;", "Échappement de & en &amp;"))
+            elif char == "<":
+                candidates.append(make_edit(offset, 1, "&lt;", "Échappement de < en &lt;"))
+
+    # Sur les lignes suspectes (ligne du parseur, celle d'avant, ligne trouvée par le locator)
+    for line in lines:
+        bounds = _line_bounds(content, line)
+        if bounds is None:
+            continue
+        start, end = bounds
+        text = content[start:end]
+        line_end = start + len(text.rstrip())
+
+        for tag in _LINE_TAG_RE.finditer(text):
+            name, attrs = tag.group("name"), tag.group("attrs")
+            close_at = start + tag.end() - 1
+            if attrs.count('"') % 2:
+                quote_at = close_at - 1 if attrs.endswith("/") else close_at
+                candidates.append(make_edit(quote_at, 0, '"', f"Guillemet fermant dans <{name}>"))
+            if not attrs.endswith("/"):
+                candidates.append(make_edit(close_at, 0, " /", f"Ajout de /> à la balise <{name}>"))
+                candidates.append(make_edit(line_end, 0, f"</{name}>", f"Ajout de </{name}> en fin de ligne"))
+            for attr in _UNQUOTED_ATTR_RE.finditer(attrs):
+                value_start = start + tag.start("attrs") + attr.start("value")
+                value = attr.group("value")
+                candidates.append(make_edit(value_start, len(value), f'"{value}"',
+                                            f"Guillemets autour de {attr.group('attr')}={value}"))
+
+        for tag in _TRUNCATED_TAG_RE.finditer(text):
+            name = tag.group("name")
+            at = start + tag.end()
+            candidates.append(make_edit(at, 0, "/>", f"Fermeture de la balise <{name} avec />"))
+            candidates.append(make_edit(at, 0, ">", f"Fermeture de la balise <{name} avec >"))
+
+    return candidates
+
+
+def _json_candidates(content, error_offset):
+    """Éditions candidates autour de la position de l'erreur JSON"""
+    candidates = []
+    # Fin du dernier token avant l'erreur (là où manque souvent une virgule)
+    previous_end = len(content[:error_offset].rstrip())
+
+    for offset in sorted({error_offset, previous_end}):
+        for text, reason in ((",", "Ajout d'une virgule"), ('"', "Ajout d'un guillemet"),
+                             (":", "Ajout de deux-points"), ("}", "Ajout de }"), ("]", "Ajout de ]")):
+            candidates.append(make_edit(offset, 0, text, reason))
+
+    for offset in (error_offset, error_offset - 1):
+        if 0 <= offset < len(content) and content[offset] not in " \t\r\n":
+            char = content[offset]
+            candidates.append(make_edit(offset, 1, "", f"Suppression du caractère {char!r}"))
+            if char == "'":
+                candidates.append(make_edit(offset, 1, '"', "Guillemet simple → double"))
+
+    return candidates
+
+
+def _edit_distance(content, edit):
+    """Caractères réellement changés (name=AK → name="AK" : 2)"""
+    old = content[edit["offset"]:edit["offset"] + edit["length"]]
+    new = edit["text"]
+    if old in new or new in old:
+        return max(1, abs(len(new) - len(old)))
+    prefix = 0
+    while prefix < min(len(old), len(new)) and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < min(len(old), len(new)) - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return len(old) + len(new) - 2 * (prefix + suffix)
+
+
+@document_scope()
+def search_minimal_repair(content, file_type, error=None, time_budget=1.0):
+    """
+    Cherche la plus petite édition qui répare (ou fait avancer) le parsing.
+
+    Les candidats sont générés autour de l'erreur (et, en XML, des lignes
+    des meilleurs candidats de locate_real_error) : ajout de />, de balise fermante, de
+    guillemets, suppression d'un caractère... Chacun est testé par un
+    re-parsing incrémental, puis classés : document valide d'abord, puis
+    part du document qui parse après la correction, puis taille de l'édition.
+
+    Paramètres :
+        content     → contenu brut du fichier
+        file_type   → "json" ou "xml"
+        error       → erreur du parseur déjà connue pour content (facultatif)
+        time_budget → temps max (secondes) pour tester les candidats
+
+    Retourne :
+        {
+            "corrected": str,
+            "edits": [édition],          → une seule édition (voir corrector.make_edit)
+            "description": str,
+            "valid": bool,               → le texte corrigé se parse
+            "confidence": float,         → 0 à 1
+            "candidates_tested": int,
+            "budget_exhausted": bool
+        }
+        ou None si aucun candidat ne fait avancer le parsing
+    """
+    deadline = time.perf_counter() + time_budget
+    if error is None:
+        error = _parse_error(content, file_type)
+        if error is None:
+            return None
+    error_offset = _error_offset(content, error, file_type)
+
+    if file_type == "xml":
+        tags = _OpenTags(content)
+        open_stack = tags.stack_at(error_offset)
+        checkpoints = tags.points
+        open_names = [name for name, _, _ in open_stack]
+        reported_line = error.position[0]
+        # Lignes des meilleurs candidats du locator (pas seulement le premier)
+        located = [candidate["line"] for candidate in
+                   locate_real_error(content, reported_line)["candidates"][:_LOCATED_LINES]]
+        lines = sorted({*located, reported_line, max(1, reported_line - 1)})
+        candidates = _xml_candidates(content, error_offset, lines, open_names)
+    else:
+        checkpoints = []
+        candidates = _json_candidates(content, error_offset)
+
+    # Dédoublonnage, en gardant l'ordre de génération
+    unique = {}
+    for edit in candidates:
+        unique.setdefault((edit["offset"], edit["length"], edit["text"]), edit)
+    candidates = list(unique.values())[:_MAX_CANDIDATES]
+
+    scored = []
+    tested = 0
+    budget_exhausted = False
+    for edit in candidates:
+        if time.perf_counter() >= deadline:
+            budget_exhausted = True
+            break
+        tested += 1
+        text = apply_edits(content, [edit])
+        if file_type == "xml":
+            new_error = _reparse_xml_from(text, checkpoints, min(edit["offset"], error_offset))
+        else:
+            new_error = _parse_error(text, file_type)
+
+        if new_error is None:
+            gain = 1.0
+        else:
+            # Part du reste du document (après l'erreur d'origine) qui parse désormais
+            reached = _error_offset(text, new_error, file_type)
+            remaining = max(1, len(text) - error_offset)
+            gain = max(0.0, (reached - error_offset) / remaining)
+        if gain <= 0:
+            continue
+        distance = _edit_distance(content, edit)
+        scored.append((new_error is None, gain, -distance, edit, text))
+
+    if not scored:
+        return None
+
+    scored.sort(key=lambda item: item[:3], reverse=True)
+    valid, gain, neg_distance, edit, text = scored[0]
+    # Plusieurs réparations aussi bonnes et vraiment différentes (pas juste
+    # un espace de décalage) → moins sûr
+    ties = len({_WHITESPACE_RE.sub("", item[4]) for item in scored
+                if item[:3] == (valid, gain, neg_distance)})
+    confidence = gain / ties / (1 + 0.1 * (-neg_distance - 1))
+
+    return {
+        "corrected": text,
+        "edits": [edit],
+        "description": edit["reason"],
+        "valid": valid,
+        "confidence": round(confidence, 2),
+        "candidates_tested": tested,
+        "budget_exhausted": budget_exhausted,
+    }
+
+
+# ==============================
+# CORRECTION PAR FENÊTRE
+# ==============================
+# Taille à partir de laquelle validate() corrige par fenêtre (déjà plus
+# rapide que correct_until_valid à cette taille, voir correct_window)
+WINDOW_MIN_SIZE = 256 * 1024
+
+
+def _window_bounds(content, center, radius):
+    """Fenêtre [début, fin) alignée sur des débuts de ligne, autour de center"""
+    start = 0 if center - radius <= 0 else content.rfind("\n", 0, center - radius) + 1
+    end = content.find("\n", center + radius)
+    return start, len(content) if end == -1 else end + 1
+
+
+@document_scope()
+def correct_window(content, file_type, max_iterations=5, time_budget=2.0, first_error=None,
+                   radius=2048):
+    """
+    Corrige seulement une fenêtre autour de l'erreur, puis recolle le résultat.
+
+    Première fenêtre autour de la position donnée par le parseur (autour
+    de celle de locate_real_error si le parseur bute sur la dernière balise
+    du document). Si le document ne se parse toujours pas et que la
+    nouvelle erreur est encore dans la fenêtre, on recentre sur la position
+    donnée par locate_real_error, puis la fenêtre est agrandie (x4) et la
+    correction refaite ; si l'erreur est plus loin, c'est un autre
+    problème : nouvelle fenêtre autour de lui.
+
+    La pile des balises ouvertes et les points de reprise sont relevés une
+    fois par document (_OpenTags, à partir des événements de scan_xml déjà
+    en cache) puis décalés après chaque correction : d'un tour à l'autre,
+    seule la fenêtre est redécoupée. Restent proportionnels à la taille du
+    fichier le parcours de ce qui précède la première fenêtre (une fois),
+    le parsing de vérification par expat seul, les motifs des détecteurs
+    (une passe de regex chacun) et, si la fenêtre du parseur ne suffit pas,
+    locate_real_error. Les entrées complètes du matcher (nom de
+    balise...) ne sont construites que pour l'erreur restante.
+    Mesuré par benchmarks/bench_window_correct.py, à froid : 1,5 à 3 fois
+    plus rapide que correct_until_valid entre 0,8 et 6,7 Mo ; dans
+    validate() (découpage déjà en cache), 0,02 à 0,35 s sur la même plage.
+
+    XML uniquement : en JSON, on se rabat sur correct_until_valid().
+
+    Paramètres : voir correct_until_valid(), plus
+        radius → demi-largeur initiale de la fenêtre (caractères)
+
+    Retourne :
+        même dict que correct_until_valid(), plus
+        "windows": [(début, fin), ...] → fenêtres corrigées, dans le texte de l'époque
+    """
+    if file_type != "xml":
+        result = correct_until_valid(content, file_type, max_iterations, time_budget, first_error)
+        result["windows"] = []
+        return result
+
+    deadline = time.perf_counter() + time_budget
+    current = content
+    edits = []
+    applied = []
+    windows = []
+    iterations = 0
+    budget_exhausted = False
+
+    error = first_error if first_error is not None else _parse_error(current, file_type)
+    tags = _OpenTags(content)
+    # (ligne, début de ligne) connus avant l'erreur courante
+    anchor = (1, 0)
+
+    while error is not None:
+        if iterations >= max_iterations or time.perf_counter() >= deadline:
+            budget_exhausted = True
+            break
+        # Seuls les correcteurs des fautes détectées (toutes, pas seulement la
+        # première) ; les entrées complètes ne servent qu'au rapport final
+        actions = detected_actions(current, error, file_type)
+        if not actions:
+            break
+
+        # D'abord autour de la position du parseur (souvent exacte, et gratuite),
+        # puis autour de la position de locate_real_error, en agrandissant
+        center = _error_offset(current, error, file_type, anchor)
+        size = radius
+        located = False
+        accepted = False
+        # Erreur sur la dernière balise du document (fermante de la racine) :
+        # la cause est en général plus haut (balise restée ouverte), le
+        # locator d'abord
+        line_end = current.find("\n", center)
+        if line_end == -1 or current.find("<", line_end) == -1:
+            located = True
+            offset = locate_real_error(current, error.position[0])["offset"]
+            if offset is not None:
+                center = offset
+        while True:
+            start, end = _window_bounds(current, center, size)
+            open_stack = tags.stack_at(start)
+            correction = compute_window_corrections(current, start, end, open_stack, actions)
+            whole = start == 0 and end == len(current)
+
+            if correction["has_changes"]:
+                corrected = apply_edits(current, correction["edits"])
+                first_change = min(e["offset"] for e in correction["edits"])
+                new_error = _reparse_xml_from(corrected, tags.points, first_change)
+                # Réparé, ou l'erreur restante est après la fenêtre (autre problème)
+                anchor = (current.count("\n", 0, start) + 1, start)
+                if (new_error is None or whole
+                        or _error_offset(corrected, new_error, file_type, anchor) >= end):
+                    accepted = True
+                    break
+            elif whole:
+                break
+            if time.perf_counter() >= deadline:
+                budget_exhausted = True
+                break
+
+            if not located:
+                located = True
+                offset = locate_real_error(current, error.position[0])["offset"]
+                if offset is not None and offset != center:
+                    center = offset
+                    continue
+            size *= 4
+
+        if not accepted:
+            break
+
+        iterations += 1
+        windows.append((start, end))
+        applied.extend(correction["applied_corrections"])
+        edits = compose_edits(content, edits, correction["edits"])
+        tags.apply(corrected, start, end, open_stack, correction["edits"])
+        current = corrected
+        error = new_error
+
+    remaining = None
+    if error is not None:
+        matches = match_all_errors(current, error, file_type)
+        (line, column), message = error.position, str(error)
+        remaining = {"line": line, "column": column, "message_brut": message,
+                     "matched": matches[0] if matches else None}
+
+    return {
+        "corrected": current,
+        "edits": edits,
+        "applied_corrections": applied,
+        "has_changes": current != content,
+        "valid": error is None,
+        "iterations": iterations,
+        "budget_exhausted": budget_exhausted,
+        "error": remaining,
+        "windows": windows,
+    }
@@ -0,0 +1,259 @@
+"""
+report.py
+Écriture en flux des constats de validation, en SARIF ou en JSON Lines.
+
+Les constats (erreur de syntaxe, localisation par locate_real_error,
+entrée errors_db matchée, avertissements sémantiques) sont écrits un par un
+dès qu'ils sont produits : rien n'est accumulé en mémoire, quelle que soit
+la taille du lot. Les messages sont rendus par le writer, dans sa langue,
+à partir des clés rangées dans le résultat (voir modules/messages.py).
+
+    with open_report_writer("rapport.sarif", "sarif", locale="en") as writer:
+        for path in fichiers:
+            content = path.read_text(encoding="utf-8")
+            result = validate(content, "xml")
+            writer.write_all(iter_findings(result, str(path), content))
+"""
+
+import json
+import sys
+
+from modules.knowledge_base import get_knowledge_base
+from modules.locator import locate_json_error, locate_real_error
+from modules.messages import Message, entry_message, field_message, render
+
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+TOOL_NAME = "CodeX-Validateur"
+
+# Règles génériques, en plus des entrées de errors_db (textes : "report.<id>" du catalogue)
+GENERIC_RULES = ("SYNTAX", "LOCATOR", "SEMANTIC")
+
+
+# ==============================
+# CONSTATS À PARTIR D'UN RÉSULTAT
+# ==============================
+def iter_findings(result, uri, content=None):
+    """
+    Transforme un résultat de validate() en constats, un par un.
+
+    Paramètres :
+        result  → dict retourné par validate()
+        uri     → chemin ou nom du fichier (apparaît dans le rapport)
+        content → contenu brut (facultatif) : localise l'erreur quand le
+                  résultat n'a pas déjà error["location"]
+
+    Rend (générateur) :
+        {
+            "rule_id": str,
+            "level": "error" | "warning" | "note",
+            "kind": "syntax" | "matched" | "locator" | "semantic",
+            "message": Message ou str,   → rendu par le writer
+            "uri": str,
+            "line": int,     → 0 si inconnue
+            "column": int    → 1-based, 0 si inconnue
+        }
+    """
+    error = result.get("error")
+    if error:
+        line = error.get("line") or 0
+        column = error.get("column") or 0
+        # ParseError donne une colonne 0-based, JSONDecodeError une colonne 1-based
+        if result.get("file_type") == "xml" and line:
+            column += 1
+
+        yield _finding("SYNTAX", "error", "syntax", field_message(error, "message_brut") or "", uri, line, column)
+
+        matched = error.get("matched")
+        if matched:
+            message = field_message(matched, "message_modder") or field_message(matched, "titre") or ""
+            yield _finding(matched.get("id", "UNKNOWN"), "error", "matched", message, uri, line, column)
+
+        # validate() a déjà localisé l'erreur : on ne relance le locator que sans résultat
+        location = error.get("location")
+        if location is None and content is not None and line > 0:
+            if result.get("file_type") == "xml":
+                location = locate_real_error(content, line)
+            else:
+                location = locate_json_error(content, line)
+        if location is not None and location["confidence_label"] != "faible":
+            yield _finding("LOCATOR", "note", "locator", field_message(location, "reason"), uri, location["real_line"], location["column"])
+
+    for warning in result.get("semantic_warnings") or []:
+        level = "error" if warning.get("severity") == "error" else "warning"
+        yield _finding("SEMANTIC", level, "semantic", field_message(warning, "message") or "", uri, warning.get("line", 0), 0)
+
+
+def _finding(rule_id, level, kind, message, uri, line, column):
+    return {
+        "rule_id": rule_id,
+        "level": level,
+        "kind": kind,
+        "message": message,
+        "uri": uri,
+        "line": line,
+        "column": column,
+    }
+
+
+# ==============================
+# WRITER JSON LINES
+# ==============================
+class JsonlReportWriter:
+    """Un constat = une ligne JSON. Le plus simple à relire avec jq ou pandas."""
+
+    def __init__(self, stream, locale=None):
+        self.stream = stream
+        self.locale = locale
+        self.count = 0
+
+    def write(self, finding):
+        finding = dict(finding, message=render(finding["message"], self.locale))
+        self.stream.write(json.dumps(finding, ensure_ascii=False))
+        self.stream.write("\n")
+        self.count += 1
+
+    def write_all(self, findings):
+        for finding in findings:
+            self.write(finding)
+
+    def close(self):
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ==============================
+# WRITER SARIF 2.1.0
+# ==============================
+class SarifReportWriter:
+    """
+    SARIF écrit en flux : l'en-tête (outil + règles) part tout de suite,
+    chaque résultat est ajouté au tableau "results" dès qu'il arrive,
+    et close() referme le document.
+    """
+
+    def __init__(self, stream, locale=None):
+        self.stream = stream
+        self.locale = locale
+        self.count = 0
+        self._closed = False
+        self._write_header()
+
+    def _write_header(self):
+        rules = [
+            {"id": rule_id, "shortDescription": {"text": render(Message(f"report.{rule_id}"), self.locale)}}
+            for rule_id in GENERIC_RULES
+        ]
+        for entry in get_knowledge_base().entries():
+            rules.append({
+                "id": entry["id"],
+                "shortDescription": {"text": render(entry_message(entry["id"], "titre"), self.locale)},
+                "fullDescription": {"text": render(entry_message(entry["id"], "message_modder"), self.locale)},
+            })
+
+        header = json.dumps({
+            "$schema": SARIF_SCHEMA,
+            "version": "2.1.0",
+            "runs": [{
+                "tool": {"driver": {"name": TOOL_NAME, "rules": rules}},
+                "results": [],
+            }],
+        }, ensure_ascii=False)
+        # On coupe juste avant la fermeture de "results": [] pour écrire au fil de l'eau
+        self.stream.write(header[:-len("]}]}")])
+
+    def write(self, finding):
+        sarif_result = {
+            "ruleId": finding["rule_id"],
+            "level": finding["level"],
+            "message": {"text": render(finding["message"], self.locale)},
+            "properties": {"kind": finding["kind"]},
+        }
+        location = {"artifactLocation": {"uri": finding["uri"]}}
+        if finding.get("line", 0) > 0:
+            region = {"startLine": finding["line"]}
+            if finding.get("column", 0) > 0:
+                region["startColumn"] = finding["column"]
+            location["region"] = region
+        sarif_result["locations"] = [{"physicalLocation": location}]
+
+        if self.count:
+            self.stream.write(",")
+        self.stream.write(json.dumps(sarif_result, ensure_ascii=False))
+        self.count += 1
+
+    def write_all(self, findings):
+        for finding in findings:
+            self.write(finding)
+
+    def close(self):
+        if not self._closed:
+            self.stream.write("]}]}\n")
+            self.stream.flush()
+            self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ==============================
+# OUVERTURE D'UN WRITER
+# ==============================
+_WRITERS = {
+    "sarif": SarifReportWriter,
+    "jsonl": JsonlReportWriter,
+}
+
+
+class _OwnedStreamWriter:
+    """Ferme aussi le fichier sous-jacent quand le writer est fermé"""
+
+    def __init__(self, writer, stream):
+        self._writer = writer
+        self._stream = stream
+
+    def __getattr__(self, name):
+        return getattr(self._writer, name)
+
+    def close(self):
+        self._writer.close()
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_report_writer(target, fmt="sarif", locale=None):
+    """
+    Ouvre un writer de rapport.
+
+    Paramètres :
+        target → chemin de fichier, "-" pour stdout, ou flux texte déjà ouvert
+        fmt    → "sarif" ou "jsonl"
+        locale → langue des messages ("fr", "en" ; None = DEFAULT_LOCALE)
+
+    Retourne :
+        writer avec write(finding), write_all(findings), close()
+        (utilisable avec `with`)
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Format de rapport inconnu : {fmt} (attendu : {', '.join(_WRITERS)})")
+
+    if target == "-":
+        return _WRITERS[fmt](sys.stdout, locale)
+    if hasattr(target, "write"):
+        return _WRITERS[fmt](target, locale)
+
+    stream = open(target, "w", encoding="utf-8")
+    return _OwnedStreamWriter(_WRITERS[fmt](stream, locale), stream)
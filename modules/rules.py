@@ -0,0 +1,317 @@
+"""
+rules.py
+Règles de détection et de correction déclarées dans errors_db.json.
+
+Chaque entrée de errors_db peut porter un bloc "regle" :
+
+    "regle": {
+        "priorite": 1,                      → départage deux règles aussi probables
+        "confiance": 0.9,                   → probabilité de base que la règle soit la bonne
+        "detection": {                      → toutes les conditions présentes doivent matcher
+            "message": ["no element found"],   → un de ces fragments dans le message du parseur
+            "contenu": ",\\s*[}\\]]",          → regex cherchée dans le contenu
+            "verification": "nom"              → check nommé (voir CHECKS)
+        },
+        "extraction": "nom",                → enrichissement du message (nom de balise...)
+        "correction": {                     → absent = pas de correction automatique
+            "action": "auto_fermante",         → voir CORRECTION_ACTIONS
+            "balises": ["current", ...]        → listes utilisées par la détection ET la correction
+        }
+    }
+
+compile_rules() transforme ces blocs une seule fois en table de dispatch
+(regex compilées, checks résolus) : le matcher et le correcteur lisent
+les mêmes listes, qui ne peuvent plus diverger. La table compilée est
+portée par la base de connaissances (voir modules/knowledge_base.py).
+"""
+
+import re
+
+from modules.xml_scanner import BARE_AMP_RE, CDATA, COMMENT, DECL, PI, event_at, scan_xml
+
+
+# Actions réellement implémentées par les scanners de corrector.py
+CORRECTION_ACTIONS = {
+    "xml": frozenset([
+        "auto_fermante", "fermeture_balises", "fermeture_commentaire",
+        "echappement", "renommage_fermante",
+    ]),
+    "json": frozenset([
+        "virgules_finales", "guillemets_doubles", "guillemets_cles", "fermeture_conteneurs",
+    ]),
+}
+
+
+# ==============================
+# CHECKS NOMMÉS
+# ==============================
+# Un check = des motifs cherchés pendant le scan des détecteurs + une fonction qui,
+# à partir des positions trouvées, dit où est le problème.
+#     resolve(hits, content) → [position, ...] ([] = pas détecté,
+#                               [None] = détecté sans position précise)
+
+def _resolve_brackets(hits, content):
+    """Les { } [ ] ne sont pas équilibrés (comptage, sans position)"""
+    unbalanced = (
+        content.count("{") != content.count("}") or
+        content.count("[") != content.count("]")
+    )
+    return [None] if unbalanced else []
+
+def _resolve_unclosed_comment(hits, content):
+    """Un <!-- sans --> après lui (le découpage s'arrête sur ce commentaire)"""
+    # Un commentaire non fermé n'a aucun --> après lui, donc après le
+    # dernier <!-- non plus : sinon, inutile de découper tout le document
+    last = content.rfind("<!--")
+    if last == -1 or content.find("-->", last + 4) != -1:
+        return []
+    events = scan_xml(content)
+    if events and events[-1][0] == COMMENT and events[-1][2] is None:
+        return [events[-1][1]]
+    return []
+
+def _resolve_positions(hits, content):
+    """Chaque occurrence du motif est un problème"""
+    return hits["motif"]
+
+
+
+# Noms utilisables dans le champ "verification" des règles
+CHECKS = {
+    "parentheses_desequilibrees": {"patterns": {}, "resolve": _resolve_brackets},
+    # D'après le découpage de modules/xml_scanner.py : un <!-- dans une
+    # section CDATA ou un -- dans un commentaire ne trompent pas le check
+    "commentaire_non_ferme": {"patterns": {}, "resolve": _resolve_unclosed_comment},
+    # Attribut sans valeur entre guillemets : name=AK74, max=>, min=/
+    # (le motif commence par = : re saute directement aux =)
+    "attribut_mal_forme": {
+        "patterns": {"motif": r'=(?<=\w=)\s*[^"\s]'},
+        "resolve": _resolve_positions,
+    },
+    # & ni entité nommée ni référence numérique (&#38; et &#x26; sont valides) :
+    # même motif que le scanner
+    "esperluette_non_echappee": {
+        "patterns": {"motif": BARE_AMP_RE.pattern},
+        "resolve": _resolve_positions,
+    },
+}
+
+
+# ==============================
+# COMPILATION
+# ==============================
+def _compile_rule(entry, checks):
+    """
+    Compile le bloc "regle" d'une entrée. Retourne None si la règle est
+    inutilisable (le problème est signalé, l'entrée reste dans errors_db).
+    """
+    rule = entry.get("regle")
+    if not rule:
+        return None
+
+    file_type = entry.get("type", "").lower()
+    detection = rule.get("detection", {})
+    correction = rule.get("correction") or {}
+    balises = tuple(correction.get("balises", ()))
+
+    compiled = {
+        "id": entry["id"],
+        "file_type": file_type,
+        "priorite": rule.get("priorite", 100),
+        "confiance": rule.get("confiance", 0.5),
+        "message": tuple(fragment.lower() for fragment in detection.get("message", ())),
+        "contenu": None,
+        "verification": None,
+        "extraction": rule.get("extraction"),
+        "action": None,
+        "balises": frozenset(balises),
+    }
+
+    pattern = detection.get("contenu")
+    if pattern:
+        # {balises} → alternative des balises de la correction (même liste)
+        pattern = pattern.replace("{balises}", "|".join(re.escape(tag) for tag in balises))
+        try:
+            compiled["contenu"] = re.compile(pattern)
+        except re.error as e:
+            print(f"❌ errors_db {entry['id']} : regex de détection invalide ({e})")
+            return None
+
+    check_name = detection.get("verification")
+    if check_name:
+        if check_name not in checks:
+            print(f"❌ errors_db {entry['id']} : vérification inconnue '{check_name}'")
+            return None
+        compiled["verification"] = check_name
+
+    action = correction.get("action")
+    if action:
+        if action in CORRECTION_ACTIONS.get(file_type, ()):
+            compiled["action"] = action
+        else:
+            print(f"❌ errors_db {entry['id']} : action de correction inconnue '{action}'")
+
+    return compiled
+
+
+def compile_rules(entries, checks=None):
+    """
+    Compile les règles de toutes les entrées de errors_db.
+
+    Paramètres :
+        entries → liste des entrées de errors_db
+        checks  → checks utilisables par "verification" (par défaut CHECKS)
+
+    Retourne :
+        {
+            "by_type": {"xml": [règle, ...], "json": [...]},   → triées par priorité
+            "checks": {nom: check compilé},  → checks utilisés par scan_detectors
+            "by_id": {id: règle},
+            "auto_ids": frozenset,           → ids avec une action de correction
+            "self_closing_tags": frozenset   → balises de l'action auto_fermante
+        }
+    """
+    if checks is None:
+        checks = CHECKS
+    by_type = {"xml": [], "json": []}
+    by_id = {}
+    self_closing = set()
+
+    for entry in entries:
+        rule = _compile_rule(entry, checks)
+        if rule is None:
+            continue
+        by_type.setdefault(rule["file_type"], []).append(rule)
+        by_id[rule["id"]] = rule
+        if rule["action"] == "auto_fermante":
+            self_closing |= rule["balises"]
+
+    for rules in by_type.values():
+        rules.sort(key=lambda rule: rule["priorite"])
+
+    return {
+        "by_type": by_type,
+        "checks": _compile_checks(checks),
+        "by_id": by_id,
+        "auto_ids": frozenset(rule_id for rule_id, rule in by_id.items() if rule["action"]),
+        "self_closing_tags": frozenset(self_closing),
+    }
+
+
+# ==============================
+# SCAN DES DÉTECTEURS
+# ==============================
+# En XML, les motifs ne comptent pas dans le texte libre : commentaires,
+# sections CDATA, <?...?> et <!...> (un & ou un <current ...> commenté
+# n'est pas une faute)
+_XML_FREE_TEXT = (COMMENT, CDATA, PI, DECL)
+
+
+def _outside_free_text(content, positions):
+    """Positions hors texte libre XML (découpage de modules/xml_scanner.py, en cache)"""
+    if not positions:
+        return positions
+    events = scan_xml(content)
+    kept = []
+    for pos in positions:
+        event = event_at(events, pos)
+        if event is None or event[0] not in _XML_FREE_TEXT:
+            kept.append(pos)
+    return kept
+
+def _compile_checks(checks):
+    """Motifs des checks compilés une fois : {nom: {"patterns": {sous-nom: regex}, "resolve": f}}"""
+    return {
+        name: {
+            "patterns": {sub: re.compile(pattern) for sub, pattern in check["patterns"].items()},
+            "resolve": check["resolve"],
+        }
+        for name, check in checks.items()
+    }
+
+
+def scan_detectors(table, rules, content, file_type=None):
+    """
+    Fait tourner tous les détecteurs des règles données : motifs "contenu"
+    + motifs des checks utilisés. En XML (file_type "xml"), les occurrences
+    dans les commentaires, sections CDATA, <?...?> et <!...> sont écartées. Chaque motif parcourt le contenu une fois
+    (même partagé par plusieurs règles) : il y a donc un parcours par motif,
+    pas un seul pour tous. La correction ne réutilise pas ces parcours :
+    elle découpe le document avec modules/xml_scanner.py (en cache, partagé
+    avec le locator) ; seules les listes de balises sont communes.
+
+    Chaque motif a sa propre regex plutôt qu'une alternative : re saute alors
+    directement à son préfixe littéral (&, <!--...). Une regex combinée
+    (alternative de tous les motifs) est environ deux fois plus lente sur
+    un types.xml : re ne peut plus que tester le premier caractère, et < ou
+    = reviennent à chaque ligne.
+
+    Retourne :
+        {
+            "rules": {id: [position, ...]},       → occurrences des motifs "contenu"
+            "checks": {nom: [position, ...]}      → résultat de chaque check
+                                                    ([None] = sans position)
+        }
+    """
+    in_xml = file_type == "xml"
+    rule_hits = {}
+    for rule in rules:
+        if rule["contenu"] is not None:
+            positions = [match.start() for match in rule["contenu"].finditer(content)]
+            if in_xml:
+                positions = _outside_free_text(content, positions)
+            if positions:
+                rule_hits[rule["id"]] = positions
+
+    check_hits = {}
+    for check_name in {rule["verification"] for rule in rules if rule["verification"]}:
+        check = table["checks"][check_name]
+        hits = {sub: [match.start() for match in pattern.finditer(content)]
+                for sub, pattern in check["patterns"].items()}
+        if in_xml:
+            hits = {sub: _outside_free_text(content, positions) for sub, positions in hits.items()}
+        check_hits[check_name] = check["resolve"](hits, content)
+
+    return {"rules": rule_hits, "checks": check_hits}
+
+
+# ==============================
+# DÉTECTION
+# ==============================
+def detect_rules(table, file_type, content, message):
+    """
+    Toutes les règles d'un type dont toutes les conditions sont remplies.
+
+    Paramètres :
+        table     → règles compilées (compile_rules)
+        file_type → "json" ou "xml"
+        content   → contenu brut du fichier
+        message   → message du parseur, en minuscules
+
+    Retourne :
+        [(règle, [position, ...]), ...] dans l'ordre de priorité
+        positions → où les motifs / checks ont trouvé le problème
+                    ([] = règle détectée par le message seul)
+    """
+    rules = [
+        rule for rule in table["by_type"].get(file_type, [])
+        if not rule["message"] or any(fragment in message for fragment in rule["message"])
+    ]
+    if not rules:
+        return []
+    hits = scan_detectors(table, rules, content, file_type)
+
+    detected = []
+    for rule in rules:
+        positions = []
+        if rule["contenu"] is not None:
+            if rule["id"] not in hits["rules"]:
+                continue
+            positions.extend(hits["rules"][rule["id"]])
+        if rule["verification"] is not None:
+            found = hits["checks"][rule["verification"]]
+            if not found:
+                continue
+            positions.extend(pos for pos in found if pos is not None)
+        detected.append((rule, positions))
+    return detected
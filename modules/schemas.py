@@ -0,0 +1,208 @@
+"""
+schemas.py
+Jeux de schémas versionnés (un dossier schemas/dayz_<version>/ par version DayZ).
+
+Une version peut hériter d'une autre et ne contenir que ses différences.
+Le fichier version.json du dossier décrit la version :
+
+    {
+        "version": "1.29",
+        "extends": "1.28",
+        "markers": {
+            "types": ["NouveauClassname"],
+            "*": ["<nouvelle_balise"]
+        }
+    }
+
+- extends : version parente. Chaque fichier de schéma présent dans le dossier
+  est fusionné récursivement par-dessus celui du parent (un null supprime la clé,
+  une liste remplace la liste du parent). Les fichiers absents sont hérités tels quels.
+- markers : textes qui n'apparaissent qu'à partir de cette version, par type de
+  fichier DayZ ("*" = tous types). Sert à détecter la version d'un fichier.
+
+Chaque version est compilée (héritage résolu + markers précompilés) une seule fois
+puis gardée en cache.
+"""
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+
+SCHEMAS_DIR = Path(__file__).parent.parent / "schemas"
+DEFAULT_VERSION = "1.28"
+SCHEMA_FILE_TYPES = ["types", "events", "economy", "globals", "messages"]
+
+
+# ==============================
+# DÉCOUVERTE DES VERSIONS
+# ==============================
+def _version_key(version):
+    """'1.28' → (1, 28) pour trier numériquement"""
+    return tuple(int(part) if part.isdigit() else 0 for part in version.split("."))
+
+
+@lru_cache(maxsize=1)
+def list_versions():
+    """
+    Liste les versions disponibles, de la plus ancienne à la plus récente.
+
+    Retourne :
+        tuple → ('1.28', '1.29', ...)
+    """
+    versions = [
+        path.name[len("dayz_"):]
+        for path in SCHEMAS_DIR.glob("dayz_*")
+        if path.is_dir()
+    ]
+    return tuple(sorted(versions, key=_version_key))
+
+
+def _read_manifest(version):
+    """Lit version.json (facultatif pour une version sans parent)"""
+    manifest_path = SCHEMAS_DIR / f"dayz_{version}" / "version.json"
+    if not manifest_path.exists():
+        return {"version": version, "extends": None, "markers": {}}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest.setdefault("version", version)
+    manifest.setdefault("extends", None)
+    manifest.setdefault("markers", {})
+    return manifest
+
+
+# ==============================
+# FUSION PARENT / ENFANT
+# ==============================
+def _deep_merge(base, override):
+    """
+    Fusionne override par-dessus base (sans modifier base).
+    - dict + dict → fusion récursive
+    - None       → suppression de la clé
+    - sinon      → la valeur d'override remplace
+    """
+    merged = dict(base)
+    for key, value in override.items():
+        if value is None:
+            merged.pop(key, None)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+# ==============================
+# COMPILATION D'UNE VERSION (en cache)
+# ==============================
+@lru_cache(maxsize=None)
+def load_schema_set(version):
+    """
+    Charge le jeu de schémas complet d'une version, héritage résolu.
+
+    Retourne :
+        {
+            "version": str,
+            "extends": str ou None,
+            "schemas": {file_type: dict},
+            "markers": {file_type: re.Pattern}   → markers propres à cette version
+        }
+
+    Lève FileNotFoundError si la version n'existe pas,
+    ValueError si l'héritage boucle.
+    """
+    manifest = _read_inheritance(version)
+    return _compile_version(version, manifest)
+
+
+def _read_inheritance(version):
+    """
+    Manifeste d'une version, après avoir vérifié toute sa chaîne d'héritage
+    (seulement les version.json : rien n'est compilé ici).
+
+    Lève FileNotFoundError / ValueError comme load_schema_set.
+    """
+    chain = []
+    current = version
+    manifest = None
+    while current:
+        if current in chain:
+            raise ValueError(f"Héritage circulaire entre schémas : {' → '.join(chain + [current])}")
+        version_dir = SCHEMAS_DIR / f"dayz_{current}"
+        if not version_dir.is_dir():
+            raise FileNotFoundError(f"Aucun schéma pour la version {current} : {version_dir}")
+        chain.append(current)
+        current_manifest = _read_manifest(current)
+        if manifest is None:
+            manifest = current_manifest
+        current = current_manifest["extends"]
+    return manifest
+
+
+def _compile_version(version, manifest):
+    version_dir = SCHEMAS_DIR / f"dayz_{version}"
+    parent = manifest["extends"]
+    schemas = {}
+    if parent:
+        # Par load_schema_set : le parent n'est compilé qu'une fois pour tous ses enfants
+        schemas = dict(load_schema_set(parent)["schemas"])
+
+    for file_type in SCHEMA_FILE_TYPES:
+        schema_path = version_dir / f"{file_type}.json"
+        if not schema_path.exists():
+            continue
+        with open(schema_path, "r", encoding="utf-8") as f:
+            override = json.load(f)
+        schema = _deep_merge(schemas.get(file_type, {}), override)
+        if "version" in schema:
+            schema["version"] = version
+        schemas[file_type] = schema
+
+    markers = {}
+    for file_type, texts in manifest["markers"].items():
+        if texts:
+            markers[file_type] = re.compile("|".join(re.escape(t) for t in texts))
+
+    return {
+        "version": version,
+        "extends": parent,
+        "schemas": schemas,
+        "markers": markers,
+    }
+
+
+def get_schema(file_type, version=DEFAULT_VERSION):
+    """
+    Retourne le schéma d'un type de fichier pour une version.
+
+    Retourne :
+        dict ou None si le type n'a pas de schéma
+
+    Lève FileNotFoundError si la version n'existe pas.
+    """
+    return load_schema_set(version)["schemas"].get(file_type)
+
+
+# ==============================
+# DÉTECTION DE VERSION
+# ==============================
+def detect_dayz_version(content, file_type=None):
+    """
+    Devine la version DayZ d'un fichier à partir de son contenu.
+    On garde la version la plus récente dont un marker apparaît dans le fichier.
+
+    Paramètres :
+        content   → contenu brut du fichier
+        file_type → type DayZ ('types', 'events'...) si connu
+
+    Retourne :
+        str → version détectée (DEFAULT_VERSION si aucun marker ne correspond)
+    """
+    for version in reversed(list_versions()):
+        markers = load_schema_set(version)["markers"]
+        for key in (file_type, "*"):
+            pattern = markers.get(key) if key else None
+            if pattern is not None and pattern.search(content):
+                return version
+    return DEFAULT_VERSION
@@ -0,0 +1,309 @@
+"""
+semantic_fixer.py
+Correction automatique (opt-in) des règles métier de types.xml et events.xml.
+
+Le correcteur (corrector.py) ne touche qu'à la syntaxe. Ici on corrige les
+valeurs signalées par la validation sémantique quand la correction est
+mécanique :
+    types.xml  → min > nominal, quantmin > quantmax, lifetime ≤ 0, nominal=0 avec min > 0
+    events.xml → min ≤ nominal ≤ max, lifetime ≤ 0, child min > max, child lootmin > lootmax
+
+Les valeurs sont extraites en colonnes (une liste par champ, une case par
+entrée), les corrections sont calculées colonne par colonne, puis rendues
+sous forme d'éditions (voir corrector.make_edit) qui ne remplacent que les
+chiffres : indentation, commentaires et ordre des balises sont conservés.
+"""
+
+import re
+from collections import Counter
+
+from modules.corrector import make_edit
+
+
+# ==============================
+# CONFIGURATION
+# ==============================
+ENTRY_TAGS = {"types": "type", "events": "event"}
+ENTRY_FIELDS = {
+    "types": ("nominal", "min", "lifetime", "quantmin", "quantmax"),
+    "events": ("nominal", "min", "max", "lifetime"),
+}
+CHILD_FIELDS = ("min", "max", "lootmin", "lootmax")
+
+# Valeurs prises par validator.py quand le champ est absent
+FIELD_DEFAULTS = {"nominal": 0, "min": 0, "max": 0, "lifetime": 0, "quantmin": -1, "quantmax": -1,
+                  "lootmin": 0, "lootmax": 0}
+
+# lifetime de repli si le fichier n'en contient aucun de valide (1h)
+DEFAULT_LIFETIME = 3600
+
+# Un seul motif pour tout le fichier : commentaires (ignorés), entrées,
+# champs <x>nombre</x>, balises <child .../>
+_TOKEN_RE = re.compile(r"""
+    (?P<comment><!--.*?(?:-->|\Z))
+  | <(?P<entry>type|event)\b(?P<entry_attrs>[^>]*?)(?P<entry_self>/)?>
+  | </(?P<entry_close>type|event)\s*>
+  | <(?P<field>[a-z]+)>\s*(?P<value>-?\d+)\s*</(?P=field)\s*>
+  | <child\b(?P<child_attrs>[^>]*)>
+""", re.VERBOSE | re.DOTALL)
+_NAME_RE = re.compile(r'\bname\s*=\s*"([^"]*)"')
+_TYPE_RE = re.compile(r'\btype\s*=\s*"([^"]*)"')
+_INT_ATTR_RE = re.compile(r'\b(min|max|lootmin|lootmax)\s*=\s*"\s*(-?\d+)\s*"')
+
+
+# ==============================
+# EXTRACTION EN COLONNES
+# ==============================
+def extract_columns(content, file_type):
+    """
+    Extrait les champs numériques des entrées, une colonne par champ.
+
+    Paramètres :
+        content   → contenu XML (déjà valide syntaxiquement)
+        file_type → "types" ou "events"
+
+    Retourne :
+        {
+            "names": [str, ...],                          → une case par entrée
+            "values": {champ: [int ou None, ...]},
+            "spans": {champ: [(début, fin) ou None, ...]}, → position des chiffres
+            "children": {                                 → une case par <child> (events)
+                "entry": [int, ...], "index": [int, ...], "type": [str, ...],
+                "values": {champ: [...]}, "spans": {champ: [...]}
+            }
+        }
+    """
+    entry_tag = ENTRY_TAGS[file_type]
+    fields = ENTRY_FIELDS[file_type]
+    columns = {
+        "names": [],
+        "values": {field: [] for field in fields},
+        "spans": {field: [] for field in fields},
+        "children": {
+            "entry": [], "index": [], "type": [],
+            "values": {field: [] for field in CHILD_FIELDS},
+            "spans": {field: [] for field in CHILD_FIELDS},
+        },
+    }
+    children = columns["children"]
+    row = None            # index de l'entrée en cours
+    child_count = 0
+
+    for token in _TOKEN_RE.finditer(content):
+        kind = token.lastgroup
+        if token.group("entry") is not None:
+            kind = "entry"
+
+        if kind == "entry":
+            if token.group("entry") != entry_tag:
+                continue
+            name = _NAME_RE.search(token.group("entry_attrs"))
+            columns["names"].append(name.group(1) if name else None)
+            for field in fields:
+                columns["values"][field].append(None)
+                columns["spans"][field].append(None)
+            row = None if token.group("entry_self") else len(columns["names"]) - 1
+            child_count = 0
+
+        elif kind == "entry_close":
+            row = None
+
+        elif token.group("field") is not None and row is not None:
+            field = token.group("field")
+            # Premier champ seulement, comme findtext() dans validator.py
+            if field in columns["values"] and columns["values"][field][row] is None:
+                columns["values"][field][row] = int(token.group("value"))
+                columns["spans"][field][row] = token.span("value")
+
+        elif kind == "child_attrs" and row is not None and file_type == "events":
+            attrs = token.group("child_attrs")
+            offset = token.start("child_attrs")
+            child_type = _TYPE_RE.search(attrs)
+            children["entry"].append(row)
+            children["index"].append(child_count)
+            children["type"].append(child_type.group(1) if child_type else "unknown")
+            found = {m.group(1): m for m in _INT_ATTR_RE.finditer(attrs)}
+            for field in CHILD_FIELDS:
+                match = found.get(field)
+                children["values"][field].append(int(match.group(2)) if match else None)
+                children["spans"][field].append(
+                    (offset + match.start(2), offset + match.end(2)) if match else None)
+            child_count += 1
+
+    return columns
+
+
+# ==============================
+# CALCUL DES CORRECTIONS
+# ==============================
+def _effective(values, field):
+    """Colonne avec les valeurs par défaut de validator.py à la place des absents"""
+    default = FIELD_DEFAULTS[field]
+    return [default if value is None else value for value in values]
+
+
+def _most_common_lifetime(lifetimes):
+    """lifetime le plus courant du fichier (parmi les valeurs valides)"""
+    counts = Counter(value for value in lifetimes if value is not None and value > 0)
+    return counts.most_common(1)[0][0] if counts else DEFAULT_LIFETIME
+
+
+def _fix(rules, entry, name, changes, spans, child=None):
+    """Construit une correction : changes = [(champ, ancienne, nouvelle)]"""
+    edits = [
+        make_edit(spans[field][0], spans[field][1] - spans[field][0], str(new),
+                  f"{field} : {old} → {new}")
+        for field, old, new in changes
+    ]
+    return {
+        "rules": rules,
+        "entry": entry,
+        "child": child,
+        "name": name,
+        "changes": [{"field": field, "old": old, "new": new} for field, old, new in changes],
+        "description": ", ".join(f"{field} : {old} → {new}" for field, old, new in changes),
+        "edits": edits,
+    }
+
+
+def _types_fixes(columns):
+    fixes = []
+    values, spans = columns["values"], columns["spans"]
+    nominal = _effective(values["nominal"], "nominal")
+    min_val = _effective(values["min"], "min")
+    lifetime = _effective(values["lifetime"], "lifetime")
+    quantmin = _effective(values["quantmin"], "quantmin")
+    quantmax = _effective(values["quantmax"], "quantmax")
+    default_lifetime = _most_common_lifetime(values["lifetime"])
+
+    # RÈGLES 1 et 4 : min > nominal → min = nominal
+    for entry in (i for i, (mn, nom) in enumerate(zip(min_val, nominal)) if mn > nom):
+        if spans["min"][entry] is not None:
+            rules = ["min_lte_nominal"] + (["disabled_item_coherence"] if nominal[entry] == 0 else [])
+            fixes.append(_fix(rules, entry, columns["names"][entry],
+                              [("min", min_val[entry], nominal[entry])],
+                              {"min": spans["min"][entry]}))
+
+    # RÈGLE 2 : quantmin > quantmax → on inverse les deux
+    for entry in (i for i, (qmin, qmax) in enumerate(zip(quantmin, quantmax))
+                  if qmin != -1 and qmax != -1 and qmin > qmax):
+        if spans["quantmin"][entry] is not None and spans["quantmax"][entry] is not None:
+            fixes.append(_fix(["quantmin_lte_quantmax"], entry, columns["names"][entry],
+                              [("quantmin", quantmin[entry], quantmax[entry]),
+                               ("quantmax", quantmax[entry], quantmin[entry])],
+                              {"quantmin": spans["quantmin"][entry], "quantmax": spans["quantmax"][entry]}))
+
+    # RÈGLE 3 : lifetime ≤ 0 → lifetime le plus courant du fichier
+    for entry in (i for i, value in enumerate(lifetime) if value <= 0):
+        if spans["lifetime"][entry] is not None:
+            fixes.append(_fix(["lifetime_positive"], entry, columns["names"][entry],
+                              [("lifetime", lifetime[entry], default_lifetime)],
+                              {"lifetime": spans["lifetime"][entry]}))
+
+    return fixes
+
+
+def _events_fixes(columns):
+    fixes = []
+    values, spans = columns["values"], columns["spans"]
+    nominal = _effective(values["nominal"], "nominal")
+    min_val = _effective(values["min"], "min")
+    max_val = _effective(values["max"], "max")
+    lifetime = _effective(values["lifetime"], "lifetime")
+    default_lifetime = _most_common_lifetime(values["lifetime"])
+
+    # RÈGLE 1 : min ≤ nominal ≤ max → bornes remises dans l'ordre, nominal ramené dedans
+    for entry in (i for i, (mn, nom, mx) in enumerate(zip(min_val, nominal, max_val))
+                  if not mn <= nom <= mx):
+        low, high = sorted((min_val[entry], max_val[entry]))
+        target = {"min": low, "max": high, "nominal": min(max(nominal[entry], low), high)}
+        current = {"min": min_val[entry], "max": max_val[entry], "nominal": nominal[entry]}
+        changes = [(field, current[field], target[field])
+                   for field in ("min", "nominal", "max") if current[field] != target[field]]
+        if all(spans[field][entry] is not None for field, _, _ in changes):
+            fixes.append(_fix(["min_lte_nominal_lte_max"], entry, columns["names"][entry], changes,
+                              {field: spans[field][entry] for field, _, _ in changes}))
+
+    # RÈGLE 2 : lifetime ≤ 0
+    for entry in (i for i, value in enumerate(lifetime) if value <= 0):
+        if spans["lifetime"][entry] is not None:
+            fixes.append(_fix(["lifetime_positive"], entry, columns["names"][entry],
+                              [("lifetime", lifetime[entry], default_lifetime)],
+                              {"lifetime": spans["lifetime"][entry]}))
+
+    # RÈGLE 4 : children min > max, lootmin > lootmax → on inverse
+    children = columns["children"]
+    for low_field, high_field, rule in (("min", "max", "child_min_lte_max"),
+                                        ("lootmin", "lootmax", "child_lootmin_lte_lootmax")):
+        low_values = _effective(children["values"][low_field], low_field)
+        high_values = _effective(children["values"][high_field], high_field)
+        low_spans, high_spans = children["spans"][low_field], children["spans"][high_field]
+        for k in (k for k, (low, high) in enumerate(zip(low_values, high_values)) if low > high):
+            if low_spans[k] is not None and high_spans[k] is not None:
+                entry = children["entry"][k]
+                fixes.append(_fix([rule], entry, columns["names"][entry],
+                                  [(low_field, low_values[k], high_values[k]),
+                                   (high_field, high_values[k], low_values[k])],
+                                  {low_field: low_spans[k], high_field: high_spans[k]},
+                                  child=children["index"][k]))
+
+    return fixes
+
+
+# ==============================
+# FONCTION PRINCIPALE
+# ==============================
+def compute_semantic_fixes(content, file_type):
+    """
+    Calcule les corrections des règles métier, sans modifier le contenu.
+
+    Paramètres :
+        content   → contenu XML valide
+        file_type → type DayZ ("types" ou "events" ; les autres ne sont pas gérés)
+
+    Retourne :
+        {
+            "fixes": [                    → une correction par avertissement résolu
+                {
+                    "rules": [str, ...],  → clés de validation_rules du schéma
+                    "entry": int,         → index (0-based) de l'entrée
+                    "child": int ou None, → index du <child> dans l'event
+                    "name": str,
+                    "changes": [{"field", "old", "new"}, ...],
+                    "description": str,
+                    "edits": [édition, ...]
+                }
+            ],
+            "edits": [édition, ...],      → toutes les éditions (voir corrector.apply_edits)
+            "has_changes": bool
+        }
+    """
+    if file_type not in ENTRY_TAGS:
+        return {"fixes": [], "edits": [], "has_changes": False}
+
+    columns = extract_columns(content, file_type)
+    fixes = _types_fixes(columns) if file_type == "types" else _events_fixes(columns)
+    edits = [edit for fix in fixes for edit in fix["edits"]]
+
+    return {
+        "fixes": fixes,
+        "edits": edits,
+        "has_changes": len(edits) > 0,
+    }
+
+
+def attach_fixes(warnings, fixes):
+    """
+    Associe chaque correction à l'avertissement qu'elle résout.
+    Ajoute warning["fix"] (la correction, ou None) aux avertissements
+    produits par validate_semantic_rules().
+    """
+    by_key = {}
+    for fix in fixes:
+        for rule in fix["rules"]:
+            by_key[(rule, fix["entry"] + 1, fix["child"])] = fix
+
+    for warning in warnings:
+        key = (warning.get("rule"), warning.get("line"), warning.get("child"))
+        warning["fix"] = by_key.get(key)
+    return warnings
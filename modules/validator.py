@@ -6,39 +6,43 @@ Retourne un objet structuré : valide ou pas, erreur matchée, ligne/colonne, ET
 
 import json
 import xml.etree.ElementTree as ET
-import re
-import os
-from modules.errors_matcher import match_error
-from modules.corrector import auto_correct, can_auto_correct
+from modules.errors_matcher import match_all_errors
+from modules.locator import locate_json_error, locate_real_error
+from modules.corrector import correction_actions
+from modules.repair import correct_until_valid, correct_window, search_minimal_repair, WINDOW_MIN_SIZE
+from modules.semantic_fixer import compute_semantic_fixes, attach_fixes
+from modules.schemas import DEFAULT_VERSION, get_schema, detect_dayz_version
+from modules.messages import Message, message_fields, schema_message
+from modules.document_cache import document_scope
 
 
 # ==============================
 # ✨ NOUVEAU : CHARGEMENT SCHÉMAS
 # ==============================
-def load_schema(file_type, version="1.28"):
+def load_schema(file_type, version=DEFAULT_VERSION):
     """
     Charge un schéma de validation JSON pour un type de fichier DayZ.
+    Les versions héritent les unes des autres (voir modules/schemas.py).
     
     Args:
         file_type (str): Type de fichier ('types', 'events', 'economy')
-        version (str): Version DayZ (par défaut '1.28')
+        version (str): Version DayZ (par défaut DEFAULT_VERSION)
     
     Returns:
         dict: Schéma de validation JSON ou None si erreur
     """
-    # Chemin relatif depuis la racine du projet
-    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    schema_path = os.path.join(base_path, f"schemas/dayz_{version}/{file_type}.json")
-    
     try:
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"⚠️ Schéma non trouvé : {schema_path}")
+        schema = get_schema(file_type, version)
+    except FileNotFoundError as e:
+        print(f"⚠️ Schéma non trouvé : {e}")
         return None
-    except json.JSONDecodeError as e:
+    except (json.JSONDecodeError, ValueError) as e:
         print(f"❌ Erreur de lecture du schéma : {e}")
         return None
+    
+    if schema is None:
+        print(f"⚠️ Schéma non trouvé : {file_type} (version {version})")
+    return schema
 
 
 # ==============================
@@ -78,19 +82,26 @@ def detect_dayz_file_type(content):
 # ==============================
 # ✨ NOUVEAU : VALIDATION SÉMANTIQUE
 # ==============================
-def validate_semantic_rules(content, file_type):
+def validate_semantic_rules(content, file_type, version=DEFAULT_VERSION):
     """
     Valide un fichier XML selon les règles métier DayZ (validation sémantique).
     
     Args:
         content (str): Contenu XML du fichier
         file_type (str): Type de fichier ('types', 'events', 'economy', 'globals')
+        version (str): Version DayZ dont on applique le schéma
     
     Returns:
         list: Liste de warnings/erreurs sémantiques
-            [{"severity": "error"|"warning", "message": "...", "line": int}]
+            [{"severity": "error"|"warning", "message_key": str,
+              "message_params": dict, "line": int, "rule": str, "child": int}]
+              → rule : clé de validation_rules du schéma,
+                child : index du <child> (events)
+            message : texte de la règle dans le schéma (error_message_fr /
+            error_message_en), rangé par sa clé et ses valeurs et rendu dans
+            la langue demandée à l'affichage (voir modules/messages.py)
     """
-    schema = load_schema(file_type)
+    schema = load_schema(file_type, version)
     if not schema:
         return []
     
@@ -101,15 +112,15 @@ def validate_semantic_rules(content, file_type):
         
         # VALIDATION TYPES.XML
         if file_type == "types":
-            warnings.extend(_validate_types_semantic(tree, schema))
+            warnings.extend(_validate_types_semantic(tree, version))
         
         # VALIDATION EVENTS.XML
         elif file_type == "events":
-            warnings.extend(_validate_events_semantic(tree, schema))
+            warnings.extend(_validate_events_semantic(tree, version))
         
         # VALIDATION ECONOMY.XML
         elif file_type == "economy":
-            warnings.extend(_validate_economy_semantic(tree, schema))
+            warnings.extend(_validate_economy_semantic(tree, version))
         
     except ET.ParseError:
         # Si parsing échoue, pas de validation sémantique (déjà géré par validate_xml)
@@ -121,12 +132,23 @@ def validate_semantic_rules(content, file_type):
 # ==============================
 # ✨ VALIDATION SÉMANTIQUE : TYPES.XML
 # ==============================
-def _validate_types_semantic(root, schema):
+def _rule_message(version, file_type, rule, subject=None, **params):
+    """
+    Champs message, message_key, message_params d'une règle de
+    validation_rules, précédée de son sujet (item, event)
+    """
+    message = schema_message(version, file_type, rule, **params)
+    if subject is not None:
+        message = Message("semantic.sujet", subject=subject, detail=message)
+    return message_fields("message", message)
+
+
+def _validate_types_semantic(root, version):
     """Valide les règles métier de types.xml"""
     warnings = []
     
     for idx, type_elem in enumerate(root.findall('type'), start=1):
-        item_name = type_elem.get('name', f'Item #{idx}')
+        item = Message("semantic.item", name=type_elem.get('name', f'Item #{idx}'))
         
         # Récupérer les valeurs
         nominal = int(type_elem.findtext('nominal', '0'))
@@ -139,32 +161,36 @@ def _validate_types_semantic(root, schema):
         if min_val > nominal:
             warnings.append({
                 "severity": "error",
-                "message": f"Item '{item_name}': min ({min_val}) > nominal ({nominal}). Le minimum ne peut pas être supérieur au nominal.",
-                "line": idx
+                **_rule_message(version, "types", "min_lte_nominal", item, min=min_val, nominal=nominal),
+                "line": idx,
+                "rule": "min_lte_nominal"
             })
         
         # RÈGLE 2: quantmin ≤ quantmax
         if quantmin != -1 and quantmax != -1 and quantmin > quantmax:
             warnings.append({
                 "severity": "error",
-                "message": f"Item '{item_name}': quantmin ({quantmin}) > quantmax ({quantmax}). La quantité minimum ne peut pas être supérieure au maximum.",
-                "line": idx
+                **_rule_message(version, "types", "quantmin_lte_quantmax", item, quantmin=quantmin, quantmax=quantmax),
+                "line": idx,
+                "rule": "quantmin_lte_quantmax"
             })
         
         # RÈGLE 3: lifetime > 0
         if lifetime <= 0:
             warnings.append({
                 "severity": "error",
-                "message": f"Item '{item_name}': lifetime ({lifetime}) doit être > 0.",
-                "line": idx
+                **_rule_message(version, "types", "lifetime_positive", item, lifetime=lifetime),
+                "line": idx,
+                "rule": "lifetime_positive"
             })
         
         # RÈGLE 4: Item désactivé mais min > 0
         if nominal == 0 and min_val > 0:
             warnings.append({
                 "severity": "warning",
-                "message": f"Item '{item_name}': nominal=0 (désactivé) mais min={min_val}. Recommandation : mettre min=0.",
-                "line": idx
+                **_rule_message(version, "types", "disabled_item_coherence", item, min=min_val),
+                "line": idx,
+                "rule": "disabled_item_coherence"
             })
         
         # RÈGLE 5: Pas de <usage> = pas de spawn
@@ -175,8 +201,9 @@ def _validate_types_semantic(root, schema):
             if crafted == '0':
                 warnings.append({
                     "severity": "warning",
-                    "message": f"Item '{item_name}': nominal={nominal} mais aucun <usage> défini. Cet item ne spawnera pas naturellement.",
-                    "line": idx
+                    **_rule_message(version, "types", "no_usage_no_spawn", item, nominal=nominal),
+                    "line": idx,
+                    "rule": "no_usage_no_spawn"
                 })
     
     return warnings
@@ -185,12 +212,13 @@ def _validate_types_semantic(root, schema):
 # ==============================
 # ✨ VALIDATION SÉMANTIQUE : EVENTS.XML
 # ==============================
-def _validate_events_semantic(root, schema):
+def _validate_events_semantic(root, version):
     """Valide les règles métier de events.xml"""
     warnings = []
     
     for idx, event_elem in enumerate(root.findall('event'), start=1):
         event_name = event_elem.get('name', f'Event #{idx}')
+        event = Message("semantic.event", name=event_name)
         
         # Récupérer les valeurs
         nominal = int(event_elem.findtext('nominal', '0'))
@@ -203,28 +231,32 @@ def _validate_events_semantic(root, schema):
         if not (min_val <= nominal <= max_val):
             warnings.append({
                 "severity": "error",
-                "message": f"Event '{event_name}': La relation min ({min_val}) ≤ nominal ({nominal}) ≤ max ({max_val}) n'est pas respectée.",
-                "line": idx
+                **_rule_message(version, "events", "min_lte_nominal_lte_max", event,
+                                         min=min_val, nominal=nominal, max=max_val),
+                "line": idx,
+                "rule": "min_lte_nominal_lte_max"
             })
         
         # RÈGLE 2: lifetime > 0
         if lifetime <= 0:
             warnings.append({
                 "severity": "error",
-                "message": f"Event '{event_name}': lifetime ({lifetime}) doit être > 0.",
-                "line": idx
+                **_rule_message(version, "events", "lifetime_positive", event, lifetime=lifetime),
+                "line": idx,
+                "rule": "lifetime_positive"
             })
         
         # RÈGLE 3: Event désactivé
         if active == 0:
             warnings.append({
                 "severity": "warning",
-                "message": f"Event '{event_name}': active=0 (désactivé). Est-ce voulu ?",
-                "line": idx
+                **_rule_message(version, "events", "disabled_event_warning", event_name=event_name),
+                "line": idx,
+                "rule": "disabled_event_warning"
             })
         
         # RÈGLE 4: Children min/max
-        for child in event_elem.findall('.//child'):
+        for child_idx, child in enumerate(event_elem.findall('.//child')):
             child_type = child.get('type', 'unknown')
             child_min = int(child.get('min', '0'))
             child_max = int(child.get('max', '0'))
@@ -234,15 +266,21 @@ def _validate_events_semantic(root, schema):
             if child_min > child_max:
                 warnings.append({
                     "severity": "error",
-                    "message": f"Event '{event_name}', child '{child_type}': min ({child_min}) > max ({child_max}).",
-                    "line": idx
+                    **_rule_message(version, "events", "child_min_lte_max", event,
+                                             child_type=child_type, min=child_min, max=child_max),
+                    "line": idx,
+                    "rule": "child_min_lte_max",
+                    "child": child_idx
                 })
             
             if lootmin > lootmax:
                 warnings.append({
                     "severity": "error",
-                    "message": f"Event '{event_name}', child '{child_type}': lootmin ({lootmin}) > lootmax ({lootmax}).",
-                    "line": idx
+                    **_rule_message(version, "events", "child_lootmin_lte_lootmax", event,
+                                             child_type=child_type, lootmin=lootmin, lootmax=lootmax),
+                    "line": idx,
+                    "rule": "child_lootmin_lte_lootmax",
+                    "child": child_idx
                 })
     
     return warnings
@@ -251,7 +289,7 @@ def _validate_events_semantic(root, schema):
 # ==============================
 # ✨ VALIDATION SÉMANTIQUE : ECONOMY.XML
 # ==============================
-def _validate_economy_semantic(root, schema):
+def _validate_economy_semantic(root, version):
     """Valide les règles métier de economy.xml"""
     warnings = []
     
@@ -262,8 +300,9 @@ def _validate_economy_semantic(root, schema):
         if respawn != '0':
             warnings.append({
                 "severity": "error",
-                "message": f"Système 'building': respawn doit être 0 (les bases ne doivent PAS respawner). Actuellement : {respawn}",
-                "line": 0
+                **_rule_message(version, "economy", "building_respawn_zero", value=respawn),
+                "line": 0,
+                "rule": "building_respawn_zero"
             })
     
     # Vérifier player = 1 1 1 1
@@ -277,8 +316,10 @@ def _validate_economy_semantic(root, schema):
         if not (init == '1' and load == '1' and respawn == '1' and save == '1'):
             warnings.append({
                 "severity": "warning",
-                "message": f"Système 'player': configuration inhabituelle détectée. Vanilla recommandé : init='1' load='1' respawn='1' save='1'. Actuel : init='{init}' load='{load}' respawn='{respawn}' save='{save}'",
-                "line": 0
+                **_rule_message(version, "economy", "player_all_enabled",
+                                         config=f"init='{init}' load='{load}' respawn='{respawn}' save='{save}'"),
+                "line": 0,
+                "rule": "player_all_enabled"
             })
     
     # Vérifier systèmes critiques (dynamic, vehicles, building)
@@ -291,16 +332,18 @@ def _validate_economy_semantic(root, schema):
             if save == '0' or load == '0':
                 warnings.append({
                     "severity": "warning",
-                    "message": f"Système CRITIQUE '{system_name}': save={save} ou load={load} détecté. ATTENTION : perte de données au restart !",
-                    "line": 0
+                    **_rule_message(version, "economy", "critical_system_disabled", system=system_name),
+                    "line": 0,
+                    "rule": "critical_system_disabled"
                 })
             
             # Incohérence load=1 sans save=1
             if load == '1' and save == '0':
                 warnings.append({
                     "severity": "warning",
-                    "message": f"Système '{system_name}': load=1 mais save=0. Rien ne sera sauvegardé, donc rien à charger. Est-ce voulu ?",
-                    "line": 0
+                    **_rule_message(version, "economy", "load_without_save_warning", system=system_name),
+                    "line": 0,
+                    "rule": "load_without_save_warning"
                 })
     
     return warnings
@@ -315,31 +358,46 @@ def _validate_economy_semantic(root, schema):
 #     "valid": bool,
 #     "file_type": "xml" ou "json",
 #     "dayz_type": str ou None,          → ✨ NOUVEAU : type DayZ détecté
+#     "dayz_version": str ou None,       → version DayZ dont le schéma a été appliqué
 #     "error": {
 #         "line": int,
 #         "column": int,
-#         "message_brut": str,
+#         "message_brut": str,           → message du parseur ; pour un message du
+#                                           validateur, message_brut_key et
+#                                           message_brut_params à la place
+#                                           (render_field, modules/messages.py)
 #         "matched": dict ou None,
 #     },
 #     "formatted": str ou None,
 #     "corrected": str ou None,
-#     "semantic_warnings": list ou None   → ✨ NOUVEAU : warnings sémantiques
+#     "edits": list ou None,             → corrections sous forme d'éditions (voir corrector.make_edit)
+#     "corrected_valid": bool ou None,   → la version corrigée se parse (None si pas de correction)
+#     "repair_confidence": float ou None, → confiance (0 à 1) quand la correction vient de
+#                                           search_minimal_repair (erreur non reconnue)
+#     "semantic_warnings": list ou None,  → ✨ NOUVEAU : warnings sémantiques
+#     "semantic_edits": list ou None      → corrections des règles métier (opt-in, voir semantic_fixer)
 # }
 
 
 # ==============================
 # VALIDATION JSON
 # ==============================
+@document_scope()
 def validate_json(content):
     """Valide du contenu JSON. Retourne le dict de résultat."""
     result = {
         "valid": False,
         "file_type": "json",
         "dayz_type": None,
+        "dayz_version": None,
         "error": None,
         "formatted": None,
         "corrected": None,
-        "semantic_warnings": None
+        "edits": None,
+        "corrected_valid": None,
+        "repair_confidence": None,
+        "semantic_warnings": None,
+        "semantic_edits": None
     }
 
     try:
@@ -350,37 +408,77 @@ def validate_json(content):
         return result
 
     except json.JSONDecodeError as e:
-        matched = match_error(content, e, "json")
+        # Toutes les causes possibles, de la plus probable à la moins probable
+        matches = match_all_errors(content, e, "json")
+        matched = matches[0] if matches else None
         
         result["error"] = {
             "line": e.lineno,
             "column": e.colno,
             "message_brut": e.msg,
-            "matched": matched
+            "matched": matched,
+            "other_matches": matches[1:],
+            # Accolade / crochet manquant : json signale la fin du fichier,
+            # le locator remonte à l'ouverture
+            "location": locate_json_error(content, e.lineno)
         }
         
         # Tenter la correction automatique si possible
-        if matched and can_auto_correct(matched):
-            correction = auto_correct(content, "json")
+        # Corrigeable si une des causes détectées a une action de correction
+        if correction_actions(matches):
+            correction = correct_until_valid(content, "json", first_error=e)
             if correction["has_changes"]:
                 result["corrected"] = correction["corrected"]
-        
+                result["edits"] = correction["edits"]
+                result["corrected_valid"] = correction["valid"]
+        elif matched is None:
+            # Erreur inconnue de errors_db : recherche d'une petite réparation
+            repair = search_minimal_repair(content, "json", e)
+            if repair and repair["valid"]:
+                result["corrected"] = repair["corrected"]
+                result["edits"] = repair["edits"]
+                result["corrected_valid"] = True
+                result["repair_confidence"] = repair["confidence"]
+
+        return result
+
+    except RecursionError:
+        # { [ imbriqués plus profond que la pile du module json (fichier
+        # fabriqué) : pas de position exploitable, pas de correction
+        result["error"] = {
+            "line": 1,
+            "column": 1,
+            **message_fields("message_brut", Message("validator.imbrication_trop_profonde")),
+            "matched": None,
+            "other_matches": [],
+            "location": None
+        }
         return result
 
 
 # ==============================
 # VALIDATION XML
 # ==============================
-def validate_xml(content):
-    """Valide du contenu XML. Retourne le dict de résultat."""
+@document_scope()
+def validate_xml(content, version=None, fix_semantic=False):
+    """
+    Valide du contenu XML. Retourne le dict de résultat.
+    version      → version DayZ à appliquer (None = détection automatique)
+    fix_semantic → calcule aussi les corrections des règles métier
+    """
     result = {
         "valid": False,
         "file_type": "xml",
         "dayz_type": None,
+        "dayz_version": None,
         "error": None,
         "formatted": None,
         "corrected": None,
-        "semantic_warnings": None
+        "edits": None,
+        "corrected_valid": None,
+        "repair_confidence": None,
+        "semantic_warnings": None,
+        "semantic_edits": None
     }
 
     try:
@@ -396,28 +494,56 @@ def validate_xml(content):
         
         # ✨ NOUVEAU : Validation sémantique si type DayZ détecté
         if dayz_type in ['types', 'events', 'economy']:
-            semantic_warnings = validate_semantic_rules(content, dayz_type)
+            version = version or detect_dayz_version(content, dayz_type)
+            result["dayz_version"] = version
+            semantic_warnings = validate_semantic_rules(content, dayz_type, version)
             if semantic_warnings:
                 result["semantic_warnings"] = semantic_warnings
+                if fix_semantic:
+                    fixes = compute_semantic_fixes(content, dayz_type)
+                    attach_fixes(semantic_warnings, fixes["fixes"])
+                    if fixes["has_changes"]:
+                        result["semantic_edits"] = fixes["edits"]
         
         return result
 
     except ET.ParseError as e:
         line, col = e.position
-        matched = match_error(content, e, "xml")
+        # Toutes les causes possibles, de la plus probable à la moins probable
+        matches = match_all_errors(content, e, "xml")
+        matched = matches[0] if matches else None
         
         result["error"] = {
             "line": line,
             "column": col,
             "message_brut": str(e),
-            "matched": matched
+            "matched": matched,
+            "other_matches": matches[1:],
+            # Cause probable (souvent plus haut que la ligne du parseur),
+            # avec sa position exacte pour surligner le passage
+            "location": locate_real_error(content, line)
         }
         
         # Tenter la correction automatique si possible
-        if matched and can_auto_correct(matched):
-            correction = auto_correct(content, "xml")
+        # Corrigeable si une des causes détectées a une action de correction
+        if correction_actions(matches):
+            # Gros fichier : on ne corrige qu'une fenêtre autour de l'erreur
+            if len(content) >= WINDOW_MIN_SIZE:
+                correction = correct_window(content, "xml", first_error=e)
+            else:
+                correction = correct_until_valid(content, "xml", first_error=e)
             if correction["has_changes"]:
                 result["corrected"] = correction["corrected"]
+                result["edits"] = correction["edits"]
+                result["corrected_valid"] = correction["valid"]
+        elif matched is None:
+            # Erreur inconnue de errors_db : recherche d'une petite réparation
+            repair = search_minimal_repair(content, "xml", e)
+            if repair and repair["valid"]:
+                result["corrected"] = repair["corrected"]
+                result["edits"] = repair["edits"]
+                result["corrected_valid"] = True
+                result["repair_confidence"] = repair["confidence"]
         
         return result
 
@@ -441,13 +567,15 @@ def _format_xml(content):
 # ==============================
 # FONCTION PRINCIPALE
 # ==============================
-def validate(content, file_type):
+def validate(content, file_type, version=None, fix_semantic=False):
     """
     Fonction principale appelée par app.py
     
     Paramètres :
-        content   → contenu brut du fichier (string)
-        file_type → "json" ou "xml"
+        content      → contenu brut du fichier (string)
+        file_type    → "json" ou "xml"
+        version      → version DayZ des schémas (None = détection automatique)
+        fix_semantic → calcule aussi les corrections des règles métier (types / events)
     
     Retourne :
         dict structuré (voir commentaire en haut du fichier)
@@ -455,20 +583,27 @@ def validate(content, file_type):
     if file_type == "json":
         return validate_json(content)
     elif file_type == "xml":
-        return validate_xml(content)
+        return validate_xml(content, version, fix_semantic)
     
     # Type inconnu
     return {
         "valid": False,
         "file_type": file_type,
         "dayz_type": None,
+        "dayz_version": None,
         "error": {
             "line": 0,
             "column": 0,
-            "message_brut": "Type de fichier non supporté",
-            "matched": None
+            **message_fields("message_brut", Message("validator.type_non_supporte")),
+            "matched": None,
+            "other_matches": [],
+            "location": None
         },
         "formatted": None,
         "corrected": None,
-        "semantic_warnings": None
+        "edits": None,
+        "corrected_valid": None,
+        "repair_confidence": None,
+        "semantic_warnings": None,
+        "semantic_edits": None
     }
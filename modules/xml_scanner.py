@@ -0,0 +1,185 @@
+"""
+xml_scanner.py
+Découpage lexical du XML en événements de balises, partagé par le matcher,
+le correcteur, le localisateur et la réparation.
+
+Chacun avait son propre parcours à base de regex par ligne, et ils ne
+traitaient pas pareil les balises sur plusieurs lignes, <?xml ?>, les
+commentaires multi-lignes ou un > entre guillemets. Ici un seul motif
+avance de token en token sur tout le document :
+
+    for kind, start, end, name, well_formed in iter_xml_events(content):
+        ...
+
+Événements (tuples, dans l'ordre du document) :
+    (kind, start, end, name, well_formed)
+    kind        → OPEN, SELF_CLOSE, CLOSE, BROKEN, COMMENT, PI, DECL, CDATA, AMP
+    start, end  → positions dans content (end exclu ; None = jamais terminé :
+                  commentaire sans -->, le parcours s'arrête là). Pour BROKEN,
+                  end va jusqu'au premier > (inclus) ou < (exclu)
+    name        → nom de la balise (OPEN, SELF_CLOSE, CLOSE, BROKEN), sinon None
+    well_formed → OPEN / SELF_CLOSE : attributs tous entre guillemets et sans &
+                  (sinon à vérifier par l'appelant), True pour les autres
+
+scan_xml() garde les événements en cache le temps d'une validation (voir
+modules/document_cache.py) : le matcher, le locator et la correction ne
+découpent le document qu'une fois, et rien ne reste en mémoire après.
+"""
+
+import re
+
+from modules.document_cache import per_document
+
+
+# Sortes d'événements
+OPEN = "open"               # <balise ...>
+SELF_CLOSE = "self_close"   # <balise ... />
+CLOSE = "close"             # </balise>
+BROKEN = "broken"           # <balise ... aux guillemets non refermés, ou sans >
+COMMENT = "comment"         # <!-- ... -->
+PI = "pi"                   # <?xml ... ?>
+DECL = "decl"               # <!DOCTYPE ...>
+CDATA = "cdata"             # <![CDATA[ ... ]]>
+AMP = "amp"                 # & du texte qui n'est pas une entité valide
+
+
+# ==============================
+# MOTIFS
+# ==============================
+# Les balises bien formées (fermante simple, ou ouvrante aux attributs entre
+# guillemets et sans &) sont reconnues d'un bloc par la première alternative ;
+# les autres (guillemets manquants, &, espaces après </...) par les suivantes,
+# où les guillemets protègent > et / sans déborder sur un <.
+# Aucun groupe n'englobe le début d'une alternative : re garde alors son
+# préfixe [<&] et saute directement au token suivant (deux fois plus rapide
+# qu'avec des alternatives nommées (?P<...>...)).
+_TOKEN_RE = re.compile(r"""
+    <(?:/(?P<close>[A-Za-z_][\w:.-]*)\s*
+       |(?P<clean>[A-Za-z_][\w:.-]*)(?:\s+[\w:.-]+\s*=\s*(?:"[^"<&]*"|'[^'<&]*'))*\s*(?P<clean_self>/?))>
+  | <(?P<open>[A-Za-z_][\w:.-]*)(?:[^>"'<]+|"[^"<]*"|'[^'<]*')*+(?P<end>>)?
+  | </\s*(?P<spaced_close>[A-Za-z_][\w:.-]*)\s*>
+  | &
+  | <(?P<special>!--|!\[CDATA\[|\?|!)
+""", re.VERBOSE)
+
+# Entités déjà valides (nommées prédéfinies + références numériques)
+ENTITY_RE = re.compile(r'&(?:amp|lt|gt|quot|apos|#[0-9]+|#x[0-9a-fA-F]+);')
+# & qui n'est pas une entité valide (utilisé à l'intérieur des balises)
+BARE_AMP_RE = re.compile(r'&(?!(?:amp|lt|gt|quot|apos|#[0-9]+|#x[0-9a-fA-F]+);)')
+
+# <!-- est traité à part (un commentaire non fermé arrête le parcours)
+_SPECIALS = {"![CDATA[": (CDATA, "]]>"), "?": (PI, "?>"), "!": (DECL, ">")}
+
+
+# ==============================
+# PARCOURS
+# ==============================
+def iter_xml_events(content, start=0, end=None):
+    """
+    Événements de content[start:end], dans l'ordre (voir le module).
+
+    Paramètres :
+        content    → contenu brut du XML
+        start, end → portion à découper (par défaut tout le document) ;
+                     un token ne déborde jamais après end
+    """
+    length = len(content) if end is None else min(end, len(content))
+    search = _TOKEN_RE.search
+    entity = ENTITY_RE.match
+    pos = start
+
+    while True:
+        token = search(content, pos, length)
+        if not token:
+            return
+        close, clean, clean_self, name, end, spaced_close, special = token.groups()
+        i = token.start()
+        pos = token.end()
+
+        if clean is not None:
+            yield (SELF_CLOSE if clean_self else OPEN), i, pos, clean, True
+
+        elif close is not None:
+            yield CLOSE, i, pos, close, True
+
+        elif name is not None:
+            if end is None:
+                # Étendue brute : jusqu'au premier > (inclus) ou < (exclu)
+                limit = content.find("<", pos, length)
+                limit = length if limit == -1 else limit
+                closing = content.find(">", pos, limit)
+                pos = limit if closing == -1 else closing + 1
+                yield BROKEN, i, pos, name, False
+            elif content[pos - 2] == "/":
+                yield SELF_CLOSE, i, pos, name, False
+            else:
+                yield OPEN, i, pos, name, False
+
+        elif spaced_close is not None:
+            yield CLOSE, i, pos, spaced_close, True
+
+        elif special is None:
+            if not entity(content, i):
+                yield AMP, i, pos, None, True
+
+        elif special == "!--":
+            comment_end = content.find("-->", pos, length)
+            if comment_end == -1:
+                # Tout ce qui suit est du commentaire
+                yield COMMENT, i, None, None, True
+                return
+            pos = comment_end + 3
+            yield COMMENT, i, pos, None, True
+
+        else:
+            kind, terminator = _SPECIALS[special]
+            found = content.find(terminator, pos, length)
+            pos = length if found == -1 else found + len(terminator)
+            yield kind, i, pos, None, True
+
+
+@per_document
+def scan_xml(content):
+    """
+    Tous les événements du document, gardés en cache dans le
+    document_scope() courant (même texte → même tuple, sans nouveau parcours).
+
+    Retourne :
+        tuple d'événements (voir le module)
+    """
+    return tuple(iter_xml_events(content))
+
+
+def _count_before(events, offset):
+    """Nombre d'événements qui commencent avant offset (recherche dichotomique)"""
+    low, high = 0, len(events)
+    while low < high:
+        middle = (low + high) // 2
+        if events[middle][1] < offset:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def events_before(events, offset):
+    """Événements qui commencent avant offset (events trié par position)"""
+    return events[:_count_before(events, offset)]
+
+
+def events_between(events, start, end):
+    """Événements qui commencent dans [start, end) (events trié par position)"""
+    return events[_count_before(events, start):_count_before(events, end)]
+
+
+def event_at(events, offset):
+    """
+    Événement dont l'étendue contient offset (events trié par position),
+    ou None si offset est dans du texte.
+    """
+    index = _count_before(events, offset + 1) - 1
+    if index >= 0:
+        event = events[index]
+        if event[2] is None or offset < event[2]:
+            return event
+    return None
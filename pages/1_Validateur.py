@@ -12,6 +12,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # Import de l'ancien système qui fonctionne
 from modules.validator import validate
+from modules.corrector import apply_edits
+from modules.comparator import diff_from_edits
+from modules.knowledge_base import get_knowledge_base
+from modules.messages import LOCALE_NAMES, render_field
+from modules.context import build_contexts, render_context_html
 
 # ═══════════════════════════════════════════════════════
 # CONFIG PAGE
@@ -39,44 +44,6 @@ apply_header(st)
 if st.button("⬅️ Retour à l'accueil"):
     st.switch_page("app.py")
 
-# ═══════════════════════════════════════════════════════
-# HELPER FUNCTIONS
-# ═══════════════════════════════════════════════════════
-
-def get_code_context(content, error_line, context_lines=2):
-    """Extrait le contexte autour de la ligne en erreur"""
-    lines = content.split('\n')
-    start = max(0, error_line - context_lines - 1)
-    end = min(len(lines), error_line + context_lines)
-    
-    context = []
-    for i in range(start, end):
-        line_num = i + 1
-        line_text = lines[i] if i < len(lines) else ""
-        is_error = (line_num == error_line)
-        context.append({
-            'num': line_num,
-            'text': line_text,
-            'is_error': is_error
-        })
-    
-    return context
-
-def render_code_context(context):
-    """Affiche le contexte du code avec highlight de l'erreur"""
-    html = '<div class="context-code">'
-    
-    for line in context:
-        line_class = "line error" if line['is_error'] else "line"
-        arrow = "❌ " if line['is_error'] else "   "
-        html += f'<div class="{line_class}">'
-        html += f'<span class="line-num">{arrow}{line["num"]}</span>'
-        html += f'{line["text"]}'
-        html += '</div>'
-    
-    html += '</div>'
-    return html
-
 # ═══════════════════════════════════════════════════════
 # CONTENU PRINCIPAL
 # ═══════════════════════════════════════════════════════
@@ -107,12 +74,19 @@ if uploaded_file:
     # Déterminer le type de fichier
     file_type = "json" if filename.lower().endswith('.json') else "xml"
     
+    # Corrections des règles métier : uniquement sur demande
+    fix_semantic = st.checkbox(
+        "🛠️ Proposer les corrections des règles métier (types.xml / events.xml)",
+        value=False,
+        help="min > nominal, quantmin > quantmax, lifetime ≤ 0, children min > max..."
+    )
+    
     # Bouton de validation
     if st.button("🚀 Valider le fichier", type="primary"):
         with st.spinner("Analyse en cours..."):
             try:
                 # Validation avec l'ancien système qui fonctionne
-                result = validate(content, file_type)
+                result = validate(content, file_type, fix_semantic=fix_semantic)
                 
                 # DEBUG : Vérifier le type de result
                 if result is None:
@@ -123,7 +97,10 @@ if uploaded_file:
                     st.error(f"❌ La validation a retourné {type(result)} au lieu d'un dict")
                     st.stop()
                 
-                # Stocker dans session state
+                # Stocker dans session state : la correction est gardée sous forme
+                # d'éditions, le texte corrigé complet est reconstruit à l'affichage
+                result = dict(result)
+                result.pop("corrected", None)
                 st.session_state.validation_result = result
                 
             except Exception as e:
@@ -131,6 +108,14 @@ if uploaded_file:
                 st.exception(e)
                 st.stop()
 
+# Langue des explications : choisie à l'affichage, sans relancer la validation
+locale = st.selectbox(
+    "🌐 Langue des explications",
+    options=list(LOCALE_NAMES),
+    format_func=LOCALE_NAMES.get,
+    key="locale"
+)
+
 # Afficher les résultats
 if 'validation_result' in st.session_state:
     result = st.session_state.validation_result
@@ -171,37 +156,56 @@ if 'validation_result' in st.session_state:
     if not result.get("valid", False) and result.get("error") and result.get("error", {}).get("matched"):
         matched = result["error"]["matched"]
         error_line = result["error"].get("line", 0)
+        # Titre et exemples : fiche de référence de la base de connaissances
+        entry = get_knowledge_base().get(matched.get("id")) or matched
         
         st.markdown(f"""
         <div class="pedagogy-box">
-            <h3>💡 {matched.get('title', 'Explication')}</h3>
+            <h3>💡 {render_field(matched, 'titre', locale) or entry.get('titre', 'Explication')}</h3>
         """, unsafe_allow_html=True)
         
+        # Extraits de code : ligne du parseur et cause probable, découpés ensemble
+        # (ParseError donne une colonne 0-based, JSONDecodeError une colonne 1-based)
+        error_column = result["error"].get("column") or 0
+        if result.get("file_type") == "xml":
+            error_column += 1
+        location = result["error"].get("location")
+        show_location = location and location["confidence_label"] != "faible" and location["real_line"] != error_line
+        error_context, location_context = build_contexts(content, [
+            {"line": error_line, "column": error_column},
+            {"line": location["real_line"], "column": location["column"], "length": location["length"]}
+            if show_location else {},
+        ])
+        
         # Contexte du code
-        if error_line > 0:
+        if error_context:
             st.markdown("**🔍 Contexte (où se situe l'erreur) :**")
-            context = get_code_context(content, error_line, context_lines=2)
-            st.markdown(render_code_context(context), unsafe_allow_html=True)
+            st.markdown(render_context_html(error_context), unsafe_allow_html=True)
+        
+        # Cause probable ailleurs que la ligne du parseur (JSON : accolade manquante...)
+        if location_context:
+            st.markdown(f"**🎯 Cause probable :** {render_field(location, 'reason', locale)}")
+            st.markdown(render_context_html(location_context), unsafe_allow_html=True)
         
         # Exemples avant/après
-        if matched.get('example_before') or matched.get('example_after'):
+        if entry.get('exemple_avant') or entry.get('exemple_après'):
             st.markdown("**📝 Comparaison Avant / Après :**")
             col1, col2 = st.columns(2)
             
             with col1:
-                if matched.get('example_before'):
+                if entry.get('exemple_avant'):
                     st.markdown("**❌ AVANT (incorrect) :**")
-                    st.code(matched['example_before'], language=result.get("file_type", "text"))
+                    st.code(entry['exemple_avant'], language=result.get("file_type", "text"))
             
             with col2:
-                if matched.get('example_after'):
+                if entry.get('exemple_après'):
                     st.markdown("**✅ APRÈS (correct) :**")
-                    st.code(matched['example_after'], language=result.get("file_type", "text"))
+                    st.code(entry['exemple_après'], language=result.get("file_type", "text"))
         
         # Explication unifiée
         st.markdown("**📚 Explication :**")
         # Prioriser message_modder s'il existe, sinon message_novice
-        explanation = matched.get('message_modder') or matched.get('message_novice', '')
+        explanation = render_field(matched, 'message_modder', locale) or render_field(matched, 'message_novice', locale)
         if explanation:
             st.markdown(f"<p style='color: rgba(255,255,255,0.9); line-height: 1.8;'>{explanation}</p>", unsafe_allow_html=True)
         
@@ -210,13 +214,23 @@ if 'validation_result' in st.session_state:
             st.markdown("**💡 Solution :**")
             st.markdown(f"<p style='color: rgba(255,255,255,0.9); line-height: 1.8;'>{matched['solution']}</p>", unsafe_allow_html=True)
         
+        # Autres problèmes détectés dans le fichier (classés par confiance)
+        other_matches = result["error"].get("other_matches") or []
+        if other_matches:
+            with st.expander(f"🔎 Autres causes possibles ({len(other_matches)})"):
+                for other in other_matches:
+                    st.markdown(f"- **{render_field(other, 'titre', locale) or other['id']}** — ligne {other['match_line']} "
+                                f"(confiance {other['confidence']:.0%})")
+        
         st.markdown('</div>', unsafe_allow_html=True)
     
     # ═══════════════════════════════════════════════════════
     # ⭐ CORRECTION AUTOMATIQUE (CŒUR DE L'APP)
     # ═══════════════════════════════════════════════════════
     
-    if result.get("corrected"):
+    if result.get("edits"):
+        corrected = apply_edits(content, result["edits"])
+        
         st.markdown("""
         <div class="correction-box">
             <h3>✨ Correction Automatique Disponible !</h3>
@@ -225,9 +239,21 @@ if 'validation_result' in st.session_state:
             </p>
         </div>
         """, unsafe_allow_html=True)
+
+        if result.get("repair_confidence") is not None:
+            st.info(f"🔎 Erreur non répertoriée : correction trouvée par recherche "
+                    f"(confiance {result['repair_confidence']:.0%}) — {result['edits'][0]['reason']}. Vérifie-la avant de l'utiliser.")
+
+        if result.get("corrected_valid") is False:
+            st.warning("⚠️ Correction partielle : le fichier corrigé contient encore une erreur. Revalide-le après téléchargement.")
+
+        # Modifications (diff construit directement depuis les éditions)
+        diff = diff_from_edits(content, result["edits"])
+        with st.expander(f"🔍 Voir les modifications — {diff['summary']}"):
+            st.code(diff["diff_text"], language="diff")
         
         # Afficher le code corrigé
-        st.code(result["corrected"], language=result.get("file_type", "text"))
+        st.code(corrected, language=result.get("file_type", "text"))
         
         # Boutons de téléchargement
         col1, col2 = st.columns(2)
@@ -235,7 +261,7 @@ if 'validation_result' in st.session_state:
         with col1:
             st.download_button(
                 label="💾 Télécharger le fichier corrigé",
-                data=result["corrected"],
+                data=corrected,
                 file_name=f"corrigé_{uploaded_file.name}",
                 mime="text/plain",
                 type="primary",
@@ -275,23 +301,34 @@ if 'validation_result' in st.session_state:
             st.markdown("### ⚠️ Avertissements Sémantiques (Règles Métier DayZ)")
             for warning in result["semantic_warnings"]:
                 severity = warning.get("severity", "warning")
-                message = warning.get("message", "")
+                message = render_field(warning, "message", locale)
                 line = warning.get("line", 0)
+                fix = warning.get("fix")
+                fix_html = f"<br>🛠️ <em>Correction : {fix['description']}</em>" if fix else ""
                 
                 if severity == "error":
                     st.markdown(f"""
                     <div class="error-item">
                         <strong>Erreur métier - Ligne {line}</strong><br>
-                        {message}
+                        {message}{fix_html}
                     </div>
                     """, unsafe_allow_html=True)
                 else:
                     st.markdown(f"""
                     <div class="warning-item">
                         <strong>Avertissement - Ligne {line}</strong><br>
-                        {message}
+                        {message}{fix_html}
                     </div>
                     """, unsafe_allow_html=True)
+            
+            # Fichier avec les corrections métier (seuls les nombres changent)
+            if result.get("semantic_edits"):
+                st.download_button(
+                    label="💾 Télécharger avec les corrections métier",
+                    data=apply_edits(content, result["semantic_edits"]),
+                    file_name=f"corrigé_metier_{uploaded_file.name}",
+                    mime="text/plain"
+                )
         else:
             st.info("Aucun avertissement sémantique.")
     
@@ -299,8 +336,9 @@ if 'validation_result' in st.session_state:
         info_data = {
             'Type de fichier': result.get('dayz_type') or 'Inconnu',
             'Format': result.get("file_type", "unknown").upper(),
+            'Version DayZ (schéma)': result.get('dayz_version') or 'N/A',
             'Fichier valide': '✅ Oui' if result.get("valid", False) else '❌ Non',
-            'Correction auto disponible': '✅ Oui' if result.get("corrected") else '❌ Non',
+            'Correction auto disponible': '✅ Oui' if result.get("edits") else '❌ Non',
             'Formatage disponible': '✅ Oui' if result.get("formatted") else '❌ Non'
         }
         
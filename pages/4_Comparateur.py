@@ -19,6 +19,9 @@ st.set_page_config(
 # ─────────────────────────────────────────────
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from utils.styles import apply_styles, apply_header
+from modules.query import (
+    SIMPLE_FIELDS, FLAG_FIELDS, parse_types, TypesIndex, QuerySyntaxError,
+)
 apply_styles(st)
 apply_header(st)
 
@@ -124,58 +127,17 @@ VANILLA_PATHS = {
 # ─────────────────────────────────────────────
 #  PARSING
 # ─────────────────────────────────────────────
-SIMPLE_FIELDS = ["nominal", "lifetime", "restock", "min",
-                 "quantmin", "quantmax", "cost"]
-FLAG_FIELDS   = ["count_in_cargo", "count_in_hoarder", "count_in_map",
-                 "count_in_player", "crafted", "deloot"]
-
 def parse_types_xml(content: bytes) -> dict:
     """
     Parse un types.xml → dict { classname: {champs} }
-    Gère : champs simples, flags, category, usage (liste), value (liste)
+    Le parsing est fait par modules/query.py (partagé avec la ligne de commande)
     """
     try:
-        root = ET.fromstring(content)
+        return parse_types(content)
     except ET.ParseError as e:
         st.error(f"❌ Erreur XML : {e}")
         return {}
 
-    items = {}
-    for type_elem in root.findall("type"):
-        name = type_elem.get("name", "").strip()
-        if not name:
-            continue
-
-        data = {}
-
-        # Champs simples
-        for field in SIMPLE_FIELDS:
-            elem = type_elem.find(field)
-            data[field] = int(elem.text) if elem is not None and elem.text else 0
-
-        # Flags (attributs d'une balise unique)
-        flags_elem = type_elem.find("flags")
-        if flags_elem is not None:
-            for flag in FLAG_FIELDS:
-                data[f"flag_{flag}"] = flags_elem.get(flag, "0")
-        else:
-            for flag in FLAG_FIELDS:
-                data[f"flag_{flag}"] = "0"
-
-        # Category (unique)
-        cat = type_elem.find("category")
-        data["category"] = cat.get("name", "") if cat is not None else ""
-
-        # Usage (multiple) → liste triée pour comparaison stable
-        data["usage"] = sorted([u.get("name", "") for u in type_elem.findall("usage")])
-
-        # Value/tier (multiple) → liste triée
-        data["value"] = sorted([v.get("name", "") for v in type_elem.findall("value")])
-
-        items[name] = data
-
-    return items
-
 
 # ─────────────────────────────────────────────
 #  COMPARAISON
@@ -349,6 +311,32 @@ st.download_button(
 
 st.divider()
 
+# ─────────────────────────────────────────────
+#  FILTRE AVANCÉ
+# ─────────────────────────────────────────────
+query_text = st.text_input(
+    "🧮 Filtre avancé",
+    placeholder="ex: category=weapons AND usage contains Military AND nominal>10",
+    help=("Champs : name, category, usage, value (ou tier), flags (crafted, deloot...), "
+          "nominal, min, lifetime, restock, quantmin, quantmax, cost. "
+          "Opérateurs : = != > >= < <= contains, AND / OR / NOT, parenthèses."),
+    key="query_filter",
+)
+if query_text.strip():
+    try:
+        custom_match  = TypesIndex(custom_data).filter(query_text)
+        vanilla_match = TypesIndex(vanilla_data).filter(query_text)
+    except QuerySyntaxError as e:
+        st.error(f"❌ Filtre invalide : {e}")
+        st.stop()
+
+    result = {
+        "added":     [i for i in result["added"]    if i["classname"] in custom_match],
+        "removed":   [i for i in result["removed"]  if i["classname"] in vanilla_match],
+        "modified":  [i for i in result["modified"] if i["classname"] in custom_match],
+        "identical": [n for n in result["identical"] if n in custom_match],
+    }
+
 # ─────────────────────────────────────────────
 #  ONGLETS RÉSULTATS
 # ─────────────────────────────────────────────
@@ -0,0 +1,39 @@
+"""
+test_corrector.py
+Correcteur JSON en une passe (modules/corrector.py) : fermetures
+supprimées au milieu du fichier.
+
+Lancement depuis la racine du projet :
+    python -m pytest -q tests
+"""
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules.corrector import auto_correct  # noqa: E402
+
+
+DATA = {"Areas": [{"Data": {"Pos": [1, 0, 2], "Radius": 50}, "PlayerData": {"Tint": "a"}},
+                  {"Data": {"Pos": [3, 0, 4], "Radius": 60}, "PlayerData": {"Tint": "b"}}]}
+TEXT = json.dumps(DATA, indent=4)
+
+
+def test_crochet_supprime_avec_sa_virgule():
+    broken = TEXT.replace("\n                ],", "", 1)
+    corrected = auto_correct(broken, "json", {"fermeture_conteneurs"})["corrected"]
+    assert json.loads(corrected) == DATA
+
+
+def test_accolade_supprimee_avant_celle_du_parent():
+    broken = TEXT.replace('"a"\n            }', '"a"', 1)
+    corrected = auto_correct(broken, "json", {"fermeture_conteneurs"})["corrected"]
+    assert json.loads(corrected) == DATA
+
+
+def test_json_complet_mal_indente_intact():
+    text = '{\n    "a": {\n        "b": 1\n  },\n  "c": [\n      2\n]\n}'
+    assert auto_correct(text, "json")["edits"] == []
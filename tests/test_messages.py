@@ -0,0 +1,37 @@
+"""
+test_messages.py
+Messages rangés par clé dans les résultats et rendus à la demande
+(modules/messages.py).
+
+Lancement depuis la racine du projet :
+    python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules.messages import Message, message_fields, render_field, render_fields  # noqa: E402
+from modules.validator import validate  # noqa: E402
+
+
+def test_seules_cle_et_valeurs_rangees():
+    fields = message_fields("reason", Message("locator.ouvrante", tag="type", line=12))
+    assert fields == {"reason_key": "locator.ouvrante", "reason_params": {"tag": "type", "line": 12}}
+    assert render_field(fields, "reason", "en") == "The <type> tag opened on line 12 is never closed with </type>."
+
+
+def test_texte_brut_rendu_tel_quel():
+    assert render_field({"message_brut": "no element found"}, "message_brut", "en") == "no element found"
+
+
+def test_render_fields_rend_chaque_message():
+    result = validate('<types>\n<type name="a">\n<nominal>1</nominal>\n</types>\n', "xml")
+    matched = result["error"]["matched"]
+    assert "titre" not in matched and "titre_key" in matched
+    rendered = render_fields(result, "en")
+    assert rendered["error"]["matched"]["titre"] == render_field(matched, "titre", "en")
+    assert rendered["error"]["location"]["reason"] == render_field(result["error"]["location"], "reason", "en")
+    assert "titre" not in result["error"]["matched"]
@@ -0,0 +1,89 @@
+"""
+test_repair.py
+Correction par fenêtre (modules/repair.py) : points de reprise tenus à
+jour d'une correction à l'autre, vérification par expat seul.
+
+Lancement depuis la racine du projet :
+    python -m pytest -q tests
+"""
+
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules.corrector import apply_edits  # noqa: E402
+from modules.repair import _OpenTags, _parse_error, correct_until_valid, correct_window  # noqa: E402
+
+
+# Assez long pour relever plusieurs points de reprise
+DOCUMENT = "<types>\n" + "".join(
+    f'    <type name="T{i}">\n        <nominal>{i}</nominal>\n    </type>\n' for i in range(3000)
+) + "</types>\n"
+
+
+def window_around(content, old):
+    """(début, fin) de la ligne contenant old"""
+    pos = content.index(old)
+    return content.rfind("\n", 0, pos) + 1, content.index("\n", pos) + 1
+
+
+def edit_in_window(tags, old, new):
+    """Remplace old (dans une fenêtre d'une ligne) et passe tags au texte corrigé"""
+    content = tags.text
+    start, end = window_around(content, old)
+    stack = tags.stack_at(start)
+    edits = [{"offset": content.index(old), "length": len(old), "text": new, "reason": ""}]
+    corrected = apply_edits(content, edits)
+    tags.apply(corrected, start, end, stack, edits)
+    return corrected, start
+
+
+# ==============================
+# POINTS DE REPRISE
+# ==============================
+def test_points_decales_apres_correction_neutre():
+    tags = _OpenTags(DOCUMENT)
+    tags.stack_at(len(DOCUMENT))
+    before = len(tags.points)
+    corrected, start = edit_in_window(tags, "<nominal>100</nominal>", "<nominal>100000</nominal>")
+    assert len(tags.points) == before
+    fresh = _OpenTags(corrected)
+    for position, stack in tags.points[1:]:     # le premier est le début du texte
+        assert corrected[position - 1] == ">"
+        assert list(stack) == fresh.stack_at(position)
+
+
+def test_points_oublies_si_la_pile_change():
+    tags = _OpenTags(DOCUMENT)
+    tags.stack_at(len(DOCUMENT))
+    corrected, start = edit_in_window(tags, '<type name="T100">', '<type name="T100"><extra>')
+    assert all(position <= start for position, _ in tags.points)
+    fresh = _OpenTags(corrected)
+    assert tags.stack_at(len(corrected)) == fresh.stack_at(len(corrected))
+
+
+# ==============================
+# CORRECTION PAR FENÊTRE
+# ==============================
+def test_plusieurs_erreurs_meme_resultat_que_le_document():
+    broken = (DOCUMENT.replace("<nominal>200</nominal>", "<nominal>200", 1)
+                      .replace('name="T1500"', 'name="T1500 & co"', 1)
+                      .replace("<nominal>2800</nominal>", "<nominal>2800", 1))
+    window = correct_window(broken, "xml")
+    assert window["valid"] and window["iterations"] == 3
+    assert window["corrected"] == correct_until_valid(broken, "xml")["corrected"]
+
+
+def test_verification_expat_memes_erreurs_que_et():
+    for text in ["<a><b></a>", "<a>&foo;</a>", "<p:a/>", "", "<a/><b/>",
+                 "<!DOCTYPE a SYSTEM 'a.dtd'><a>&foo;</a>"]:
+        try:
+            ET.fromstring(text)
+            expected = None
+        except ET.ParseError as e:
+            expected = (str(e), e.code, e.position)
+        error = _parse_error(text, "xml")
+        assert (None if error is None else (str(error), error.code, error.position)) == expected
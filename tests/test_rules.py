@@ -0,0 +1,83 @@
+"""
+test_rules.py
+Détection des règles de errors_db (modules/rules.py) et choix des
+correcteurs d'après les règles détectées (corrector.correction_actions).
+
+Lancement depuis la racine du projet :
+    python -m pytest -q tests
+"""
+
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules.corrector import auto_correct, correction_actions  # noqa: E402
+from modules.errors_matcher import match_all_errors  # noqa: E402
+
+
+def matched_ids(content):
+    try:
+        ET.fromstring(content)
+    except ET.ParseError as e:
+        return [entry["id"] for entry in match_all_errors(content, e, "xml")]
+    return []
+
+
+# ==============================
+# XML_005 : & NON ÉCHAPPÉ
+# ==============================
+def test_esperluette_nue_detectee():
+    assert matched_ids("<a>x & y</a>") == ["XML_005"]
+
+
+def test_esperluette_dans_un_attribut_detectee():
+    assert "XML_005" in matched_ids('<a><b name="A&B"/><c></a>')
+
+
+def test_references_numeriques_valides():
+    assert "XML_005" not in matched_ids('<a>&#38; &#x26; &amp;<b></a>')
+
+
+def test_cdata_et_commentaires_ignores():
+    assert "XML_005" not in matched_ids("<a><![CDATA[ a & b ]]><b></a>")
+    assert "XML_005" not in matched_ids("<a><!-- a & b --><b></a>")
+
+
+# ==============================
+# TEXTE LIBRE : COMMENTAIRES, CDATA
+# ==============================
+def test_motifs_ignores_dans_les_commentaires():
+    content = '<a>\n<!-- <current actual="1"> min=5 -->\n<b>\n</a>'
+    ids = matched_ids(content)
+    assert "XML_001" not in ids and "XML_003" not in ids
+
+
+def test_commentaire_non_ferme():
+    assert matched_ids("<a>\n<!-- <b>\n</a>\n")[0] == "XML_004"
+    assert "XML_004" not in matched_ids("<a><![CDATA[ <!-- ]]><b></a>")
+    assert "XML_004" not in matched_ids("<a><!-- x --><b></a><!-- y -->")
+
+
+# ==============================
+# CHOIX DES CORRECTEURS
+# ==============================
+def test_actions_des_regles_detectees():
+    assert correction_actions([{"id": "XML_005"}, {"id": "XML_003"}]) == {"echappement"}
+    assert correction_actions([{"id": "XML_003"}]) == frozenset()
+
+
+def test_seuls_les_correcteurs_demandes():
+    content = "<a>x & y\n<b>\n</a>\n"
+    escaped = auto_correct(content, "xml", {"echappement"})
+    assert escaped["corrected"] == "<a>x &amp; y\n<b>\n</a>\n"
+    closed = auto_correct(content, "xml", {"fermeture_balises"})
+    assert "&amp;" not in closed["corrected"] and "</b>" in closed["corrected"]
+
+
+def test_json_seuls_les_correcteurs_demandes():
+    content = "{'a': 1, b: [2,],}"
+    corrected = auto_correct(content, "json", {"virgules_finales"})["corrected"]
+    assert corrected == "{'a': 1, b: [2]}"
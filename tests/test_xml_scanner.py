@@ -0,0 +1,132 @@
+"""
+test_xml_scanner.py
+Découpage de modules/xml_scanner.py sur les cas que les anciens parcours
+par ligne traitaient mal, et durée de vie de son cache.
+
+Lancement depuis la racine du projet :
+    python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules.document_cache import document_scope  # noqa: E402
+from modules.xml_scanner import (  # noqa: E402
+    AMP, BROKEN, CDATA, CLOSE, COMMENT, OPEN, PI, SELF_CLOSE,
+    events_before, iter_xml_events, scan_xml,
+)
+
+
+def kinds(content):
+    """[(kind, name), ...] de chaque événement"""
+    return [(kind, name) for kind, _, _, name, _ in iter_xml_events(content)]
+
+
+def spans(content, kind):
+    """Texte couvert par chaque événement de cette sorte"""
+    return [content[start:end] for k, start, end, _, _ in iter_xml_events(content) if k == kind]
+
+
+# ==============================
+# BALISES
+# ==============================
+def test_balise_sur_plusieurs_lignes():
+    content = '<types>\n<type\n    name="AKM"\n    cost="1"\n>\n</type>\n</types>'
+    assert kinds(content) == [(OPEN, "types"), (OPEN, "type"), (CLOSE, "type"), (CLOSE, "types")]
+    assert spans(content, OPEN)[1] == '<type\n    name="AKM"\n    cost="1"\n>'
+
+
+def test_auto_fermante_sur_plusieurs_lignes():
+    content = '<flags\n    deletable="0"\n    init_random="0"\n/>'
+    assert kinds(content) == [(SELF_CLOSE, "flags")]
+
+
+def test_chevron_entre_guillemets():
+    content = '<item name="a>b" tag=\'c>d\'/><next/>'
+    assert kinds(content) == [(SELF_CLOSE, "item"), (SELF_CLOSE, "next")]
+    assert spans(content, SELF_CLOSE)[0] == '<item name="a>b" tag=\'c>d\'/>'
+
+
+def test_guillemet_non_referme():
+    content = '<type name="AKM>\n<nominal>1</nominal>'
+    events = list(iter_xml_events(content))
+    assert events[0][0] == BROKEN and events[0][3] == "type"
+    assert content[events[0][1]:events[0][2]] == '<type name="AKM>'
+    assert (events[1][0], events[1][3]) == (OPEN, "nominal")
+
+
+def test_fermante_avec_espaces():
+    assert kinds("<a></ a >") == [(OPEN, "a"), (CLOSE, "a")]
+
+
+# ==============================
+# SECTIONS SPÉCIALES
+# ==============================
+def test_declaration_xml():
+    content = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<types/>'
+    assert kinds(content) == [(PI, None), (SELF_CLOSE, "types")]
+    assert spans(content, PI) == ['<?xml version="1.0" encoding="UTF-8" standalone="yes"?>']
+
+
+def test_cdata_masque_balises_et_esperluettes():
+    content = "<a><![CDATA[ <b> & </c> ]]></a>"
+    assert kinds(content) == [(OPEN, "a"), (CDATA, None), (CLOSE, "a")]
+    assert spans(content, CDATA) == ["<![CDATA[ <b> & </c> ]]>"]
+
+
+def test_commentaire_multi_lignes():
+    content = "<a>\n<!-- <b>\n & -->\n</a>"
+    assert kinds(content) == [(OPEN, "a"), (COMMENT, None), (CLOSE, "a")]
+
+
+def test_commentaire_jamais_ferme():
+    content = "<a>\n<!-- <b>\n</a>\n"
+    events = list(iter_xml_events(content))
+    assert [(kind, name) for kind, _, _, name, _ in events] == [(OPEN, "a"), (COMMENT, None)]
+    assert events[-1][1] == content.index("<!--")
+    assert events[-1][2] is None
+
+
+# ==============================
+# ESPERLUETTES
+# ==============================
+def test_esperluette_nue():
+    content = "<a>A & B</a>"
+    assert spans(content, AMP) == ["&"]
+
+
+def test_entites_valides_ignorees():
+    content = "<a>&amp; &lt; &gt; &quot; &apos; &#38; &#x26; &#X26;</a>"
+    amps = [start for kind, start, _, _, _ in iter_xml_events(content) if kind == AMP]
+    # &#X26; n'est pas une référence valide (x minuscule seulement)
+    assert amps == [content.index("&#X26;")]
+
+
+def test_esperluette_dans_un_attribut():
+    content = '<item name="A&B"/><item name="A&amp;B"/>'
+    events = list(iter_xml_events(content))
+    assert [(kind, well_formed) for kind, _, _, _, well_formed in events] == [
+        (SELF_CLOSE, False), (SELF_CLOSE, False)]
+
+
+# ==============================
+# CACHE
+# ==============================
+def test_events_before():
+    events = scan_xml("<a><b/></a>")
+    assert [name for _, _, _, name, _ in events_before(events, 3)] == ["a"]
+    assert len(events_before(events, 100)) == 3
+
+
+def test_cache_limite_au_scope():
+    content = "<a><b/></a>"
+    assert scan_xml(content) is not scan_xml(content)
+    with document_scope():
+        first = scan_xml(content)
+        assert scan_xml(content) is first
+        with document_scope():
+            assert scan_xml(content) is first
+    assert scan_xml(content) is not first
@@ -215,9 +215,11 @@ pre *, code * { color: #e0e0e0 !important; }
     font-size: 13px;
     line-height: 1.6;
 }
-.context-code .line       { color: rgba(255,255,255,0.6) !important; padding: 2px 0; }
+.context-code .line       { color: rgba(255,255,255,0.6) !important; padding: 2px 0; white-space: pre; overflow-x: auto; }
 .context-code .line.error { background: rgba(239,68,68,0.2); border-left: 3px solid #ef4444; padding-left: 12px; color: #fff !important; }
 .context-code .line-num   { display: inline-block; width: 40px; color: rgba(255,255,255,0.4) !important; text-align: right; margin-right: 16px; }
+.context-code .mark       { background: rgba(239,68,68,0.45); border-radius: 2px; color: #fff !important; }
+.context-code .cut        { color: rgba(255,255,255,0.35) !important; }
 
 /* ── DOC CARD ── */
 .doc-card {